@@ -512,10 +512,10 @@ class OpenAPICodec(BaseCodec):
             operation['description'] = link.description
         if tag:
             operation['tags'] = [tag]
-        if link.get_path_fields() or link.get_query_fields():
+        if link.get_path_fields() or link.get_query_fields() or link.get_header_fields():
             operation['parameters'] = [
                 self.get_parameter(field, schema_defs) for field in
-                link.get_path_fields() + link.get_query_fields()
+                link.get_path_fields() + link.get_query_fields() + link.get_header_fields()
             ]
         if link.get_body_field():
             schema = link.get_body_field().schema
@@ -550,6 +550,14 @@ class OpenAPICodec(BaseCodec):
                     }
                 }
             }
+        if any(field.name.lower() == 'if-none-match' for field in link.get_header_fields()):
+            # Conditional requests are supported.
+            responses = operation.setdefault('responses', {})
+            if link.response is not None:
+                responses[str(link.response.status_code)]['headers'] = {
+                    'ETag': {'schema': {'type': 'string'}}
+                }
+            responses['304'] = {'description': 'Not modified'}
         return operation
 
     def get_parameter(self, field, schema_defs=None):
@@ -1,18 +1,41 @@
+import asyncio
 import collections
 import sys
 
+import yaml
+
 if sys.version_info < (3, 6):
     dict_type = collections.OrderedDict
 else:
     dict_type = dict
 
 
+# `asyncio.all_tasks()` and `asyncio.current_task()` replace the equivalent
+# `Task` class methods, which were removed in Python 3.9.
+if hasattr(asyncio, 'all_tasks'):
+    all_tasks = asyncio.all_tasks
+    current_task = asyncio.current_task
+else:
+    all_tasks = asyncio.Task.all_tasks
+    current_task = asyncio.Task.current_task
+
+
+# Use the libyaml based loader where available.
+YAMLSafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
 try:
     import aiofiles
 except ImportError:
     aiofiles = None
 
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
 try:
     import jinja2
 except ImportError:
@@ -25,6 +48,12 @@ except ImportError:
     whitenoise = None
 
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
 try:
     import pygments
     from pygments.lexers import get_lexer_by_name
@@ -19,3 +19,53 @@ def negotiate_content_type(codecs, content_type=None):
 
     msg = "Unsupported media in Content-Type header '%s'" % content_type
     raise exceptions.NoCodecAvailable(msg)
+
+
+def negotiate_content_encoding(encodings, accept_encoding=None):
+    """
+    Given the value of an 'Accept-Encoding' header, return the most preferred
+    of the available content encodings, or `None` if the unencoded
+    representation should be used.
+    """
+    if not accept_encoding:
+        return None
+
+    preferences = {}
+    for item in accept_encoding.split(','):
+        encoding, _, params = item.partition(';')
+        encoding = encoding.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences[encoding] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = preferences.get(encoding, preferences.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def etag_matches(etag, if_none_match=None):
+    """
+    Given the value of an 'If-None-Match' header, return `True` if it
+    matches the given entity tag, using the weak comparison function.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque_tag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+    return False
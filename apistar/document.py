@@ -156,6 +156,9 @@ class Link:
     def get_query_fields(self):
         return [field for field in self.fields if field.location == 'query']
 
+    def get_header_fields(self):
+        return [field for field in self.fields if field.location == 'header']
+
     def get_body_field(self):
         for field in self.fields:
             if field.location == 'body':
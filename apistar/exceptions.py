@@ -1,17 +1,73 @@
+import re
+from bisect import bisect_right
 from typing import Union
 
+# The same set of line boundaries as used by `str.splitlines()`.
+LINE_BREAK_RE = re.compile('\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+class LineIndex():
+    """
+    Converts positions in a document into line and column numbers.
+
+    The offsets of each line break are determined on first use, and each
+    lookup is then a binary search, so a single index may be shared by all
+    the markers for a document.
+    """
+    def __init__(self, content):
+        self.content = content
+        self._break_starts = None
+        self._line_starts = None
+
+    def _build(self):
+        self._break_starts = []
+        self._line_starts = [0]
+        for match in LINE_BREAK_RE.finditer(self.content):
+            self._break_starts.append(match.start())
+            self._line_starts.append(match.end())
+
+    def get_line_and_column(self, position):
+        """
+        Return a two-tuple of (line_number, column_number) for the given
+        position. Equivalent to using `content[:position + 1].splitlines()`.
+        """
+        if not self.content:
+            return (0, 1)
+        if self._line_starts is None:
+            self._build()
+
+        position = min(position, len(self.content) - 1)
+        index = bisect_right(self._break_starts, position)
+        if index and position < self._line_starts[index]:
+            # The position is on a line break, so belongs to the line that
+            # the break terminates.
+            return (index, self._break_starts[index - 1] - self._line_starts[index - 1])
+        return (index + 1, position - self._line_starts[index] + 1)
+
 
 class Marker():
-    def __init__(self, position, content=None):
+    def __init__(self, position, content=None, line_index=None):
+        if line_index is None and content is not None:
+            line_index = LineIndex(content)
         self.position = position
-        self.content = content
-        if content is None:
-            self.line_number = None
-            self.column_number = None
-        else:
-            lines = content[:position + 1].splitlines()
-            self.line_number = len(lines)
-            self.column_number = len(lines[-1]) if lines else 1
+        self.line_index = line_index
+        self.content = None if line_index is None else line_index.content
+        self._line_and_column = None
+
+    def _get_line_and_column(self):
+        if self.line_index is None:
+            return (None, None)
+        if self._line_and_column is None:
+            self._line_and_column = self.line_index.get_line_and_column(self.position)
+        return self._line_and_column
+
+    @property
+    def line_number(self):
+        return self._get_line_and_column()[0]
+
+    @property
+    def column_number(self):
+        return self._get_line_and_column()[1]
 
     def __eq__(self, other):
         return self.position == other.position
@@ -42,6 +98,7 @@ class ValidationError(Exception):
     def set_error_context(self, token, content):
         self.token = token
         self.content = content
+        self.line_index = LineIndex(content)
 
     def get_error_messages(self):
         assert self.token is not None, 'set_error_context() not called.'
@@ -51,7 +108,7 @@ class ValidationError(Exception):
             if message.code == 'required':
                 prefix = prefix[:-1]
             position = self.token.lookup(prefix, lookup_property=lookup_property).start
-            marker = Marker(position, self.content)
+            marker = Marker(position, line_index=self.line_index)
             error_message = ErrorMessage(message, marker)
             error_messages.append(error_message)
         return sorted(error_messages, key=lambda e: e.marker.position)
@@ -177,3 +234,20 @@ class NotAcceptable(HTTPException):
 class UnsupportedMediaType(HTTPException):
     default_status_code = 415
     default_detail = 'Unsupported Content-Type header in request'
+
+
+class ServiceUnavailable(HTTPException):
+    default_status_code = 503
+    default_detail = 'Service unavailable'
+
+    def __init__(self,
+                 detail: Union[str, dict]=None,
+                 status_code: int=None,
+                 retry_after: int=None) -> None:
+        self.retry_after = retry_after
+        super().__init__(detail, status_code)
+
+    def get_headers(self):
+        if self.retry_after is None:
+            return {}
+        return {'Retry-After': str(self.retry_after)}
@@ -1,8 +1,9 @@
 import json
 import typing
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlparse
 
 from apistar import types
+from apistar.conneg import etag_matches
 
 Method = typing.NewType('Method', str)
 Scheme = typing.NewType('Scheme', str)
@@ -50,12 +51,19 @@ class QueryParams(typing.Mapping[str, str]):
             items = list(value)
         self._dict = {k: v for k, v in reversed(items)}
         self._list = items
+        self._lists = None  # type: typing.Dict[str, typing.List[str]]
 
     def get_list(self, key: str) -> typing.List[str]:
-        return [
-            item_value for item_key, item_value in self._list
-            if item_key == key
-        ]
+        if self._lists is None:
+            # Index every value by key, so that each lookup is O(1).
+            lists = {}  # type: typing.Dict[str, typing.List[str]]
+            for item_key, item_value in self._list:
+                if item_key in lists:
+                    lists[item_key].append(item_value)
+                else:
+                    lists[item_key] = [item_value]
+            self._lists = lists
+        return list(self._lists.get(key, []))
 
     def keys(self):
         return [key for key, value in self._list]
@@ -93,6 +101,31 @@ class QueryParams(typing.Mapping[str, str]):
         return 'QueryParams(%s)' % repr(self._list)
 
 
+class LazyQueryParams(QueryParams):
+    """
+    A `QueryParams` view over a query string, which is only parsed when it is
+    first accessed.
+    """
+
+    def __init__(self, query_string: str) -> None:
+        self.query_string = query_string
+        self._items = None  # type: typing.List[typing.Tuple[str, str]]
+        self._index = None  # type: typing.Dict[str, str]
+        self._lists = None
+
+    @property
+    def _list(self):
+        if self._items is None:
+            self._items = parse_qsl(self.query_string)
+        return self._items
+
+    @property
+    def _dict(self):
+        if self._index is None:
+            self._index = {k: v for k, v in reversed(self._list)}
+        return self._index
+
+
 class Headers(typing.Mapping[str, str]):
     """
     An immutable, case-insensitive multidict.
@@ -152,20 +185,159 @@ class Headers(typing.Mapping[str, str]):
         return '%s(%s)' % (self.__class__.__name__, repr(self._list))
 
 
+class LazyHeaders(Headers):
+    """
+    A read-only `Headers` view over the raw request headers of the server,
+    which are only decoded and indexed when they are first accessed.
+
+    Subclasses implement `get_items()`, and may override `lookup()` if the
+    raw headers support a cheaper way to find a single header.
+    """
+
+    def __init__(self) -> None:
+        self._items = None  # type: typing.List[typing.Tuple[str, str]]
+        self._index = None  # type: typing.Dict[str, str]
+
+    def get_items(self) -> typing.List[typing.Tuple[str, str]]:
+        raise NotImplementedError()
+
+    def lookup(self, key: str) -> typing.Optional[str]:
+        return self._dict.get(key)
+
+    @property
+    def _list(self):
+        if self._items is None:
+            self._items = self.get_items()
+        return self._items
+
+    @property
+    def _dict(self):
+        if self._index is None:
+            self._index = {k: v for k, v in reversed(self._list)}
+        return self._index
+
+    def get(self, key: str, default: str=None):
+        value = self.lookup(key.lower())
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = self.lookup(key.lower())
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str):
+        return self.lookup(key.lower()) is not None
+
+
 class MutableHeaders(Headers):
+    """
+    A case-insensitive multidict for response headers.
+
+    Items are kept in order, together with their encoded form for ASGI, and
+    an index of the positions of each header, so that setting, appending and
+    deleting headers never has to rebuild the list. Deleted items are left
+    as `None` until the list is compacted.
+    """
+
+    def __init__(self, value: typing.Union[StrMapping, StrPairs]=None) -> None:
+        self._items = []  # type: typing.List[typing.Tuple[str, str]]
+        self._raw_items = []  # type: typing.List[typing.Tuple[bytes, bytes]]
+        self._positions = {}  # type: typing.Dict[str, typing.List[int]]
+        self._deleted = 0
+        if value is None:
+            value = []
+        for key, item_value in (value.items() if hasattr(value, 'items') else value):
+            self.append(key, item_value)
+
+    @property
+    def _list(self):
+        self.compact()
+        return self._items
+
+    def compact(self):
+        if not self._deleted:
+            return
+        self._items = [item for item in self._items if item is not None]
+        self._raw_items = [item for item in self._raw_items if item is not None]
+        self._positions = {}
+        for index, (key, value) in enumerate(self._items):
+            self._positions.setdefault(key, []).append(index)
+        self._deleted = 0
+
+    def raw_items(self) -> typing.List[typing.Tuple[bytes, bytes]]:
+        """
+        Return the encoded header items, for an ASGI response.
+        """
+        self.compact()
+        return self._raw_items
+
+    def append(self, key: str, value: str):
+        key = key.lower()
+        value = str(value)
+        self.append_encoded(key, value, (key.encode(), value.encode()))
+
+    def append_encoded(self, key: str, value: str, raw_item: typing.Tuple[bytes, bytes]):
+        """
+        Append a header with a lowercase name, given its encoded form, so
+        that constant headers only need to be encoded once.
+        """
+        positions = self._positions.get(key)
+        if positions is None:
+            self._positions[key] = [len(self._items)]
+        else:
+            positions.append(len(self._items))
+        self._items.append((key, value))
+        self._raw_items.append(raw_item)
+
+    def get_list(self, key: str) -> typing.List[str]:
+        positions = self._positions.get(key.lower(), [])
+        return [self._items[index][1] for index in positions]
+
+    def get(self, key: str, default: str=None):
+        positions = self._positions.get(key.lower())
+        if positions is None:
+            return default
+        return self._items[positions[0]][1]
+
+    def __getitem__(self, key: str):
+        positions = self._positions[key.lower()]
+        return self._items[positions[0]][1]
+
+    def __contains__(self, key: str):
+        return key.lower() in self._positions
+
+    def __len__(self):
+        return len(self._items) - self._deleted
+
     def __setitem__(self, key: str, value: str):
         key = key.lower()
         value = str(value)
 
-        if key not in self._dict:
-            self._dict[key] = value
-            self._list.append((key, value))
-        else:
-            self._dict[key] = value
-            self._list = [
-                (item_key, value) if item_key == key else (item_key, item_value)
-                for item_key, item_value in self._list
-            ]
+        positions = self._positions.get(key)
+        if positions is None:
+            self.append_encoded(key, value, (key.encode(), value.encode()))
+            return
+
+        # Replace the first item in place, and remove any others.
+        index = positions[0]
+        self._items[index] = (key, value)
+        self._raw_items[index] = (key.encode(), value.encode())
+        if len(positions) > 1:
+            self._remove(positions[1:])
+            del positions[1:]
+
+    def __delitem__(self, key: str):
+        positions = self._positions.pop(key.lower())
+        self._remove(positions)
+
+    def _remove(self, positions: typing.List[int]):
+        for index in positions:
+            self._items[index] = None
+            self._raw_items[index] = None
+        self._deleted += len(positions)
+        if self._deleted * 2 > len(self._items):
+            self.compact()
 
 
 class Request:
@@ -180,6 +352,45 @@ class Request:
         self.body = Body(b'') if (body is None) else body
 
 
+class ETag():
+    """
+    The entity tag for the response of a conditional route.
+
+    Handlers may call `set()` with a cheap version identifier for the resource,
+    such as a revision number or modification time. If it matches the
+    request's 'If-None-Match' header, then a '304 Not Modified' response is
+    returned, without serializing the handler's return value.
+    """
+    def __init__(self, if_none_match: str=None) -> None:
+        self.if_none_match = if_none_match
+        self.value = None  # type: str
+
+    def set(self, version: typing.Any, weak: bool=False) -> None:
+        opaque_tag = '"%s"' % str(version).strip('"').replace('"', '')
+        self.value = 'W/' + opaque_tag if weak else opaque_tag
+
+    def is_not_modified(self) -> bool:
+        return self.value is not None and etag_matches(self.value, self.if_none_match)
+
+
+# The 'Content-Type' header for each media type and charset, along with its
+# encoded form.
+CONTENT_TYPE_HEADERS = {}  # type: typing.Dict[typing.Tuple[str, str], typing.Tuple[str, typing.Tuple[bytes, bytes]]]
+
+
+def get_content_type_header(media_type: str, charset: str=None) -> typing.Tuple[str, typing.Tuple[bytes, bytes]]:
+    try:
+        return CONTENT_TYPE_HEADERS[(media_type, charset)]
+    except KeyError:
+        pass
+    content_type = media_type
+    if charset is not None:
+        content_type += '; charset=%s' % charset
+    header = (content_type, (b'content-type', content_type.encode()))
+    CONTENT_TYPE_HEADERS[(media_type, charset)] = header
+    return header
+
+
 class Response:
     media_type = None
     charset = 'utf-8'
@@ -209,13 +420,12 @@ class Response:
 
     def set_default_headers(self):
         if 'Content-Length' not in self.headers:
-            self.headers['Content-Length'] = str(len(self.content))
+            content_length = str(len(self.content))
+            self.headers.append_encoded('content-length', content_length, (b'content-length', content_length.encode()))
 
         if 'Content-Type' not in self.headers and self.media_type is not None:
-            content_type = self.media_type
-            if self.charset is not None:
-                content_type += '; charset=%s' % self.charset
-            self.headers['Content-Type'] = content_type
+            content_type, raw_item = get_content_type_header(self.media_type, self.charset)
+            self.headers.append_encoded('content-type', content_type, raw_item)
 
 
 class HTMLResponse(Response):
@@ -243,3 +453,50 @@ class JSONResponse(Response):
             return dict(obj)
         error = "Object of type '%s' is not JSON serializable."
         raise TypeError(error % type(obj).__name__)
+
+
+class StreamingResponse(Response):
+    """
+    A response with a body that is sent incrementally, rather than all at
+    once. The content should be an iterable of bytes or strings, or when
+    using `ASyncApp` it may also be an async iterable.
+    """
+    media_type = None
+    charset = 'utf-8'
+    # Set when the body should be compressed as it is sent.
+    content_encoder = None
+
+    def render(self, content: typing.Any) -> typing.Any:
+        return content
+
+    def set_default_headers(self):
+        if 'Content-Type' not in self.headers and self.media_type is not None:
+            content_type, raw_item = get_content_type_header(self.media_type, self.charset)
+            self.headers.append_encoded('content-type', content_type, raw_item)
+
+    def encode_chunk(self, chunk: typing.Union[str, bytes]) -> bytes:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(self.charset)
+        if self.content_encoder is not None and chunk:
+            # Flush each chunk, so that it can be sent immediately.
+            chunk = self.content_encoder.compress(chunk) + self.content_encoder.flush()
+        return chunk
+
+    def encode_end(self) -> bytes:
+        if self.content_encoder is None:
+            return b''
+        return self.content_encoder.finish()
+
+    def iter_content(self) -> typing.Iterator[bytes]:
+        for chunk in self.content:
+            chunk = self.encode_chunk(chunk)
+            if chunk:
+                yield chunk
+        chunk = self.encode_end()
+        if chunk:
+            yield chunk
+
+
+class StreamingHTMLResponse(StreamingResponse):
+    media_type = 'text/html'
+    charset = 'utf-8'
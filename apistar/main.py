@@ -6,7 +6,10 @@ import jinja2
 
 import apistar
 from apistar import codecs
+from apistar.compat import brotli
 from apistar.exceptions import ParseError, ValidationError
+from apistar.server.staticfiles import compress_static_files
+from apistar.server.templates import Templates
 
 
 def static_url(filename):
@@ -27,15 +30,21 @@ def validate(schema):
     try:
         codec.decode(content)
     except (ParseError, ValidationError) as exc:
-        lines = content.splitlines()
-        for error in reversed(exc.get_errors()):
-            error_str = ' ' * (error.marker.column_number - 1)
-            error_str += '^ '
-            error_str += error.message
-            error_str = click.style(error_str, fg='red')
-            lines.insert(error.marker.line_number, error_str)
-        for line in lines:
-            click.echo(line)
+        # Markers share a line index for the document, so we just need to
+        # group the errors by line number, rather than rescanning the content.
+        errors_by_line = {}
+        for error in exc.get_error_messages():
+            errors_by_line.setdefault(error.marker.line_number, []).append(error)
+
+        lines = content.decode('utf-8', 'ignore').splitlines()
+        for line_number in range(len(lines) + 1):
+            if line_number:
+                click.echo(lines[line_number - 1])
+            for error in errors_by_line.get(line_number, []):
+                error_str = ' ' * (error.marker.column_number - 1)
+                error_str += '^ '
+                error_str += error.message
+                click.echo(click.style(error_str, fg='red'))
 
         click.echo()
         if isinstance(exc, ParseError) and exc.base_format == 'json':
@@ -49,21 +58,31 @@ def validate(schema):
         click.echo(click.style('✓', fg='green') + ' Valid OpenAPI 3 document.')
 
 
+def get_default_bytecode_cache():
+    # Compiled templates are kept in a per-user temporary directory, so that
+    # subsequent runs don't need to compile them again.
+    try:
+        return jinja2.FileSystemBytecodeCache()
+    except RuntimeError:
+        return None
+
+
 @click.command()
 @click.argument('schema', type=click.File('rb'))
-def docs(schema):
+@click.option('--bytecode-cache', type=click.Path(exists=True, file_okay=False), default=None,
+              help='Directory to store compiled templates in.')
+def docs(schema, bytecode_cache):
     codec = codecs.OpenAPICodec()
     content = schema.read()
     document = codec.decode(content)
 
-    loader = jinja2.PrefixLoader({
-        'apistar': jinja2.PackageLoader('apistar', 'templates')
-    })
-    env = jinja2.Environment(autoescape=True, loader=loader)
+    if bytecode_cache is None:
+        bytecode_cache = get_default_bytecode_cache()
+    templates = Templates(packages=['apistar'], bytecode_cache=bytecode_cache)
 
-    template = env.get_template('apistar/docs/index.html')
     code_style = None  # pygments_css('emacs')
-    output_text = template.render(
+    output_text = templates.render_template(
+        'apistar/docs/index.html',
         document=document,
         langs=['javascript', 'python'],
         code_style=code_style,
@@ -84,5 +103,22 @@ def docs(schema):
     click.echo('Documentation built at %s' % output_path)
 
 
+@click.command()
+@click.argument('directories', nargs=-1, type=click.Path(exists=True, file_okay=False))
+def compress(directories):
+    """
+    Write precompressed variants of static files.
+    Defaults to the static files used by the API documentation.
+    """
+    if not directories:
+        directories = [os.path.join(os.path.dirname(apistar.__file__), 'static')]
+
+    encodings = 'gzip and brotli' if brotli is not None else 'gzip'
+    for directory in directories:
+        written = compress_static_files(directory)
+        click.echo('Wrote %d %s compressed files in %s' % (len(written), encodings, directory))
+
+
+main.add_command(compress)
 main.add_command(docs)
 main.add_command(validate)
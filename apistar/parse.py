@@ -2,8 +2,9 @@ import json
 
 import yaml
 
+from apistar.compat import YAMLSafeLoader
 from apistar.exceptions import Marker, ParseError, ValidationError
-from apistar.tokenize import tokenize_json, tokenize_yaml
+from apistar.tokenize import index_json, tokenize_yaml
 
 
 def infer_json_or_yaml(content):
@@ -31,7 +32,6 @@ def parse_json(content, validator=None):
         raise ParseError('No content.', marker=marker, base_format='json')
 
     try:
-        token = None if validator is None else tokenize_json(content)
         data = json.loads(content)
     except json.decoder.JSONDecodeError as exc:
         message = exc.msg + '.'
@@ -44,7 +44,9 @@ def parse_json(content, validator=None):
     try:
         return validator.validate(data)
     except ValidationError as exc:
-        exc.set_error_context(token, content)
+        # Tokenizing is only needed to report error positions, so we defer
+        # it until validation has actually failed.
+        exc.set_error_context(index_json(content), content)
         raise exc
 
 
@@ -59,8 +61,7 @@ def parse_yaml(content, validator=None):
         raise ParseError('No content.', marker=marker, base_format='yaml')
 
     try:
-        token = None if validator is None else tokenize_yaml(content)
-        data = yaml.safe_load(content)
+        data = yaml.load(content, Loader=YAMLSafeLoader)
     except (yaml.scanner.ScannerError, yaml.parser.ParserError) as exc:
         position = getattr(exc, 'index', 0)
         marker = Marker(position, content)
@@ -73,5 +74,5 @@ def parse_yaml(content, validator=None):
     try:
         return validator.validate(data)
     except ValidationError as exc:
-        exc.set_error_context(token, content)
+        exc.set_error_context(tokenize_yaml(content), content)
         raise exc
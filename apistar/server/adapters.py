@@ -1,6 +1,8 @@
 import asyncio
 import sys
+import threading
 
+from apistar.compat import all_tasks, current_task
 from apistar.server.wsgi import RESPONSE_STATUS_TEXT
 
 
@@ -10,41 +12,109 @@ class ASGItoWSGIAdapter(object):
 
     We want this so that we can use the Werkzeug development server and
     debugger together with an ASGI application.
+
+    The application runs on an event loop in a background thread, so that
+    requests from a threaded WSGI server are handled concurrently.
     """
     def __init__(self, asgi, raise_exceptions=False):
         self.asgi = asgi
         self.raise_exceptions = raise_exceptions
-        self.loop = asyncio.get_event_loop()
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Return the event loop that runs the application, starting it on the
+        first request.
+        """
+        with self.lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(
+                    target=self.run_loop, args=(loop,), name='asgi-event-loop', daemon=True
+                )
+                self.thread.start()
+                self.loop = loop
+            return self.loop
+
+    def run_loop(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+            # Cancel any requests that were submitted after `close()` drained
+            # the loop, so that the threads waiting on them don't hang.
+            tasks = [task for task in all_tasks(loop) if not task.done()]
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            loop.close()
+
+    async def drain(self):
+        """
+        Wait for all the requests in progress to complete.
+        """
+        while True:
+            tasks = [task for task in all_tasks() if task is not current_task() and not task.done()]
+            if not tasks:
+                return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """
+        Stop the event loop, once any requests in progress have completed.
+        """
+        with self.lock:
+            loop, thread = self.loop, self.thread
+            self.loop = self.thread = None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.drain(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
 
     def __call__(self, environ, start_response):
+        response_start = {}
         return_bytes = []
         message = self.environ_to_message(environ)
         asgi_coroutine = self.asgi(message)
 
         async def send(message):
             if message['type'] == 'http.response.start':
-                status = RESPONSE_STATUS_TEXT[message['status']]
-                headers = [
-                    [key.decode('latin-1'), value.decode('latin-1')]
-                    for key, value in message['headers']
-                ]
-                exc_info = sys.exc_info()
-                start_response(status, headers, exc_info)
+                response_start.update(message)
+                # Error responses are sent while the exception is handled.
+                response_start['exc_info'] = sys.exc_info()
             elif message['type'] == 'http.response.body':
                 return_bytes.append(message.get('body', b''))
 
         async def recieve():
+            # Read the request body in a separate thread, rather than
+            # blocking the event loop.
+            loop = asyncio.get_event_loop()
             return {
                 'type': 'http.request',
-                'body': environ['wsgi.input'].read()
+                'body': await loop.run_in_executor(None, environ['wsgi.input'].read)
             }
 
+        future = asyncio.run_coroutine_threadsafe(asgi_coroutine(recieve, send), self.get_loop())
+        exc_info = None
         try:
-            self.loop.run_until_complete(asgi_coroutine(recieve, send))
+            future.result()
         except Exception:
             if self.raise_exceptions:
                 raise
+            exc_info = sys.exc_info()
+
+        if not response_start:
+            start_response('500 Internal Server Error', [('Content-Type', 'text/plain')], exc_info)
+            return [b'Internal Server Error']
 
+        status = RESPONSE_STATUS_TEXT[response_start['status']]
+        headers = [
+            (key.decode('latin-1'), value.decode('latin-1'))
+            for key, value in response_start['headers']
+        ]
+        start_response(status, headers, response_start['exc_info'])
         return return_bytes
 
     def environ_to_message(self, environ):
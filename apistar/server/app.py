@@ -1,18 +1,31 @@
+import asyncio
 import sys
+import threading
 import typing
 
 import werkzeug
 
 from apistar import exceptions
-from apistar.http import HTMLResponse, JSONResponse, PathParams, Response
+from apistar.http import (
+    ETag, HTMLResponse, JSONResponse, PathParams, Response, StreamingResponse
+)
 from apistar.server.adapters import ASGItoWSGIAdapter
 from apistar.server.asgi import (
     ASGI_COMPONENTS, ASGIReceive, ASGIScope, ASGISend
 )
+from apistar.server.cache import CacheBackend, ResponseCache
+from apistar.server.cancellation import ConnectionMonitor, Deadline
+from apistar.server.coalescing import NotShared, RequestCoalescer
 from apistar.server.components import Component, ReturnValue
+from apistar.server.compression import ResponseCompression
+from apistar.server.concurrency import ConcurrencyLimit
+from apistar.server.conditional import (
+    CONDITIONAL_COMPONENTS, get_content_etag, not_modified_response
+)
 from apistar.server.core import Route, generate_document
 from apistar.server.injector import ASyncInjector, Injector
 from apistar.server.router import Router
+from apistar.server.runner import serve_asgi, serve_wsgi
 from apistar.server.staticfiles import ASyncStaticFiles, StaticFiles
 from apistar.server.templates import Templates
 from apistar.server.validation import VALIDATION_COMPONENTS
@@ -32,8 +45,14 @@ class App():
                  schema_url='/schema/',
                  docs_url='/docs/',
                  static_url='/static/',
+                 static_cache_size=None,
                  components=None,
-                 event_hooks=None):
+                 event_hooks=None,
+                 compression=None,
+                 cache_backend=None,
+                 template_bytecode_cache=None,
+                 precompile_templates=False,
+                 concurrency_limit=None):
 
         packages = tuple() if packages is None else tuple(packages)
 
@@ -50,15 +69,32 @@ class App():
         if event_hooks:
             msg = 'event_hooks must be a list.'
             assert isinstance(event_hooks, (list, tuple)), msg
+        if compression is not None:
+            msg = 'compression must be an instance of ResponseCompression.'
+            assert isinstance(compression, ResponseCompression), msg
+        if cache_backend is not None:
+            msg = 'cache_backend must be an instance of CacheBackend.'
+            assert isinstance(cache_backend, CacheBackend), msg
+        if concurrency_limit is not None:
+            msg = 'concurrency_limit must be an instance of ConcurrencyLimit.'
+            assert isinstance(concurrency_limit, ConcurrencyLimit), msg
 
         routes = routes + self.include_extra_routes(schema_url, docs_url, static_url)
         self.init_document(routes)
         self.init_router(routes)
-        self.init_templates(template_dir, packages)
-        self.init_staticfiles(static_url, static_dir, packages)
+        self.init_templates(template_dir, packages, template_bytecode_cache)
+        if precompile_templates and self.templates is not None:
+            self.templates.precompile()
+        self.init_staticfiles(static_url, static_dir, packages, static_cache_size)
         self.init_injector(components)
+        self.init_response_cache(cache_backend)
+        self.init_request_coalescer()
+        self.init_concurrency_limit(concurrency_limit)
         self.debug = False
         self.event_hooks = event_hooks
+        self.compression = compression
+        # Precomputed content, such as the schema and docs, keyed by name.
+        self.cached_content = {}
 
         # Ensure event hooks can all be instantiated.
         self.get_event_hooks()
@@ -92,7 +128,7 @@ class App():
     def init_router(self, routes):
         self.router = Router(routes)
 
-    def init_templates(self, template_dir: str=None, packages: typing.Sequence[str]=None):
+    def init_templates(self, template_dir: str=None, packages: typing.Sequence[str]=None, bytecode_cache=None):
         if not template_dir and not packages:
             self.templates = None
         else:
@@ -100,17 +136,21 @@ class App():
                 'reverse_url': self.reverse_url,
                 'static_url': self.static_url
             }
-            self.templates = Templates(template_dir, packages, template_globals)
+            self.templates = Templates(template_dir, packages, template_globals, bytecode_cache)
 
-    def init_staticfiles(self, static_url: str, static_dir: str=None, packages: typing.Sequence[str]=None):
+    def init_staticfiles(self,
+                         static_url: str,
+                         static_dir: str=None,
+                         packages: typing.Sequence[str]=None,
+                         cache_size: int=None):
         if not static_dir and not packages:
             self.statics = None
         else:
-            self.statics = StaticFiles(static_url, static_dir, packages)
+            self.statics = StaticFiles(static_url, static_dir, packages, cache_size=cache_size)
 
     def init_injector(self, components=None):
         components = components if components else []
-        components = list(WSGI_COMPONENTS + VALIDATION_COMPONENTS) + components
+        components = list(WSGI_COMPONENTS + VALIDATION_COMPONENTS + CONDITIONAL_COMPONENTS) + components
         initial_components = {
             'environ': WSGIEnviron,
             'start_response': WSGIStartResponse,
@@ -122,6 +162,18 @@ class App():
         }
         self.injector = Injector(components, initial_components)
 
+    def init_response_cache(self, cache_backend: CacheBackend=None):
+        self.response_cache = ResponseCache(cache_backend, lock_class=threading.Lock)
+
+    def init_request_coalescer(self):
+        # Request coalescing is only supported by `ASyncApp`.
+        self.request_coalescer = None
+
+    def init_concurrency_limit(self, concurrency_limit: ConcurrencyLimit=None):
+        msg = 'concurrency_limit is only supported by ASyncApp.'
+        assert concurrency_limit is None, msg
+        self.concurrency_limit = None
+
     def get_event_hooks(self):
         event_hooks = []
         for hook in self.event_hooks or []:
@@ -158,14 +210,29 @@ class App():
     def render_template(self, path: str, **context):
         return self.templates.render_template(path, **context)
 
-    def serve(self, host, port, debug=False, **options):
+    def render_template_stream(self, path: str, **context):
+        return self.templates.render_template_stream(path, **context)
+
+    def serve(self, host, port, debug=False, workers=None, **options):
+        """
+        Run the development server, or if `workers` is set, serve the
+        application using that many worker processes.
+        """
         self.debug = debug
+        if workers is not None:
+            serve_wsgi(self, host, port, workers=workers, **options)
+            return
         if 'use_debugger' not in options:
             options['use_debugger'] = debug
         if 'use_reloader' not in options:
             options['use_reloader'] = debug
         werkzeug.run_simple(host, port, self, **options)
 
+    def get_render_function(self, route: Route):
+        if route.conditional:
+            return self.render_conditional_response
+        return self.render_response
+
     def render_response(self, return_value: ReturnValue) -> Response:
         if isinstance(return_value, Response):
             return return_value
@@ -173,6 +240,31 @@ class App():
             return HTMLResponse(return_value)
         return JSONResponse(return_value)
 
+    def render_conditional_response(self, return_value: ReturnValue, etag: ETag) -> Response:
+        """
+        Render the response for a route with `conditional=True`, returning
+        '304 Not Modified' if the client's copy is still current.
+        """
+        if etag.is_not_modified():
+            # The handler provided a version, so we can skip serialization.
+            return not_modified_response(etag.value)
+
+        response = self.render_response(return_value)
+        if response.status_code != 200:
+            return response
+        if 'ETag' in response.headers:
+            etag.value = response.headers['ETag']
+        else:
+            if etag.value is None:
+                if not isinstance(response, JSONResponse):
+                    return response
+                etag.value = get_content_etag(response.content)
+            response.headers['ETag'] = etag.value
+
+        if etag.is_not_modified():
+            return not_modified_response(etag.value)
+        return response
+
     def exception_handler(self, exc: Exception) -> Response:
         if isinstance(exc, exceptions.HTTPException):
             return JSONResponse(exc.detail, exc.status_code, exc.get_headers())
@@ -181,16 +273,45 @@ class App():
     def error_handler(self) -> Response:
         return JSONResponse('Server error', 500, exc_info=sys.exc_info())
 
-    def finalize_wsgi(self, response: Response, start_response: WSGIStartResponse):
+    def get_cache_key(self, route: Route, environ: WSGIEnviron) -> str:
+        headers = {
+            header: environ.get('HTTP_' + header.upper().replace('-', '_'), '')
+            for header in route.cache.headers
+        }
+        return route.cache.get_key('GET', environ['PATH_INFO'], environ.get('QUERY_STRING', ''), headers)
+
+    def can_use_cache(self, route: Route, environ: WSGIEnviron) -> bool:
+        return not any(
+            'HTTP_' + header.upper() in environ
+            for header in route.cache.private_headers
+        )
+
+    def get_cached_response(self, response: Response) -> Response:
+        # Pass a cached response on to the render function, in place of
+        # the handler's return value.
+        return response
+
+    def cache_response(self, response: Response, route: Route, environ: WSGIEnviron) -> Response:
+        key = self.get_cache_key(route, environ)
+        self.response_cache.set(key, response, route.cache)
+        return response
+
+    def finalize_wsgi(self, response: Response, start_response: WSGIStartResponse, environ: WSGIEnviron):
         if self.debug and response.exc_info is not None:
             exc_info = response.exc_info
             raise exc_info[0].with_traceback(exc_info[1], exc_info[2])
 
+        if self.compression is not None:
+            accept_encoding = environ.get('HTTP_ACCEPT_ENCODING')
+            response = self.compression.compress_response(response, accept_encoding)
+
         start_response(
             RESPONSE_STATUS_TEXT[response.status_code],
-            list(response.headers),
+            response.headers.items(),
             response.exc_info
         )
+        if isinstance(response, StreamingResponse):
+            return response.iter_content()
         return [response.content]
 
     def __call__(self, environ, start_response):
@@ -217,10 +338,49 @@ class App():
             state['path_params'] = path_params
             if route.standalone:
                 funcs = [route.handler]
+            elif route.cache is not None and self.can_use_cache(route, environ):
+                key = self.get_cache_key(route, environ)
+                lock = self.response_cache.get_lock(key)
+                try:
+                    # Concurrent requests wait here, rather than all running the handler.
+                    waited = not lock.acquire(blocking=False)
+                    if waited:
+                        lock.acquire()
+                    try:
+                        response = self.response_cache.get(key)
+                        if response is None and not waited:
+                            funcs = (
+                                on_request +
+                                [route.handler, self.get_render_function(route), self.cache_response] +
+                                on_response +
+                                [self.finalize_wsgi]
+                            )
+                            return self.injector.run(funcs, state)
+                    finally:
+                        lock.release()
+                finally:
+                    self.response_cache.release_lock(key)
+                if response is None:
+                    # The response we waited for couldn't be cached, so
+                    # run the handler without holding the lock.
+                    funcs = (
+                        on_request +
+                        [route.handler, self.get_render_function(route), self.cache_response] +
+                        on_response +
+                        [self.finalize_wsgi]
+                    )
+                else:
+                    state['response'] = response
+                    funcs = (
+                        on_request +
+                        [self.get_cached_response, self.get_render_function(route)] +
+                        on_response +
+                        [self.finalize_wsgi]
+                    )
             else:
                 funcs = (
                     on_request +
-                    [route.handler, self.render_response] +
+                    [route.handler, self.get_render_function(route)] +
                     on_response +
                     [self.finalize_wsgi]
                 )
@@ -271,7 +431,7 @@ class ASyncApp(App):
 
     def init_injector(self, components=None):
         components = components if components else []
-        components = list(ASGI_COMPONENTS + VALIDATION_COMPONENTS) + components
+        components = list(ASGI_COMPONENTS + VALIDATION_COMPONENTS + CONDITIONAL_COMPONENTS) + components
         initial_components = {
             'scope': ASGIScope,
             'receive': ASGIReceive,
@@ -281,14 +441,227 @@ class ASyncApp(App):
             'path_params': PathParams,
             'route': Route,
             'response': Response,
+            'deadline': Deadline,
         }
         self.injector = ASyncInjector(components, initial_components)
 
-    def init_staticfiles(self, static_url: str, static_dir: str=None, packages: typing.Sequence[str]=None):
+    def init_staticfiles(self,
+                         static_url: str,
+                         static_dir: str=None,
+                         packages: typing.Sequence[str]=None,
+                         cache_size: int=None):
         if not static_dir and not packages:
             self.statics = None
         else:
-            self.statics = ASyncStaticFiles(static_url, static_dir, packages)
+            self.statics = ASyncStaticFiles(static_url, static_dir, packages, cache_size=cache_size)
+
+    def init_response_cache(self, cache_backend: CacheBackend=None):
+        self.response_cache = ResponseCache(cache_backend, lock_class=asyncio.Lock)
+
+    def render_template_stream(self, path: str, **context):
+        return self.templates.render_template_stream_async(path, **context)
+
+    def get_cache_key(self, route: Route, scope: ASGIScope) -> str:
+        headers = {}
+        for key, value in scope['headers']:
+            key = key.decode('latin-1').lower()
+            if key in route.cache.headers:
+                headers[key] = value.decode('latin-1')
+        query_string = scope.get('query_string', b'').decode('latin-1')
+        return route.cache.get_key('GET', scope['path'], query_string, headers)
+
+    def can_use_cache(self, route: Route, scope: ASGIScope) -> bool:
+        private_headers = route.cache.private_headers
+        if not private_headers:
+            return True
+        return not any(
+            key.decode('latin-1').lower() in private_headers
+            for key, value in scope['headers']
+        )
+
+    def cache_response(self, response: Response, route: Route, scope: ASGIScope) -> Response:
+        key = self.get_cache_key(route, scope)
+        self.response_cache.set(key, response, route.cache)
+        return response
+
+    def init_request_coalescer(self):
+        self.request_coalescer = RequestCoalescer()
+
+    def init_concurrency_limit(self, concurrency_limit: ConcurrencyLimit=None):
+        self.concurrency_limit = concurrency_limit
+
+    def get_concurrency_limits(self, route: Route) -> typing.List[ConcurrencyLimit]:
+        # The route's limit is acquired first, so that requests waiting for
+        # a busy route don't hold a slot that other routes could use.
+        return [
+            limit for limit in (route.concurrency_limit, self.concurrency_limit)
+            if limit is not None
+        ]
+
+    def get_coalescing_key(self, route: Route, path_params: PathParams, scope: ASGIScope) -> str:
+        query_string = scope.get('query_string', b'').decode('latin-1')
+        return self.request_coalescer.get_key(route, path_params, query_string)
+
+    async def get_shared_response(self, route: Route, path_params: PathParams, scope: ASGIScope) -> Response:
+        """
+        Wait for the response to an identical request that is in progress,
+        raising `NotShared` if it can't be shared.
+        """
+        key = self.get_coalescing_key(route, path_params, scope)
+        future = self.request_coalescer.join(key)
+        if future is None:
+            raise NotShared()
+        # Don't cancel the shared request if this one is cancelled.
+        shared = await asyncio.shield(future)
+        if shared is None:
+            raise NotShared()
+        status_code, headers, content = shared
+        self.request_coalescer.coalesced += 1
+        return Response(content, status_code, headers)
+
+    def share_response(self,
+                       response: Response,
+                       route: Route,
+                       path_params: PathParams,
+                       scope: ASGIScope) -> Response:
+        key = self.get_coalescing_key(route, path_params, scope)
+        self.request_coalescer.share(key, response)
+        return response
+
+    async def handle_route(self,
+                           route: Route,
+                           path_params: PathParams,
+                           state: dict,
+                           on_request: list,
+                           on_response: list):
+        if route.standalone:
+            funcs = [route.handler]
+        elif route.cache is not None and self.can_use_cache(route, state['scope']):
+            key = self.get_cache_key(route, state['scope'])
+            lock = self.response_cache.get_lock(key)
+            try:
+                # Concurrent requests wait here, rather than all running the handler.
+                waited = lock.locked()
+                async with lock:
+                    response = self.response_cache.get(key)
+                    if response is None and not waited:
+                        funcs = (
+                            on_request +
+                            [route.handler, self.get_render_function(route), self.cache_response] +
+                            on_response +
+                            [self.finalize_asgi]
+                        )
+                        await self.injector.run_async(funcs, state)
+                        return
+            finally:
+                self.response_cache.release_lock(key)
+            if response is None:
+                # The response we waited for couldn't be cached, so
+                # run the handler without holding the lock.
+                funcs = (
+                    on_request +
+                    [route.handler, self.get_render_function(route), self.cache_response] +
+                    on_response +
+                    [self.finalize_asgi]
+                )
+            else:
+                state['response'] = response
+                funcs = (
+                    on_request +
+                    [self.get_cached_response, self.get_render_function(route)] +
+                    on_response +
+                    [self.finalize_asgi]
+                )
+        elif route.coalesce and self.request_coalescer.can_coalesce(route, state['scope']['headers']):
+            key = self.get_coalescing_key(route, path_params, state['scope'])
+            if not self.request_coalescer.in_progress(key):
+                self.request_coalescer.start(key)
+                try:
+                    funcs = (
+                        on_request +
+                        [route.handler, self.get_render_function(route), self.share_response] +
+                        on_response +
+                        [self.finalize_asgi]
+                    )
+                    await self.injector.run_async(funcs, state)
+                    return
+                finally:
+                    self.request_coalescer.finish(key)
+            try:
+                # The `on_request` hooks run before waiting for the shared
+                # response, so that they can reject the request.
+                funcs = (
+                    on_request +
+                    [self.get_shared_response] +
+                    on_response +
+                    [self.finalize_asgi]
+                )
+                await self.injector.run_async(funcs, state)
+                return
+            except NotShared:
+                self.request_coalescer.requests += 1
+                funcs = (
+                    [route.handler, self.get_render_function(route)] +
+                    on_response +
+                    [self.finalize_asgi]
+                )
+        else:
+            funcs = (
+                on_request +
+                [route.handler, self.get_render_function(route)] +
+                on_response +
+                [self.finalize_asgi]
+            )
+        await self.injector.run_async(funcs, state)
+
+    async def run_cancellable(self,
+                              route: Route,
+                              path_params: PathParams,
+                              state: dict,
+                              on_request: list,
+                              on_response: list,
+                              on_error: list):
+        """
+        Handle the request in a separate task, which is cancelled if the
+        route's timeout expires, or, with `cancel_on_disconnect`, if the
+        client disconnects. The `on_error` hooks are then run, and a timeout
+        results in a 503 response, which goes through the `on_response` hooks.
+        """
+        deadline = state['deadline']
+        monitor = ConnectionMonitor(state['receive'], state['send'], listen=route.cancel_on_disconnect)
+        state['receive'] = monitor.receive
+        state['send'] = monitor.send
+        task = asyncio.ensure_future(self.handle_route(route, path_params, state, on_request, on_response))
+        waiting = {task} if monitor.listener is None else {task, monitor.listener}
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    waiting, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if task in done:
+                    return task.result()
+                if not done:
+                    exc = asyncio.TimeoutError()
+                    break
+                waiting.discard(monitor.listener)
+                if monitor.disconnected:
+                    exc = asyncio.CancelledError()
+                    break
+            task.cancel()
+            # Let the handler clean up before running the `on_error` hooks.
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            monitor.close()
+
+        state['exc'] = exc
+        await self.injector.run_async(on_error, state)
+        if isinstance(exc, asyncio.TimeoutError) and not monitor.response_started:
+            state['exc'] = exceptions.ServiceUnavailable('Request timed out')
+            funcs = [self.exception_handler] + on_response + [self.finalize_asgi]
+            await self.injector.run_async(funcs, state)
 
     def __call__(self, scope):
         async def asgi_callable(receive, send):
@@ -299,7 +672,8 @@ class ASyncApp(App):
                 'exc': None,
                 'app': self,
                 'path_params': None,
-                'route': None
+                'route': None,
+                'deadline': None
             }
             method = scope['method']
             path = scope['path']
@@ -309,20 +683,19 @@ class ASyncApp(App):
             else:
                 on_request, on_response, on_error = self.get_event_hooks()
 
+            acquired = []
             try:
                 route, path_params = self.router.lookup(path, method)
                 state['route'] = route
                 state['path_params'] = path_params
-                if route.standalone:
-                    funcs = [route.handler]
+                state['deadline'] = Deadline(route.timeout)
+                for limit in self.get_concurrency_limits(route):
+                    await limit.acquire()
+                    acquired.append(limit)
+                if route.timeout is None and not route.cancel_on_disconnect:
+                    await self.handle_route(route, path_params, state, on_request, on_response)
                 else:
-                    funcs = (
-                        on_request +
-                        [route.handler, self.render_response] +
-                        on_response +
-                        [self.finalize_asgi]
-                    )
-                await self.injector.run_async(funcs, state)
+                    await self.run_cancellable(route, path_params, state, on_request, on_response, on_error)
             except Exception as exc:
                 try:
                     state['exc'] = exc
@@ -339,6 +712,9 @@ class ASyncApp(App):
                     finally:
                         funcs = [self.error_handler, self.finalize_asgi]
                         await self.injector.run_async(funcs, state)
+            finally:
+                for limit in acquired:
+                    limit.release()
         return asgi_callable
 
     async def finalize_asgi(self, response: Response, send: ASGISend, scope: ASGIScope):
@@ -347,21 +723,56 @@ class ASyncApp(App):
                 exc_info = response.exc_info
                 raise exc_info[0].with_traceback(exc_info[1], exc_info[2])
 
+        if self.compression is not None:
+            accept_encoding = None
+            for key, value in scope['headers']:
+                if key.lower() == b'accept-encoding':
+                    accept_encoding = value.decode('latin-1')
+            response = self.compression.compress_response(response, accept_encoding)
+
         await send({
             'type': 'http.response.start',
             'status': response.status_code,
-            'headers': [
-                [key.encode(), value.encode()]
-                for key, value in response.headers
-            ]
+            'headers': response.headers.raw_items()
         })
+        if isinstance(response, StreamingResponse):
+            await self.send_streaming_body(response, send)
+        else:
+            await send({
+                'type': 'http.response.body',
+                'body': response.content
+            })
+
+    async def send_streaming_body(self, response: StreamingResponse, send: ASGISend):
+        async def send_chunk(chunk):
+            chunk = response.encode_chunk(chunk)
+            if chunk:
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True
+                })
+
+        if hasattr(response.content, '__aiter__'):
+            async for chunk in response.content:
+                await send_chunk(chunk)
+        else:
+            for chunk in response.content:
+                await send_chunk(chunk)
         await send({
             'type': 'http.response.body',
-            'body': response.content
+            'body': response.encode_end()
         })
 
-    def serve(self, host, port, debug=False, **options):
+    def serve(self, host, port, debug=False, workers=None, **options):
+        """
+        Run the development server, or if `workers` is set, serve the
+        application using that many worker processes.
+        """
         self.debug = debug
+        if workers is not None:
+            serve_asgi(self, host, port, workers=workers, **options)
+            return
         if 'use_debugger' not in options:
             options['use_debugger'] = debug
         if 'use_reloader' not in options:
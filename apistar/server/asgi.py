@@ -1,6 +1,5 @@
 import typing
 from inspect import Parameter
-from urllib.parse import parse_qsl
 
 from apistar import http
 from apistar.server.components import Component
@@ -68,8 +67,7 @@ class QueryStringComponent(Component):
 class QueryParamsComponent(Component):
     def resolve(self,
                 scope: ASGIScope) -> http.QueryParams:
-        query_string = scope['query_string'].decode()
-        return http.QueryParams(parse_qsl(query_string))
+        return http.LazyQueryParams(scope['query_string'].decode())
 
 
 class QueryParamComponent(Component):
@@ -82,13 +80,36 @@ class QueryParamComponent(Component):
         return http.QueryParam(query_params[name])
 
 
+class ScopeHeaders(http.LazyHeaders):
+    """
+    The request headers, read from the raw header pairs in the ASGI scope.
+    """
+
+    def __init__(self, raw_headers: typing.Sequence[typing.Tuple[bytes, bytes]]) -> None:
+        super().__init__()
+        self.raw_headers = raw_headers
+
+    def get_items(self):
+        return [
+            (key.decode().lower(), value.decode())
+            for key, value in self.raw_headers
+        ]
+
+    def lookup(self, key: str):
+        if self._index is not None:
+            return self._index.get(key)
+        # Scan the raw headers, rather than decoding all of them.
+        raw_key = key.encode()
+        for item_key, item_value in self.raw_headers:
+            if item_key.lower() == raw_key:
+                return item_value.decode()
+        return None
+
+
 class HeadersComponent(Component):
     def resolve(self,
                 scope: ASGIScope) -> http.Headers:
-        return http.Headers([
-            (key.decode(), value.decode())
-            for key, value in scope['headers']
-        ])
+        return ScopeHeaders(scope['headers'])
 
 
 class HeaderComponent(Component):
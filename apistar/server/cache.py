@@ -0,0 +1,177 @@
+import threading
+import time
+import typing
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+
+from apistar.http import Response, StreamingResponse
+
+# A cached response, as `(status_code, headers, content)`. Cache backends
+# may need to serialize this, so it only contains builtin types.
+CachedResponse = typing.Tuple[int, typing.List[typing.Tuple[str, str]], bytes]
+
+DEFAULT_MAX_ENTRIES = 1000
+
+# Requests with these headers are likely to get a response for a particular
+# user, so they skip the cache unless the policy varies by the header.
+PRIVATE_HEADERS = ('authorization', 'cookie')
+
+
+class CachePolicy():
+    """
+    Declares that responses from a `GET` route may be cached on the server
+    for `ttl` seconds.
+
+    Responses are cached separately for each path and query string. Set
+    `query_params` to only vary the cache by the given query parameters,
+    and `headers` to also vary the cache by the given request headers.
+
+    Requests with an `Authorization` or `Cookie` header don't use the cache,
+    unless that header is included in `headers`.
+    """
+    def __init__(self,
+                 ttl: float,
+                 query_params: typing.Sequence[str]=None,
+                 headers: typing.Sequence[str]=None) -> None:
+        self.ttl = ttl
+        self.query_params = None if query_params is None else set(query_params)
+        self.headers = [header.lower() for header in headers or []]
+        self.private_headers = [header for header in PRIVATE_HEADERS if header not in self.headers]
+
+    def get_key(self,
+                method: str,
+                path: str,
+                query_string: str,
+                headers: typing.Mapping[str, str]) -> str:
+        """
+        Return the cache key for a request. `headers` should map lowercased
+        header names to their values.
+        """
+        query = parse_qsl(query_string, keep_blank_values=True)
+        if self.query_params is not None:
+            query = [(key, value) for key, value in query if key in self.query_params]
+        key = '%s:%s?%s' % (method, path, urlencode(sorted(query)))
+        for header in self.headers:
+            key += '\n%s:%s' % (header, headers.get(header, ''))
+        return key
+
+
+class CacheBackend():
+    """
+    The interface for storing cached responses.
+    """
+    def get(self, key: str) -> CachedResponse:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: CachedResponse, ttl: float):
+        raise NotImplementedError()
+
+    def delete(self, key: str):
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+
+class InMemoryCache(CacheBackend):
+    """
+    An in-process cache, which evicts the least recently used entries once
+    it holds `max_entries`.
+    """
+    def __init__(self, max_entries: int=DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl: float):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache():
+    """
+    Stores and retrieves responses for routes with a `CachePolicy`.
+
+    Each key has a lock, which should be held while a response is generated,
+    so that concurrent requests that miss the cache wait for the first one,
+    rather than all running the handler. If that response can't be cached,
+    the waiting requests then run the handler concurrently, without holding
+    the lock. `lock_class` should be `threading.Lock` for WSGI, or
+    `asyncio.Lock` for ASGI.
+    """
+    def __init__(self, backend: CacheBackend=None, lock_class=threading.Lock) -> None:
+        self.backend = InMemoryCache() if backend is None else backend
+        self.lock_class = lock_class
+        self.hits = 0
+        self.misses = 0
+        self._locks = {}  # type: typing.Dict[str, list]
+        self._locks_lock = threading.Lock()
+
+    def get(self, key: str) -> Response:
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        status_code, headers, content = value
+        # Return a new response each time, since event hooks may modify it.
+        return Response(content, status_code, headers)
+
+    def set(self, key: str, response: Response, policy: CachePolicy):
+        if not self.is_cacheable(response):
+            return
+        value = (response.status_code, list(response.headers), response.content)
+        self.backend.set(key, value, policy.ttl)
+
+    def is_cacheable(self, response: Response) -> bool:
+        if response.status_code != 200 or isinstance(response, StreamingResponse):
+            return False
+        if 'Set-Cookie' in response.headers:
+            return False
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        return 'private' not in cache_control and 'no-store' not in cache_control
+
+    def get_lock(self, key: str):
+        """
+        Return the lock for the given key. Each call must be followed
+        by a call to `release_lock()` once the lock is no longer needed.
+        """
+        with self._locks_lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [self.lock_class(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def release_lock(self, key: str):
+        with self._locks_lock:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from apistar.server.asgi import ASGIReceive, ASGISend
+
+
+class Deadline():
+    """
+    The time by which a request should be complete, for routes with a
+    `timeout`. Handlers can pass the remaining time on to downstream calls:
+
+        await asyncio.wait_for(fetch_user(user_id), deadline.remaining())
+    """
+    def __init__(self, timeout: float=None) -> None:
+        self.timeout = timeout
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """
+        Return the number of seconds left, or `None` if there is no deadline.
+        """
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class ConnectionMonitor():
+    """
+    Wraps the ASGI `receive` and `send` channels for a request, keeping
+    track of the response.
+
+    With `listen`, the request messages are read by a background task, so
+    that a client disconnecting is noticed even while the application isn't
+    reading the request body. Body messages are passed on one at a time.
+    """
+    def __init__(self, receive: ASGIReceive, send: ASGISend, listen: bool=False) -> None:
+        self._receive = receive
+        self._send = send
+        self.response_started = False
+        self.response_complete = False
+        if listen:
+            self._messages = asyncio.Queue(maxsize=1)  # type: asyncio.Queue
+            self.listener = asyncio.ensure_future(self.listen())
+            self.receive = self._messages.get
+        else:
+            self.listener = None
+            self.receive = receive
+
+    async def listen(self) -> bool:
+        """
+        Return `True` once the client disconnects, or `False` if that can't
+        be detected.
+        """
+        body_complete = False
+        while True:
+            message = await self._receive()
+            if message['type'] == 'http.disconnect':
+                return True
+            if body_complete:
+                # The server doesn't wait for a disconnect once the request
+                # body has been read.
+                return False
+            await self._messages.put(message)
+            body_complete = not message.get('more_body', False)
+
+    async def send(self, message: dict):
+        if message['type'] == 'http.response.start':
+            self.response_started = True
+        elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+            self.response_complete = True
+        await self._send(message)
+
+    @property
+    def disconnected(self) -> bool:
+        # Servers may also send a disconnect once the response is complete.
+        return (
+            self.listener is not None and
+            self.listener.done() and
+            not self.listener.cancelled() and
+            self.listener.exception() is None and
+            self.listener.result() and
+            not self.response_complete
+        )
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.cancel()
@@ -0,0 +1,76 @@
+import asyncio
+import typing
+from urllib.parse import parse_qsl, urlencode
+
+from apistar.http import Response, StreamingResponse
+from apistar.server.core import Route
+
+# Requests with these headers may get a different response to an otherwise
+# identical request, so they are never coalesced.
+UNSHARED_HEADERS = (b'authorization', b'cookie', b'if-none-match')
+
+
+class NotShared(Exception):
+    """
+    Raised when a request that waited for an identical request can't share
+    its response, and should run the handler itself.
+    """
+
+
+class RequestCoalescer():
+    """
+    Lets concurrent identical requests to routes with `coalesce=True` share
+    the response of the first request, rather than each running the handler.
+
+    Only `200 OK` responses are shared. Requests to routes with
+    `conditional=True`, and requests with an `Authorization`, `Cookie` or
+    `If-None-Match` header, are not coalesced.
+
+    The `requests` counter is the number of handler executions, and
+    `coalesced` is the number of requests that shared another's response.
+    """
+    def __init__(self) -> None:
+        self.requests = 0
+        self.coalesced = 0
+        self._in_flight = {}  # type: typing.Dict[str, asyncio.Future]
+
+    def can_coalesce(self, route: Route, headers: typing.List[typing.Tuple[bytes, bytes]]) -> bool:
+        if route.conditional:
+            return False
+        return not any(key.lower() in UNSHARED_HEADERS for key, value in headers)
+
+    def in_progress(self, key: str) -> bool:
+        return key in self._in_flight
+
+    def get_key(self, route: Route, path_params: dict, query_string: str) -> str:
+        query = sorted(parse_qsl(query_string, keep_blank_values=True))
+        return '%s:%s?%s' % (route.name, urlencode(sorted(path_params.items())), urlencode(query))
+
+    def join(self, key: str) -> asyncio.Future:
+        """
+        Return the future for an in-flight request with the given key, or
+        `None` if there is no such request, in which case the caller should
+        call `start()`, and then `finish()` once it has completed.
+        """
+        return self._in_flight.get(key)
+
+    def start(self, key: str):
+        self.requests += 1
+        self._in_flight[key] = asyncio.get_event_loop().create_future()
+
+    def share(self, key: str, response: Response):
+        future = self._in_flight.get(key)
+        if future is None or future.done():
+            return
+        if response.status_code != 200 or isinstance(response, StreamingResponse):
+            return
+        future.set_result((response.status_code, list(response.headers), response.content))
+
+    def finish(self, key: str):
+        future = self._in_flight.pop(key)
+        if not future.done():
+            # The request failed, so any waiting requests should run the handler themselves.
+            future.set_result(None)
+
+    def __len__(self):
+        return len(self._in_flight)
@@ -0,0 +1,136 @@
+import typing
+import zlib
+
+from apistar.compat import brotli
+from apistar.conneg import negotiate_content_encoding
+from apistar.http import Response, StreamingResponse
+
+# Content types are matched by prefix, against the media type of the response.
+DEFAULT_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/vnd.oai.openapi',
+    'image/svg+xml',
+)
+
+# Content encodings, in order of preference when the client accepts
+# more than one of them equally.
+DEFAULT_ENCODINGS = ('br', 'gzip', 'deflate')
+
+
+class Compressor():
+    """
+    Incrementally compresses data using one of the supported content encodings.
+    """
+    def __init__(self, encoding: str, level: int=6, brotli_quality: int=4) -> None:
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        elif encoding == 'gzip':
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS)
+        else:
+            raise ValueError('Unsupported content encoding "%s".' % encoding)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """
+        Return any buffered output, so that the data compressed so far may be
+        decompressed by the client without waiting for the rest of the stream.
+        """
+        if self.encoding == 'br':
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class ResponseCompression():
+    """
+    Compresses responses with the best content encoding accepted by the
+    client. Brotli is only used if the `brotli` package is installed.
+
+    Responses are only compressed if their media type starts with one of
+    `content_types`, and they are at least `minimum_size` bytes long.
+    Streaming responses are compressed incrementally, as they are sent.
+    """
+    def __init__(self,
+                 minimum_size: int=500,
+                 content_types: typing.Sequence[str]=DEFAULT_CONTENT_TYPES,
+                 level: int=6,
+                 brotli_quality: int=4,
+                 encodings: typing.Sequence[str]=DEFAULT_ENCODINGS) -> None:
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.encodings = [
+            encoding for encoding in encodings
+            if encoding != 'br' or brotli is not None
+        ]
+
+    def is_compressible(self, response: Response) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if 'Content-Encoding' in response.headers:
+            return False
+        if 'no-transform' in response.headers.get('Cache-Control', '').lower():
+            return False
+        media_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if not media_type.startswith(self.content_types):
+            return False
+        if isinstance(response, StreamingResponse):
+            content_length = response.headers.get('Content-Length')
+            return content_length is None or int(content_length) >= self.minimum_size
+        return len(response.content) >= self.minimum_size
+
+    def compress_response(self, response: Response, accept_encoding: str=None) -> Response:
+        """
+        Compress the response in place, given the client's 'Accept-Encoding'
+        header, and return it.
+        """
+        if not self.is_compressible(response):
+            return response
+
+        # The response would differ for other clients, even if we don't
+        # compress it for this one.
+        vary = response.headers.get('Vary')
+        if not vary:
+            response.headers['Vary'] = 'Accept-Encoding'
+        elif vary.strip() != '*' and 'accept-encoding' not in [
+            item.strip().lower() for item in vary.split(',')
+        ]:
+            response.headers['Vary'] = vary + ', Accept-Encoding'
+
+        encoding = negotiate_content_encoding(self.encodings, accept_encoding)
+        if encoding is None:
+            return response
+
+        compressor = Compressor(encoding, self.level, self.brotli_quality)
+        if isinstance(response, StreamingResponse):
+            response.content_encoder = compressor
+            if 'Content-Length' in response.headers:
+                del response.headers['Content-Length']
+        else:
+            content = compressor.compress(response.content) + compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        response.headers['Content-Encoding'] = encoding
+        etag = response.headers.get('ETag')
+        if etag is not None and not etag.startswith('W/'):
+            # The compressed body is no longer byte-for-byte identical.
+            response.headers['ETag'] = 'W/' + etag
+        return response
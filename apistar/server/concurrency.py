@@ -0,0 +1,85 @@
+import asyncio
+import collections
+import typing
+
+from apistar import exceptions
+
+
+class ConcurrencyLimit():
+    """
+    Limits the number of requests that an `ASyncApp` handles at once.
+
+    Up to `max_in_flight` requests are handled concurrently. Up to
+    `max_queued` further requests wait, in order of arrival, for up to
+    `queue_timeout` seconds. Any other requests are rejected with a
+    `503 Service Unavailable` response, with a `Retry-After` header.
+
+    The `admitted`, `queued` and `rejected` counters are the number of
+    requests that have been handled, that had to wait, and that were
+    rejected, including those that timed out while waiting.
+    """
+    def __init__(self,
+                 max_in_flight: int,
+                 max_queued: int=0,
+                 queue_timeout: float=None,
+                 retry_after: int=1) -> None:
+        assert max_in_flight >= 1, '`max_in_flight` must be at least 1.'
+        assert max_queued >= 0, '`max_queued` must not be negative.'
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self._waiters = collections.deque()  # type: typing.Deque[asyncio.Future]
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        """
+        Wait until the request may be handled, raising `ServiceUnavailable`
+        if it is rejected. Every successful call must be matched by a call
+        to `release()`.
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            raise exceptions.ServiceUnavailable(retry_after=self.retry_after)
+
+        self.queued += 1
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise exceptions.ServiceUnavailable(retry_after=self.retry_after)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as the request was cancelled.
+                self.release()
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+        self.admitted += 1
+
+    def release(self):
+        # Hand the slot directly to the next waiting request, if any.
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
@@ -0,0 +1,26 @@
+import hashlib
+
+from apistar import http
+from apistar.server.components import Component
+
+
+class ETagComponent(Component):
+    def resolve(self,
+                if_none_match: http.Header) -> http.ETag:
+        return http.ETag(if_none_match)
+
+
+def get_content_etag(content: bytes) -> str:
+    return '"%s"' % hashlib.sha1(content).hexdigest()
+
+
+def not_modified_response(etag: str) -> http.Response:
+    response = http.Response(b'', status_code=304, headers={'ETag': etag})
+    # A 304 response has no body, so it should not claim a zero length.
+    del response.headers['Content-Length']
+    return response
+
+
+CONDITIONAL_COMPONENTS = (
+    ETagComponent(),
+)
@@ -7,13 +7,32 @@ from apistar.document import Document, Field, Link, Response, Section
 
 
 class Route():
-    def __init__(self, url, method, handler, name=None, documented=True, standalone=False):
+    def __init__(self, url, method, handler, name=None, documented=True, standalone=False, conditional=False,
+                 cache=None, coalesce=False, concurrency_limit=None, timeout=None, cancel_on_disconnect=False):
+        if conditional:
+            msg = 'conditional may only be set on GET routes.'
+            assert method in ('GET', 'HEAD'), msg
+        if cache is not None:
+            msg = 'cache may only be set on GET routes.'
+            assert method == 'GET', msg
+        if coalesce:
+            msg = 'coalesce may only be set on GET routes.'
+            assert method == 'GET', msg
+        if timeout is not None:
+            msg = 'timeout must be a positive number of seconds.'
+            assert timeout > 0, msg
         self.url = url
         self.method = method
         self.handler = handler
         self.name = name or handler.__name__
         self.documented = documented
         self.standalone = standalone
+        self.conditional = conditional
+        self.cache = cache
+        self.coalesce = coalesce
+        self.concurrency_limit = concurrency_limit
+        self.timeout = timeout
+        self.cancel_on_disconnect = cancel_on_disconnect
         self.link = self.generate_link(url, method, handler, self.name)
 
     def generate_link(self, url, method, handler, name):
@@ -76,6 +95,15 @@ class Route():
                     field = Field(name=name, location='body', schema=param.annotation.validator)
                     fields.append(field)
 
+        if self.conditional:
+            field = Field(
+                name='If-None-Match',
+                location='header',
+                description='Entity tags of cached copies of the response.',
+                schema=validators.String()
+            )
+            fields.append(field)
+
         return fields
 
     def generate_response(self, handler):
@@ -1,21 +1,77 @@
+import gzip
+import hashlib
+
 from apistar import App, http
 from apistar.codecs import OpenAPICodec
+from apistar.conneg import etag_matches, negotiate_content_encoding
 from apistar.server.asgi import ASGIReceive, ASGIScope, ASGISend
 from apistar.server.wsgi import WSGIEnviron, WSGIStartResponse
 
 
-def serve_schema(app: App):
+class CachedContent():
+    """
+    A precomputed response body, served with a strong ETag.
+    A gzip compressed variant is generated on first use.
+    """
+    def __init__(self, content: bytes, content_type: str) -> None:
+        self.content = content
+        self.content_type = content_type
+        self.etag = '"%s"' % hashlib.sha1(content).hexdigest()
+        self._gzip_content = None
+
+    @property
+    def gzip_content(self) -> bytes:
+        if self._gzip_content is None:
+            self._gzip_content = gzip.compress(self.content)
+        return self._gzip_content
+
+    def get_response(self, request_headers: http.Headers) -> http.Response:
+        accept_encoding = request_headers.get('Accept-Encoding')
+        encoding = negotiate_content_encoding(['gzip'], accept_encoding)
+        if encoding == 'gzip':
+            content = self.gzip_content
+            etag = self.etag[:-1] + '-gzip"'
+        else:
+            content = self.content
+            etag = self.etag
+
+        headers = {
+            'Content-Type': self.content_type,
+            'ETag': etag,
+            'Vary': 'Accept-Encoding'
+        }
+        if etag_matches(etag, request_headers.get('If-None-Match')):
+            headers['Content-Length'] = str(len(content))
+            return http.Response(b'', status_code=304, headers=headers)
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return http.Response(content, headers=headers)
+
+
+def render_schema(app: App) -> CachedContent:
     codec = OpenAPICodec()
     content = codec.encode(app.document)
-    headers = {'Content-Type': 'application/vnd.oai.openapi'}
-    return http.Response(content, headers=headers)
+    return CachedContent(content, 'application/vnd.oai.openapi')
 
 
-def serve_documentation(app: App):
+def render_documentation(app: App) -> CachedContent:
     template_name = 'apistar/docs/index.html'
     code_style = None  # pygments_css('emacs')
-    return app.render_template(
+    content = app.render_template(
         template_name, document=app.document, langs=['javascript', 'python'], code_style=code_style)
+    return CachedContent(content.encode('utf-8'), 'text/html; charset=utf-8')
+
+
+def serve_schema(app: App, headers: http.Headers):
+    if 'schema' not in app.cached_content:
+        app.cached_content['schema'] = render_schema(app)
+    return app.cached_content['schema'].get_response(headers)
+
+
+def serve_documentation(app: App, headers: http.Headers):
+    if 'documentation' not in app.cached_content:
+        app.cached_content['documentation'] = render_documentation(app)
+    return app.cached_content['documentation'].get_response(headers)
 
 
 def serve_static_wsgi(app: App, environ: WSGIEnviron, start_response: WSGIStartResponse):
@@ -0,0 +1,239 @@
+import errno
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+import typing
+
+logger = logging.getLogger('apistar.server')
+
+# Workers that exit this soon after being started are assumed to be failing
+# on startup, and are restarted more slowly.
+MIN_WORKER_LIFETIME = 1.0
+
+
+def create_socket(host: str,
+                  port: int,
+                  reuse_port: bool=False,
+                  backlog: int=2048) -> socket.socket:
+    """
+    Create a socket bound to the given address.
+
+    With `reuse_port`, the socket is bound with `SO_REUSEPORT` but is not
+    listening, so that it reserves the address while each worker process
+    binds its own listening socket to it. Otherwise the socket is listening,
+    and is shared by every worker process.
+    """
+    family, socktype, proto, canonname, address = socket.getaddrinfo(
+        host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE
+    )[0]
+    sock = socket.socket(family, socktype, proto)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(address)
+        if not reuse_port:
+            sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def create_worker_socket(sock: socket.socket, reuse_port: bool=False, backlog: int=2048) -> socket.socket:
+    """
+    Return the listening socket for a worker process, given the socket
+    created by `create_socket()`.
+    """
+    if not reuse_port:
+        return sock
+    worker_sock = socket.socket(sock.family, sock.type, sock.proto)
+    worker_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    worker_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    worker_sock.bind(sock.getsockname())
+    worker_sock.listen(backlog)
+    sock.close()
+    return worker_sock
+
+
+def supports_reuse_port() -> bool:
+    return hasattr(socket, 'SO_REUSEPORT') and sys.platform.startswith('linux')
+
+
+class Supervisor():
+    """
+    Runs `target` in a number of worker processes, forked from the current
+    process, so that anything created before calling `run()` is shared by
+    the workers.
+
+    Workers that exit are replaced, until the supervisor is stopped.
+
+    * `SIGTERM` or `SIGINT` stops the workers gracefully, and then exits.
+    * `SIGHUP` starts a new set of workers, and then gracefully stops the
+      existing workers.
+
+    Workers are sent `SIGTERM` to stop, and should finish any requests they
+    are handling before exiting. Any that are still running after
+    `graceful_timeout` seconds are killed.
+    """
+    stop_signals = (signal.SIGTERM, signal.SIGINT)
+    restart_signals = (signal.SIGHUP,)
+
+    def __init__(self,
+                 target: typing.Callable[[], None],
+                 workers: int=1,
+                 graceful_timeout: float=30.0) -> None:
+        assert workers >= 1, '`workers` must be at least 1.'
+        if not hasattr(os, 'fork'):
+            raise RuntimeError('Worker processes are not supported on this platform.')
+        self.target = target
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.pids = {}  # type: typing.Dict[int, float]
+        self.retiring = {}  # type: typing.Dict[int, float]
+        self.signals = []  # type: typing.List[int]
+        self.spawn_delay = 0.0
+        self.stopping = False
+
+    def run(self):
+        wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(wakeup_read, False)
+        os.set_blocking(wakeup_write, False)
+        previous_wakeup_fd = signal.set_wakeup_fd(wakeup_write)
+        handled_signals = self.stop_signals + self.restart_signals + (signal.SIGCHLD,)
+        previous_handlers = {
+            signum: signal.signal(signum, self.handle_signal)
+            for signum in handled_signals
+        }
+        self.wakeup_fds = (wakeup_read, wakeup_write)
+
+        try:
+            logger.info('Starting %d worker processes. Supervisor pid: %d', self.workers, os.getpid())
+            self.spawn_workers()
+            while not self.stopping:
+                self.wait(wakeup_read)
+                self.handle_signals()
+                self.reap_workers()
+                if not self.stopping:
+                    self.spawn_workers()
+        finally:
+            self.stop_workers()
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            os.close(wakeup_read)
+            os.close(wakeup_write)
+
+    def handle_signal(self, signum, frame):
+        self.signals.append(signum)
+
+    def wait(self, wakeup_fd: int, timeout: float=1.0):
+        try:
+            select.select([wakeup_fd], [], [], timeout)
+        except InterruptedError:  # pragma: nocover
+            pass
+        try:
+            while os.read(wakeup_fd, 1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def handle_signals(self):
+        while self.signals:
+            signum = self.signals.pop(0)
+            if signum in self.stop_signals:
+                logger.info('Stopping workers.')
+                self.stopping = True
+            elif signum in self.restart_signals:
+                logger.info('Restarting workers.')
+                self.restart_workers()
+
+    def spawn_workers(self):
+        if self.spawn_delay and len(self.pids) < self.workers:
+            time.sleep(self.spawn_delay)
+        while len(self.pids) < self.workers:
+            self.spawn_worker()
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid != 0:
+            self.pids[pid] = time.monotonic()
+            return
+
+        # In the worker process.
+        exit_code = 0
+        try:
+            for signum in self.stop_signals + self.restart_signals + (signal.SIGCHLD,):
+                signal.signal(signum, signal.SIG_DFL)
+            signal.set_wakeup_fd(-1)
+            for fd in self.wakeup_fds:
+                os.close(fd)
+            self.target()
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def restart_workers(self):
+        retiring = list(self.pids)
+        self.pids = {}
+        self.spawn_workers()
+        for pid in retiring:
+            self.retiring[pid] = time.monotonic()
+            self.kill(pid, signal.SIGTERM)
+
+    def reap_workers(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                # There are no worker processes left.
+                self.pids.clear()
+                self.retiring.clear()
+                return
+            if pid == 0:
+                return
+            started = self.pids.pop(pid, None)
+            self.retiring.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            # A worker exited unexpectedly, or was recycled.
+            lifetime = time.monotonic() - started
+            failed = os.WIFSIGNALED(status) or os.WEXITSTATUS(status) != 0
+            if failed:
+                logger.warning('Worker %d exited with status %d.', pid, status)
+            if failed and lifetime < MIN_WORKER_LIFETIME:
+                self.spawn_delay = min(max(self.spawn_delay * 2, 0.1), 5.0)
+            else:
+                self.spawn_delay = 0.0
+
+    def stop_workers(self):
+        self.stopping = True
+        pids = list(self.pids) + list(self.retiring)
+        for pid in pids:
+            self.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.pids or self.retiring:
+            self.reap_workers()
+            if not (self.pids or self.retiring):
+                break
+            if time.monotonic() > deadline:
+                for pid in list(self.pids) + list(self.retiring):
+                    self.kill(pid, signal.SIGKILL)
+                deadline = float('inf')
+            time.sleep(0.05)
+
+    def kill(self, pid: int, signum: int):
+        try:
+            os.kill(pid, signum)
+        except OSError as exc:
+            if exc.errno != errno.ESRCH:  # pragma: nocover
+                raise
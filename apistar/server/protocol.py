@@ -0,0 +1,561 @@
+import asyncio
+import logging
+import time
+import typing
+from email.utils import formatdate
+from urllib.parse import unquote
+
+from apistar.server.wsgi import RESPONSE_STATUS_TEXT
+
+logger = logging.getLogger('apistar.server')
+
+MAX_HEADERS_SIZE = 65536
+# Stop reading from a connection once this much request data is buffered.
+HIGH_WATER_LIMIT = 65536
+
+STATUS_LINES = {
+    status_code: ('HTTP/1.1 %s\r\n' % status_text).encode('latin-1')
+    for status_code, status_text in RESPONSE_STATUS_TEXT.items()
+}
+
+ERROR_RESPONSES = {
+    status_code: STATUS_LINES[status_code] + (
+        b'content-type: text/plain; charset=utf-8\r\n'
+        b'content-length: %d\r\n'
+        b'connection: close\r\n\r\n%s'
+    ) % (len(RESPONSE_STATUS_TEXT[status_code]), RESPONSE_STATUS_TEXT[status_code].encode())
+    for status_code in (400, 413, 431, 500, 501, 505)
+}
+
+
+class DateHeader():
+    """
+    The 'Date' response header, which only needs formatting once a second.
+    """
+    def __init__(self) -> None:
+        self.timestamp = None  # type: int
+        self.header = b''
+
+    def get(self) -> bytes:
+        timestamp = int(time.time())
+        if timestamp != self.timestamp:
+            self.timestamp = timestamp
+            self.header = b'date: %s\r\n' % formatdate(timestamp, usegmt=True).encode()
+        return self.header
+
+
+DATE_HEADER = DateHeader()
+
+
+class ChunkedDecoder():
+    """
+    Decodes a request body sent with 'Transfer-Encoding: chunked'.
+    """
+    max_line_size = 4096
+
+    def __init__(self) -> None:
+        self.state = 'size'
+        self.remaining = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.state == 'done'
+
+    def feed(self, buffer: bytearray) -> bytes:
+        """
+        Consume as much of the buffer as possible, returning the decoded data.
+        Raises `ValueError` if the body is malformed.
+        """
+        data = bytearray()
+        while buffer and self.state != 'done':
+            if self.state == 'data':
+                chunk = buffer[:self.remaining]
+                del buffer[:len(chunk)]
+                data += chunk
+                self.remaining -= len(chunk)
+                if self.remaining == 0:
+                    self.state = 'end'
+                continue
+
+            index = buffer.find(b'\r\n')
+            if index == -1:
+                if len(buffer) > self.max_line_size:
+                    raise ValueError('Chunk line too long.')
+                break
+            line = bytes(buffer[:index])
+            del buffer[:index + 2]
+
+            if self.state == 'size':
+                size = line.split(b';', 1)[0].strip()
+                if not size or size.strip(b'0123456789abcdefABCDEF'):
+                    raise ValueError('Invalid chunk size.')
+                self.remaining = int(size, 16)
+                self.state = 'data' if self.remaining else 'trailer'
+            elif self.state == 'end':
+                if line:
+                    raise ValueError('Missing chunk terminator.')
+                self.state = 'size'
+            elif not line:
+                # The blank line at the end of the trailers.
+                self.state = 'done'
+        return bytes(data)
+
+
+class ServerState():
+    """
+    The state shared by every connection to a worker.
+
+    If `max_requests` is set, then `should_stop` is set once the worker has
+    handled that many requests, so that it can be replaced.
+    """
+    def __init__(self, max_requests: int=None) -> None:
+        self.connections = set()  # type: typing.Set[HTTPProtocol]
+        self.total_requests = 0
+        self.max_requests = max_requests
+        self.shutting_down = False
+        self.should_stop = asyncio.Event()
+
+    def request_started(self):
+        self.total_requests += 1
+        if self.max_requests is not None and self.total_requests >= self.max_requests:
+            self.should_stop.set()
+
+
+class RequestCycle():
+    """
+    A single request and response, providing the ASGI `receive` and `send`
+    callables for the request.
+    """
+    def __init__(self,
+                 protocol: 'HTTPProtocol',
+                 scope: dict,
+                 keep_alive: bool,
+                 expect_continue: bool,
+                 content_length: int,
+                 chunked: bool) -> None:
+        self.protocol = protocol
+        self.transport = protocol.transport
+        self.scope = scope
+        self.keep_alive = keep_alive
+        self.expect_continue = expect_continue
+
+        # Request body state.
+        self.body = bytearray()
+        self.remaining = content_length
+        self.decoder = ChunkedDecoder() if chunked else None
+        self.body_complete = not chunked and not content_length
+        self.request_complete = False
+        self.message_event = asyncio.Event()
+        if self.body_complete:
+            self.message_event.set()
+
+        # Response state.
+        self.disconnected = False
+        self.response_started = False
+        self.response_complete = False
+        self.chunked_response = False
+        self.pending_head = b''
+
+    def feed(self, buffer: bytearray):
+        """
+        Consume the request body from the connection buffer.
+        """
+        if self.decoder is not None:
+            self.body += self.decoder.feed(buffer)
+            self.body_complete = self.decoder.complete
+        else:
+            chunk = buffer[:self.remaining]
+            del buffer[:len(chunk)]
+            self.body += chunk
+            self.remaining -= len(chunk)
+            self.body_complete = self.remaining == 0
+        self.message_event.set()
+
+    def disconnect(self):
+        self.disconnected = True
+        self.message_event.set()
+
+    async def receive(self) -> dict:
+        if self.expect_continue and not self.response_started and not self.disconnected:
+            self.expect_continue = False
+            self.transport.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+        if not self.disconnected and not self.response_complete:
+            self.protocol.resume_reading()
+            await self.message_event.wait()
+            self.message_event.clear()
+
+        if self.disconnected or self.response_complete or self.request_complete:
+            return {'type': 'http.disconnect'}
+
+        body = bytes(self.body)
+        self.body.clear()
+        self.request_complete = self.body_complete
+        if self.body_complete:
+            # Wait for a disconnect on the next call.
+            self.message_event.clear()
+        return {'type': 'http.request', 'body': body, 'more_body': not self.body_complete}
+
+    async def send(self, message: dict):
+        if self.disconnected:
+            return
+
+        message_type = message['type']
+        if not self.response_started:
+            if message_type != 'http.response.start':
+                raise RuntimeError("Expected ASGI message 'http.response.start', but got '%s'." % message_type)
+            self.start_response(message['status'], message.get('headers', []))
+        elif not self.response_complete:
+            if message_type != 'http.response.body':
+                raise RuntimeError("Expected ASGI message 'http.response.body', but got '%s'." % message_type)
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if self.scope['method'] == 'HEAD':
+                body = b''
+            if self.chunked_response:
+                data = b'%x\r\n%s\r\n' % (len(body), body) if body else b''
+                if not more_body:
+                    data += b'0\r\n\r\n'
+            else:
+                data = body
+            if self.pending_head:
+                data = self.pending_head + data
+                self.pending_head = b''
+            if data:
+                self.transport.write(data)
+            if more_body:
+                await self.protocol.drain()
+            else:
+                self.response_complete = True
+                self.message_event.set()
+                self.protocol.on_response_complete(self)
+        else:
+            raise RuntimeError("Unexpected ASGI message '%s' after the response completed." % message_type)
+
+    def start_response(self, status: int, headers: typing.Iterable[typing.Tuple[bytes, bytes]]):
+        self.response_started = True
+        self.expect_continue = False
+        if self.protocol.state.shutting_down:
+            self.keep_alive = False
+
+        head = [STATUS_LINES.get(status) or b'HTTP/1.1 %d \r\n' % status, DATE_HEADER.get()]
+        has_content_length = False
+        for name, value in headers:
+            name = name.lower()
+            if name == b'content-length':
+                has_content_length = True
+            elif name == b'connection' and value.lower() == b'close':
+                self.keep_alive = False
+            head.append(b'%s: %s\r\n' % (name, value))
+
+        has_body = status >= 200 and status not in (204, 304) and self.scope['method'] != 'HEAD'
+        if has_body and not has_content_length:
+            if self.scope['http_version'] == '1.1':
+                self.chunked_response = True
+                head.append(b'transfer-encoding: chunked\r\n')
+            else:
+                self.keep_alive = False
+        if not self.keep_alive:
+            head.append(b'connection: close\r\n')
+        elif self.scope['http_version'] == '1.0':
+            head.append(b'connection: keep-alive\r\n')
+        head.append(b'\r\n')
+        self.pending_head = b''.join(head)
+
+    async def run(self, app):
+        try:
+            asgi_instance = app(self.scope)
+            await asgi_instance(self.receive, self.send)
+        except asyncio.CancelledError:
+            self.transport.close()
+            raise
+        except Exception:
+            logger.exception('Exception in ASGI application.')
+            if not self.response_started:
+                self.protocol.send_error(500)
+            else:
+                self.transport.close()
+        else:
+            if self.disconnected:
+                # The application may stop handling a request once the
+                # client has disconnected.
+                self.transport.close()
+            elif not self.response_started:
+                logger.error('ASGI application returned without starting a response.')
+                self.protocol.send_error(500)
+            elif not self.response_complete:
+                logger.error('ASGI application returned without completing the response.')
+                self.transport.close()
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """
+    Serves HTTP/1.1 requests on a connection to an ASGI application,
+    including keep-alive connections and pipelined requests.
+    """
+    def __init__(self,
+                 app,
+                 state: ServerState,
+                 keep_alive_timeout: float=5.0,
+                 max_body_size: int=None,
+                 root_path: str='') -> None:
+        self.app = app
+        self.state = state
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_size = max_body_size
+        self.root_path = root_path
+        self.loop = asyncio.get_event_loop()
+        self.transport = None  # type: asyncio.Transport
+        self.buffer = bytearray()
+        self.cycle = None  # type: RequestCycle
+        self.keep_alive_handle = None  # type: asyncio.Handle
+        self.reading_paused = False
+        self.writing_paused = False
+        self.drain_waiter = None  # type: asyncio.Future
+
+    # asyncio protocol interface.
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server = get_address(transport.get_extra_info('sockname'))
+        self.client = get_address(transport.get_extra_info('peername'))
+        self.scheme = 'https' if transport.get_extra_info('sslcontext') else 'http'
+        self.state.connections.add(self)
+        self.start_keep_alive_timer()
+
+    def connection_lost(self, exc):
+        self.state.connections.discard(self)
+        self.cancel_keep_alive_timer()
+        if self.cycle is not None:
+            self.cycle.disconnect()
+        self.wake_drain_waiter()
+
+    def data_received(self, data):
+        self.buffer += data
+        self.process_buffer()
+
+    def pause_writing(self):
+        self.writing_paused = True
+
+    def resume_writing(self):
+        self.writing_paused = False
+        self.wake_drain_waiter()
+
+    # Request handling.
+
+    def process_buffer(self):
+        if self.cycle is None:
+            if not self.buffer.strip(b'\r\n'):
+                # Ignore any blank lines between requests.
+                self.buffer.clear()
+                return
+            if not self.start_request():
+                return
+
+        cycle = self.cycle
+        if not cycle.body_complete:
+            try:
+                cycle.feed(self.buffer)
+            except ValueError:
+                self.send_error(400)
+                return
+            if self.max_body_size is not None and len(cycle.body) > self.max_body_size:
+                self.send_error(413)
+                return
+
+        if len(cycle.body) > HIGH_WATER_LIMIT or (cycle.body_complete and self.buffer):
+            # Let the application catch up, or finish the current request
+            # before reading any pipelined requests.
+            self.pause_reading()
+
+    def start_request(self) -> bool:
+        """
+        Parse the request line and headers, if they have been received, and
+        start running the application.
+        """
+        while self.buffer.startswith(b'\r\n'):
+            del self.buffer[:2]
+        end = self.buffer.find(b'\r\n\r\n')
+        if end == -1:
+            if len(self.buffer) > MAX_HEADERS_SIZE:
+                self.send_error(431)
+            return False
+        if end > MAX_HEADERS_SIZE:
+            self.send_error(431)
+            return False
+
+        head = bytes(self.buffer[:end])
+        del self.buffer[:end + 4]
+        try:
+            request = parse_request_head(head)
+        except ValueError:
+            self.send_error(400)
+            return False
+        method, target, http_version, headers = request
+        if http_version not in ('1.0', '1.1'):
+            self.send_error(505)
+            return False
+
+        connection = []  # type: typing.List[bytes]
+        transfer_encoding = None
+        content_lengths = set()
+        expect_continue = False
+        for name, value in headers:
+            if name == b'connection':
+                connection.extend(token.strip() for token in value.lower().split(b','))
+            elif name == b'content-length':
+                content_lengths.add(value)
+            elif name == b'transfer-encoding':
+                transfer_encoding = value.lower()
+            elif name == b'expect' and value.lower() == b'100-continue':
+                expect_continue = True
+
+        if transfer_encoding is not None:
+            if content_lengths:
+                self.send_error(400)
+                return False
+            if transfer_encoding.split(b',')[-1].strip() != b'chunked':
+                self.send_error(501)
+                return False
+        if len(content_lengths) > 1 or (content_lengths and not next(iter(content_lengths)).isdigit()):
+            self.send_error(400)
+            return False
+        content_length = int(content_lengths.pop()) if content_lengths else 0
+        if self.max_body_size is not None and content_length > self.max_body_size:
+            self.send_error(413)
+            return False
+
+        if http_version == '1.1':
+            keep_alive = b'close' not in connection
+        else:
+            keep_alive = b'keep-alive' in connection
+
+        raw_path, _, query_string = target.partition(b'?')
+        if not raw_path.startswith(b'/'):
+            if b'://' in raw_path:
+                # An absolute URL, eg. when the client is using a proxy.
+                raw_path = b'/' + raw_path.split(b'://', 1)[1].partition(b'/')[2]
+            elif raw_path != b'*':
+                self.send_error(400)
+                return False
+
+        scope = {
+            'type': 'http',
+            'http_version': http_version,
+            'method': method,
+            'scheme': self.scheme,
+            'path': unquote(raw_path.decode('latin-1')),
+            'raw_path': raw_path,
+            'root_path': self.root_path,
+            'query_string': query_string,
+            'headers': headers,
+            'server': self.server,
+            'client': self.client,
+        }
+
+        self.cancel_keep_alive_timer()
+        self.state.request_started()
+        self.cycle = RequestCycle(
+            self,
+            scope,
+            keep_alive=keep_alive and not self.state.should_stop.is_set(),
+            expect_continue=expect_continue and http_version == '1.1',
+            content_length=content_length,
+            chunked=transfer_encoding is not None
+        )
+        self.loop.create_task(self.cycle.run(self.app))
+        return True
+
+    def on_response_complete(self, cycle: RequestCycle):
+        if not cycle.keep_alive or self.transport.is_closing():
+            self.transport.close()
+            return
+        if not cycle.body_complete:
+            # The application didn't read the request body, so we don't know
+            # where the next request starts.
+            self.transport.close()
+            return
+        self.cycle = None
+        self.resume_reading()
+        self.start_keep_alive_timer()
+        if self.buffer:
+            self.loop.call_soon(self.process_buffer)
+
+    def send_error(self, status_code: int):
+        if self.transport.is_closing():
+            return
+        self.transport.write(ERROR_RESPONSES[status_code])
+        self.transport.close()
+
+    # Flow control.
+
+    def pause_reading(self):
+        if not self.reading_paused:
+            self.reading_paused = True
+            self.transport.pause_reading()
+
+    def resume_reading(self):
+        if self.reading_paused and not self.transport.is_closing():
+            self.reading_paused = False
+            self.transport.resume_reading()
+
+    async def drain(self):
+        if self.writing_paused and not self.transport.is_closing():
+            self.drain_waiter = self.loop.create_future()
+            await self.drain_waiter
+
+    def wake_drain_waiter(self):
+        waiter = self.drain_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+        self.drain_waiter = None
+
+    # Idle connections.
+
+    def start_keep_alive_timer(self):
+        self.cancel_keep_alive_timer()
+        self.keep_alive_handle = self.loop.call_later(self.keep_alive_timeout, self.close_if_idle)
+
+    def cancel_keep_alive_timer(self):
+        if self.keep_alive_handle is not None:
+            self.keep_alive_handle.cancel()
+            self.keep_alive_handle = None
+
+    def close_if_idle(self):
+        if self.cycle is None and not self.transport.is_closing():
+            self.transport.close()
+
+    def shutdown(self):
+        """
+        Close the connection once any request in progress has completed.
+        """
+        if self.cycle is None or self.cycle.response_complete:
+            self.transport.close()
+        else:
+            self.cycle.keep_alive = False
+
+
+def get_address(address) -> typing.Optional[typing.List]:
+    if isinstance(address, tuple):
+        return [str(address[0]), int(address[1])]
+    return None
+
+
+def parse_request_head(head: bytes) -> typing.Tuple[str, bytes, str, typing.List[typing.Tuple[bytes, bytes]]]:
+    """
+    Parse the request line and headers of a request, raising `ValueError`
+    if they are invalid.
+    """
+    lines = head.split(b'\r\n')
+    method, target, version = lines[0].split(b' ')
+    if not version.startswith(b'HTTP/') or not method.isalpha() or not target:
+        raise ValueError('Invalid request line.')
+
+    headers = []
+    for line in lines[1:]:
+        name, colon, value = line.partition(b':')
+        if not colon or not name or name != name.strip() or line[:1] in (b' ', b'\t'):
+            raise ValueError('Invalid header line.')
+        headers.append((name.lower(), value.strip(b' \t')))
+
+    return method.decode('ascii'), target, version[5:].decode('ascii'), headers
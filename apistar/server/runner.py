@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from apistar.compat import all_tasks, current_task, uvloop
+from apistar.server.prefork import (
+    Supervisor, create_socket, create_worker_socket, supports_reuse_port
+)
+from apistar.server.protocol import HTTPProtocol, ServerState
+
+logger = logging.getLogger('apistar.server')
+
+
+def serve_asgi(app,
+               host: str,
+               port: int,
+               workers: int=1,
+               reuse_port: bool=None,
+               backlog: int=2048,
+               keep_alive_timeout: float=5.0,
+               graceful_timeout: float=30.0,
+               max_requests: int=None,
+               max_body_size: int=None):
+    """
+    Serve an ASGI application over HTTP/1.1, using a number of worker
+    processes, each running an asyncio event loop.
+
+    If `reuse_port` is set, each worker listens on its own socket, using
+    `SO_REUSEPORT`, so that the kernel distributes connections between
+    them. It defaults to `True` on Linux, when there is more than one worker.
+    """
+    if reuse_port is None:
+        reuse_port = workers > 1 and supports_reuse_port()
+
+    def run_worker(sock):
+        run_asgi_worker(
+            app,
+            sock,
+            keep_alive_timeout=keep_alive_timeout,
+            graceful_timeout=graceful_timeout,
+            max_requests=get_max_requests(max_requests),
+            max_body_size=max_body_size
+        )
+
+    run_workers(run_worker, host, port, workers, reuse_port, backlog, graceful_timeout)
+
+
+def serve_wsgi(app,
+               host: str,
+               port: int,
+               workers: int=1,
+               threads: int=1,
+               reuse_port: bool=False,
+               backlog: int=2048,
+               keep_alive_timeout: float=5.0,
+               graceful_timeout: float=30.0,
+               max_requests: int=None,
+               access_log: bool=False):
+    """
+    Serve a WSGI application using a number of worker processes, each
+    handling requests with a pool of `threads` threads.
+
+    The workers share a single listening socket, unless `reuse_port` is set.
+    """
+    assert threads >= 1, '`threads` must be at least 1.'
+
+    def run_worker(sock):
+        run_wsgi_worker(
+            app,
+            sock,
+            threads=threads,
+            keep_alive_timeout=keep_alive_timeout,
+            max_requests=get_max_requests(max_requests),
+            access_log=access_log
+        )
+
+    run_workers(run_worker, host, port, workers, reuse_port, backlog, graceful_timeout)
+
+
+def run_workers(run_worker, host, port, workers, reuse_port, backlog, graceful_timeout):
+    logging.basicConfig(level=logging.INFO, format='[%(process)d] %(message)s')
+
+    sock = create_socket(host, port, reuse_port=reuse_port, backlog=backlog)
+    bound_host, bound_port = sock.getsockname()[:2]
+    logger.info('Listening on http://%s:%d', bound_host, bound_port)
+
+    def target():
+        run_worker(create_worker_socket(sock, reuse_port=reuse_port, backlog=backlog))
+
+    try:
+        if hasattr(os, 'fork'):
+            Supervisor(target, workers=workers, graceful_timeout=graceful_timeout).run()
+        else:
+            assert workers == 1, 'Multiple workers are not supported on this platform.'
+            target()
+    finally:
+        sock.close()
+
+
+def get_max_requests(max_requests: int=None) -> int:
+    """
+    Add up to 10% to the number of requests each worker should handle before
+    being replaced, so that the workers aren't all replaced at once.
+    """
+    if max_requests is None:
+        return None
+    return max_requests + random.SystemRandom().randint(0, max_requests // 10)
+
+
+def run_asgi_worker(app,
+                    sock,
+                    keep_alive_timeout: float=5.0,
+                    graceful_timeout: float=30.0,
+                    max_requests: int=None,
+                    max_body_size: int=None):
+    """
+    Serve requests on the listening socket until the process receives
+    `SIGTERM` or `SIGINT`, or has handled `max_requests` requests.
+    """
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    state = ServerState(max_requests=max_requests)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, state.should_stop.set)
+
+    def create_protocol():
+        return HTTPProtocol(app, state, keep_alive_timeout=keep_alive_timeout, max_body_size=max_body_size)
+
+    try:
+        server = loop.run_until_complete(loop.create_server(create_protocol, sock=sock))
+        loop.run_until_complete(state.should_stop.wait())
+        loop.run_until_complete(shutdown(server, state, graceful_timeout))
+    finally:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(signum)
+        loop.close()
+
+
+async def shutdown(server, state: ServerState, graceful_timeout: float):
+    """
+    Stop accepting connections, and wait for requests in progress to
+    complete, before closing the remaining connections.
+    """
+    state.shutting_down = True
+    server.close()
+    for connection in list(state.connections):
+        connection.shutdown()
+
+    deadline = time.monotonic() + graceful_timeout
+    while state.connections and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    for connection in list(state.connections):
+        connection.transport.close()
+    await server.wait_closed()
+
+    # Cancel any tasks that are still running, such as handlers for
+    # requests that were still in progress when the timeout expired.
+    tasks = [task for task in all_tasks() if task is not current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class WorkerRequestHandler(WSGIRequestHandler):
+    """
+    Supports keep-alive connections when the worker has more than one
+    thread, and counts the requests that the worker has handled.
+    """
+    @property
+    def protocol_version(self):
+        return 'HTTP/1.1' if self.server.keep_alive else 'HTTP/1.0'
+
+    @property
+    def timeout(self):
+        # Idle keep-alive connections each occupy a thread, so limit how
+        # long they can wait for the next request.
+        return self.server.keep_alive_timeout if self.server.keep_alive else None
+
+    def setup(self):
+        super().setup()
+        # The response headers and body are written separately, which would
+        # otherwise be delayed by Nagle's algorithm on keep-alive connections.
+        if self.server.keep_alive:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def run_wsgi(self):
+        self.server.request_started()
+        return super().run_wsgi()
+
+    def end_headers(self):
+        if self.server.stopping and not self.close_connection:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        super().end_headers()
+
+    def log_request(self, *args, **kwargs):
+        if self.server.access_log:
+            super().log_request(*args, **kwargs)
+
+
+class WorkerWSGIServer(BaseWSGIServer):
+    """
+    The WSGI server for a worker process. The main thread accepts
+    connections, which are handled by a pool of threads. No more
+    connections are accepted while every thread is busy, leaving them
+    for other workers.
+    """
+    multiprocess = True
+
+    def __init__(self,
+                 sock,
+                 app,
+                 threads: int=1,
+                 keep_alive_timeout: float=5.0,
+                 max_requests: int=None,
+                 access_log: bool=False) -> None:
+        host, port = sock.getsockname()[:2]
+        super().__init__(host, port, app, handler=WorkerRequestHandler, fd=sock.fileno())
+        self.multithread = threads > 1
+        self.keep_alive = threads > 1
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_requests = max_requests
+        self.access_log = access_log
+        self.executor = ThreadPoolExecutor(threads)
+        self.slots = threading.Semaphore(threads)
+        self.lock = threading.Lock()
+        self.total_requests = 0
+        self.stopping = False
+
+    def process_request(self, request, client_address):
+        self.slots.acquire()
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def request_started(self):
+        with self.lock:
+            self.total_requests += 1
+            limit_reached = self.max_requests is not None and self.total_requests >= self.max_requests
+        if limit_reached:
+            self.stop()
+
+    def stop(self):
+        """
+        Stop accepting connections. May be called from any thread, or from
+        a signal handler.
+        """
+        with self.lock:
+            if self.stopping:
+                return
+            self.stopping = True
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def run_wsgi_worker(app,
+                    sock,
+                    threads: int=1,
+                    keep_alive_timeout: float=5.0,
+                    max_requests: int=None,
+                    access_log: bool=False):
+    """
+    Serve requests on the listening socket until the process receives
+    `SIGTERM` or `SIGINT`, or has handled `max_requests` requests. Requests
+    in progress are completed before returning.
+    """
+    server = WorkerWSGIServer(
+        sock,
+        app,
+        threads=threads,
+        keep_alive_timeout=keep_alive_timeout,
+        max_requests=max_requests,
+        access_log=access_log
+    )
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda signum, frame: server.stop())
+    server.serve_forever()
+    server.executor.shutdown(wait=True)
@@ -1,10 +1,213 @@
+import gzip
 import os
+import threading
 import typing
+import uuid
+from collections import OrderedDict
+from email.utils import parsedate
 from http import HTTPStatus
 from importlib.util import find_spec
+from wsgiref.util import FileWrapper
 
 from apistar import exceptions
-from apistar.compat import aiofiles, whitenoise
+from apistar.compat import aiofiles, brotli, whitenoise
+from apistar.conneg import etag_matches, negotiate_content_encoding
+
+# WSGI servers that provide `wsgi.file_wrapper` will typically serve the file
+# using `os.sendfile()`, in which case the block size is unused.
+WSGI_BLOCK_SIZE = 256 * 1024
+
+# ASGI responses are sent in chunks that start small, so that the first bytes
+# go out promptly, and double in size up to the maximum.
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+
+# Defaults for the optional in-memory cache.
+DEFAULT_CACHE_MAX_FILE_SIZE = 256 * 1024
+
+NOT_ALLOWED_HEADERS = (('Allow', 'GET, HEAD'),)
+
+# Requests for more ranges than this are served as a complete response,
+# rather than as a multipart response with many small parts.
+MAX_RANGES = 16
+
+# Precompressed variants are looked up alongside the original file, and
+# preferred in this order when the client accepts more than one of them.
+COMPRESSED_EXTENSIONS = (('br', '.br'), ('gzip', '.gz'))
+
+# File types that are already compressed, and are not worth compressing again.
+SKIP_COMPRESS_EXTENSIONS = (
+    '.br', '.gz', '.zip', '.bz2', '.xz', '.tgz',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp',
+    '.woff', '.woff2', '.mp3', '.mp4', '.ogg', '.webm',
+)
+
+
+class FileResponse():
+    """
+    The status, headers, and body for a static file response.
+
+    The body is either `content`, if it has been served from the cache, or
+    else the file at `path`. If `cache` is set, then the file contents should
+    be added to the cache once they have been read.
+
+    For partial responses, `segments` is a list of the parts of the body.
+    Each part is either some bytes, or an `(offset, length)` slice of the file.
+    """
+    def __init__(self,
+                 status: HTTPStatus,
+                 headers: typing.Sequence[typing.Tuple[str, str]],
+                 path: str=None,
+                 content: bytes=None,
+                 cache: bool=False,
+                 segments: typing.List[typing.Union[bytes, typing.Tuple[int, int]]]=None):
+        self.status = status
+        self.headers = headers
+        self.path = path
+        self.content = content
+        self.cache = cache
+        self.segments = segments
+
+    def get_status_line(self) -> str:
+        return '%d %s' % (self.status.value, self.status.phrase)
+
+
+def parse_byte_ranges(range_header: str, size: int) -> typing.List[typing.Tuple[int, int]]:
+    """
+    Parse a 'Range' header against a file of the given size, returning a
+    sorted list of non-overlapping `(start, end)` byte ranges, inclusive
+    of `end`.
+
+    Returns `None` if the header should be ignored, and an empty list if
+    none of the ranges can be satisfied.
+    """
+    units, sep, range_set = range_header.partition('=')
+    if not sep or units.strip().lower() != 'bytes':
+        return None
+
+    specs = [spec.strip() for spec in range_set.split(',') if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        first, sep, last = spec.partition('-')
+        first, last = first.strip(), last.strip()
+        if not sep or not (first or last):
+            return None
+        if (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+        if not first:
+            # A suffix range, such as 'bytes=-500' for the final 500 bytes.
+            length = int(last)
+            if length > 0 and size > 0:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            end = min(int(last), size - 1) if last else size - 1
+            ranges.append((start, end))
+
+    # Coalesce any overlapping or adjacent ranges.
+    merged = []  # type: typing.List[typing.Tuple[int, int]]
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def get_header(headers: typing.Sequence[typing.Tuple[str, str]], name: str) -> str:
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def get_encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Return the ETag for a content encoded variant of a file, given the
+    ETag of the uncompressed file. For example `"abc"` -> `"abc-gzip"`.
+    """
+    if not etag.endswith('"'):
+        return etag
+    return etag[:-1] + '-' + encoding + '"'
+
+
+class StaticFilesCache():
+    """
+    A size bounded, least recently used, in-memory cache of file contents.
+
+    If `check_mtime` is set, then entries are invalidated whenever the
+    modification time of the file changes.
+    """
+    def __init__(self, max_size: int, max_file_size: int=DEFAULT_CACHE_MAX_FILE_SIZE, check_mtime: bool=False):
+        self.max_size = max_size
+        self.max_file_size = max_file_size
+        self.check_mtime = check_mtime
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def can_cache(self, file_size: int) -> bool:
+        return 0 <= file_size <= min(self.max_file_size, self.max_size)
+
+    def get_mtime(self, path: str) -> float:
+        return os.stat(path).st_mtime if self.check_mtime else None
+
+    def get(self, path: str) -> bytes:
+        mtime = self.get_mtime(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] != mtime:
+                self._remove(path)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, path: str, content: bytes, mtime: float=None):
+        """
+        Store the contents of a file. `mtime` should be determined before
+        the file is read, using `get_mtime()`.
+        """
+        if not self.can_cache(len(content)):
+            return
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = (mtime, content)
+            self.size += len(content)
+            while self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def read(self, path: str) -> bytes:
+        """
+        Read a file from disk, and store it in the cache.
+        """
+        mtime = self.get_mtime(path)
+        with open(path, 'rb') as file:
+            content = file.read()
+        self.set(path, content, mtime)
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, path: str):
+        mtime, content = self._entries.pop(path)
+        self.size -= len(content)
 
 
 class BaseStaticFiles():
@@ -14,12 +217,32 @@ class BaseStaticFiles():
 
 class StaticFiles(BaseStaticFiles):
     """
-    Static file handling for WSGI applications, using `whitenoise`.
+    Static file handling for WSGI applications, using `whitenoise`
+    to locate files and determine their headers.
+
+    Set `cache_size` to a number of bytes to enable an in-memory cache
+    for files no larger than `cache_max_file_size`. With `autorefresh`, files
+    are looked up on each request, rather than once at startup, and cached
+    files are invalidated when their modification time changes.
     """
 
-    def __init__(self, prefix: str, static_dir: str=None, packages: typing.Sequence[str]=None):
+    def __init__(self,
+                 prefix: str,
+                 static_dir: str=None,
+                 packages: typing.Sequence[str]=None,
+                 cache_size: int=None,
+                 cache_max_file_size: int=DEFAULT_CACHE_MAX_FILE_SIZE,
+                 autorefresh: bool=False):
         self.check_requirements()
-        self.whitenoise = whitenoise.WhiteNoise(application=self.not_found)
+        self.whitenoise = whitenoise.WhiteNoise(application=self.not_found, autorefresh=autorefresh)
+        if cache_size:
+            # Without autorefresh, the headers for each file are determined
+            # once, so the cached contents must not change either.
+            self.cache = StaticFilesCache(
+                cache_size, cache_max_file_size, check_mtime=self.whitenoise.autorefresh
+            )
+        else:
+            self.cache = None
         if static_dir is not None:
             self.whitenoise.add_files(static_dir, prefix=prefix)
         for package in packages or []:
@@ -32,8 +255,178 @@ class StaticFiles(BaseStaticFiles):
         if whitenoise is None:
             raise RuntimeError('`whitenoise` must be installed to use `StaticFiles`.')
 
+    def find_file(self, path: str):
+        path = path.encode('iso-8859-1', 'replace').decode('utf-8', 'replace')
+        if self.whitenoise.autorefresh:
+            return self.whitenoise.find_file(path)
+        return self.whitenoise.files.get(path)
+
+    def is_not_modified(self, static_file, etag: str, request_headers: dict) -> bool:
+        if_none_match = request_headers.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            return etag_matches(etag, if_none_match)
+        if_modified_since = request_headers.get('HTTP_IF_MODIFIED_SINCE')
+        if if_modified_since is None or static_file.last_modified is None:
+            return False
+        if_modified_since = parsedate(if_modified_since)
+        return if_modified_since is not None and if_modified_since >= static_file.last_modified
+
+    def get_response(self, static_file, method: str, request_headers: dict) -> FileResponse:
+        """
+        Return a `FileResponse` for the given static file.
+
+        `request_headers` should be a dictionary of WSGI style header names,
+        such as `HTTP_IF_NONE_MATCH`.
+        """
+        if method != 'GET' and method != 'HEAD':
+            return FileResponse(HTTPStatus.METHOD_NOT_ALLOWED, NOT_ALLOWED_HEADERS)
+
+        path, headers = self.get_path_and_headers(static_file, request_headers)
+        etag = get_header(headers, 'ETag')
+        if self.is_not_modified(static_file, etag, request_headers):
+            not_modified_headers = [
+                (key, etag if key.lower() == 'etag' else value)
+                for key, value in static_file.not_modified_response.headers
+            ]
+            return FileResponse(HTTPStatus.NOT_MODIFIED, not_modified_headers)
+
+        range_header = request_headers.get('HTTP_RANGE')
+        if method == 'GET' and range_header and self.if_range_matches(static_file, request_headers):
+            # Byte ranges always refer to the uncompressed file.
+            range_path, range_headers = self.get_path_and_headers(static_file, {})
+            size = self.get_content_length(range_headers)
+            ranges = parse_byte_ranges(range_header, size)
+            if ranges is not None:
+                return self.get_range_response(range_path, range_headers, ranges, size)
+
+        if method == 'HEAD':
+            return FileResponse(HTTPStatus.OK, headers)
+        if self.cache is not None and self.cache.can_cache(self.get_content_length(headers)):
+            content = self.cache.get(path)
+            return FileResponse(HTTPStatus.OK, headers, path, content, cache=content is None)
+        return FileResponse(HTTPStatus.OK, headers, path)
+
+    def if_range_matches(self, static_file, request_headers: dict) -> bool:
+        """
+        Determine if a 'Range' header applies, given any 'If-Range' header.
+        An ETag must match the uncompressed file's ETag exactly, and a date
+        must match the modification time exactly, otherwise the complete
+        file is served.
+        """
+        if_range = request_headers.get('HTTP_IF_RANGE')
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith(('"', 'W/')):
+            return not if_range.startswith('W/') and if_range == static_file.etag
+        if static_file.last_modified is None:
+            return False
+        return parsedate(if_range) == static_file.last_modified
+
+    def get_range_response(self, path: str, headers: typing.List[typing.Tuple[str, str]],
+                           ranges: typing.List[typing.Tuple[int, int]], size: int) -> FileResponse:
+        """
+        Return a '206 Partial Content' response for the given byte ranges.
+        Multiple ranges are sent as a 'multipart/byteranges' body.
+        """
+        if not ranges:
+            return FileResponse(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, [
+                ('Content-Range', 'bytes */%d' % size),
+                ('Content-Length', '0')
+            ])
+
+        content_type = 'application/octet-stream'
+        for key, value in headers:
+            if key.lower() == 'content-type':
+                content_type = value
+        headers = [
+            (key, value) for key, value in headers
+            if key.lower() not in ('content-length', 'content-type')
+        ]
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            headers += [
+                ('Content-Type', content_type),
+                ('Content-Range', 'bytes %d-%d/%d' % (start, end, size)),
+                ('Content-Length', str(end - start + 1))
+            ]
+            segments = [(start, end - start + 1)]  # type: typing.List[typing.Any]
+            return FileResponse(HTTPStatus.PARTIAL_CONTENT, headers, path, segments=segments)
+
+        boundary = uuid.uuid4().hex
+        segments = []
+        for index, (start, end) in enumerate(ranges):
+            part_headers = '%s--%s\r\nContent-Type: %s\r\nContent-Range: bytes %d-%d/%d\r\n\r\n' % (
+                '\r\n' if index else '', boundary, content_type, start, end, size
+            )
+            segments.append(part_headers.encode('latin-1'))
+            segments.append((start, end - start + 1))
+        segments.append(('\r\n--%s--\r\n' % boundary).encode('latin-1'))
+        content_length = sum(
+            len(segment) if isinstance(segment, bytes) else segment[1]
+            for segment in segments
+        )
+        headers += [
+            ('Content-Type', 'multipart/byteranges; boundary=%s' % boundary),
+            ('Content-Length', str(content_length))
+        ]
+        return FileResponse(HTTPStatus.PARTIAL_CONTENT, headers, path, segments=segments)
+
+    def get_path_and_headers(self, static_file, request_headers: dict):
+        """
+        Return the path and headers of the best available variant of the file,
+        given the client's 'Accept-Encoding' header. Precompressed variants are
+        only available if they have been written alongside the original file,
+        for example with `apistar compress`.
+        """
+        variants = {}
+        for encoding_re, path, headers in static_file.alternatives:
+            headers = list(headers)
+            encoding = None
+            for key, value in headers:
+                if key.lower() == 'content-encoding':
+                    encoding = value
+            variants[encoding] = (path, headers)
+
+        encodings = [encoding for encoding, extension in COMPRESSED_EXTENSIONS if encoding in variants]
+        accept_encoding = request_headers.get('HTTP_ACCEPT_ENCODING')
+        encoding = negotiate_content_encoding(encodings, accept_encoding)
+        path, headers = variants[encoding]
+        if encoding is None:
+            headers.append(('Accept-Ranges', 'bytes'))
+        else:
+            # Whitenoise uses the same ETag for every variant, but each
+            # encoding has different bytes, so needs its own strong ETag.
+            headers = [
+                (key, get_encoded_etag(value, encoding) if key.lower() == 'etag' else value)
+                for key, value in headers
+            ]
+        return path, headers
+
+    def get_content_length(self, headers: typing.Sequence[typing.Tuple[str, str]]) -> int:
+        for key, value in headers:
+            if key.lower() == 'content-length':
+                return int(value)
+        return -1
+
     def __call__(self, environ, start_response):
-        return self.whitenoise(environ, start_response)
+        static_file = self.find_file(environ.get('PATH_INFO', ''))
+        if static_file is None:
+            return self.not_found(environ, start_response)
+
+        response = self.get_response(static_file, environ['REQUEST_METHOD'], environ)
+        start_response(response.get_status_line(), list(response.headers))
+        if response.content is not None:
+            return [response.content]
+        elif response.path is None:
+            return []
+        elif response.segments is not None:
+            return iter_file_segments(response.path, response.segments)
+        elif response.cache:
+            return [self.cache.read(response.path)]
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(response.path, 'rb'), WSGI_BLOCK_SIZE)
 
     def not_found(self, environ, start_response):
         raise exceptions.NotFound()
@@ -50,21 +443,18 @@ class ASyncStaticFiles(StaticFiles):
             raise RuntimeError('`aiofiles` must be installed to use `ASyncStaticFiles`.')
 
     def __call__(self, scope):
-        path = scope['path'].encode('iso-8859-1', 'replace').decode('utf-8', 'replace')
-        if self.whitenoise.autorefresh:
-            static_file = self.whitenoise.find_file(path)
-        else:
-            static_file = self.whitenoise.files.get(path)
+        static_file = self.find_file(scope['path'])
         if static_file is None:
             async def not_found(receive, send):
                 raise exceptions.NotFound()
             return not_found
         else:
-            return ASGIFileSession(static_file, scope)
+            return ASGIFileSession(self, static_file, scope)
 
 
 class ASGIFileSession():
-    def __init__(self, static_file, scope):
+    def __init__(self, static_files, static_file, scope):
+        self.static_files = static_files
         self.static_file = static_file
         self.scope = scope
         self.headers = {}
@@ -74,51 +464,158 @@ class ASGIFileSession():
             self.headers[wsgi_key] = wsgi_value
 
     async def __call__(self, receive, send):
-        status, headers, file = await self.get_response(self.scope['method'], self.headers)
+        response = self.static_files.get_response(self.static_file, self.scope['method'], self.headers)
         await send({
             'type': 'http.response.start',
-            'status': status.value,
+            'status': response.status.value,
             'headers': [
                 (key.lower().encode(), value.encode())
-                for key, value in headers
+                for key, value in response.headers
             ]
         })
-        if file is None:
+        if response.content is not None or response.path is None:
             await send({
                 'type': 'http.response.body',
-                'body': b''
+                'body': response.content or b''
+            })
+        elif response.segments is not None:
+            await self.send_file_segments(response.path, response.segments, send)
+        elif response.cache:
+            await self.send_and_cache_file(response.path, send)
+        elif 'http.response.pathsend' in self.scope.get('extensions', {}):
+            # The server is able to send the file itself, without us having
+            # to read it into memory.
+            await send({
+                'type': 'http.response.pathsend',
+                'path': response.path
             })
         else:
-            try:
-                chunk = await file.read(8192)
-                more_body = True
+            await self.send_file(response.path, send)
+
+    async def send_and_cache_file(self, path, send):
+        cache = self.static_files.cache
+        mtime = cache.get_mtime(path)
+        file = await aiofiles.open(path, 'rb')
+        try:
+            content = await file.read()
+        finally:
+            await file.close()
+        cache.set(path, content, mtime)
+        await send({
+            'type': 'http.response.body',
+            'body': content
+        })
 
-                while more_body:
-                    next_chunk = await file.read(8192)
-                    more_body = bool(next_chunk)
+    async def send_file(self, path, send):
+        remaining = os.stat(path).st_size
+        chunk_size = MIN_CHUNK_SIZE
+        file = await aiofiles.open(path, 'rb')
+        try:
+            while True:
+                chunk = await file.read(chunk_size)
+                remaining -= len(chunk)
+                more_body = bool(chunk) and remaining > 0
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': more_body
+                })
+                if not more_body:
+                    break
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+        finally:
+            # Free resource
+            await file.close()
 
+    async def send_file_segments(self, path, segments, send):
+        file = await aiofiles.open(path, 'rb')
+        try:
+            for segment in segments:
+                if isinstance(segment, bytes):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': segment,
+                        'more_body': True
+                    })
+                    continue
+                offset, remaining = segment
+                chunk_size = MIN_CHUNK_SIZE
+                await file.seek(offset)
+                while remaining > 0:
+                    chunk = await file.read(min(remaining, chunk_size))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
                     await send({
                         'type': 'http.response.body',
                         'body': chunk,
-                        'more_body': more_body
+                        'more_body': True
                     })
-                    chunk = next_chunk
-            finally:
-                # Free resource
-                await file.close()
+                    chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+            await send({
+                'type': 'http.response.body',
+                'body': b'',
+                'more_body': False
+            })
+        finally:
+            # Free resource
+            await file.close()
 
-    async def get_response(self, method, request_headers):
-        if method != 'GET' and method != 'HEAD':
-            return (
-                HTTPStatus.METHOD_NOT_ALLOWED,
-                (('Allow', 'GET, HEAD'),),
-                None
-            )
-        elif self.static_file.file_not_modified(request_headers):
-            return self.static_file.not_modified_response
-        path, headers = self.static_file.get_path_and_headers(request_headers)
-        if method != 'HEAD':
-            file_handle = await aiofiles.open(path, 'rb')
-        else:
-            file_handle = None
-        return (HTTPStatus.OK, headers, file_handle)
+
+def iter_file_segments(path: str, segments: list) -> typing.Iterator[bytes]:
+    """
+    Yield the body of a partial response, reading only the requested
+    slices of the file.
+    """
+    with open(path, 'rb') as file:
+        for segment in segments:
+            if isinstance(segment, bytes):
+                yield segment
+                continue
+            offset, remaining = segment
+            file.seek(offset)
+            while remaining > 0:
+                chunk = file.read(min(remaining, WSGI_BLOCK_SIZE))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def compress_static_files(directory: str) -> typing.List[str]:
+    """
+    Write gzip, and brotli if it is installed, compressed variants alongside
+    each file in the given directory. Existing variants are only rewritten
+    if the original file has since been modified, and variants that are not
+    smaller than the original are not kept.
+
+    Returns a list of the paths that were written.
+    """
+    compressors = [('.gz', lambda content: gzip.compress(content, compresslevel=9))]
+    if brotli is not None:
+        compressors.append(('.br', lambda content: brotli.compress(content)))
+
+    written = []
+    for root, dirs, files in os.walk(directory):
+        for filename in files:
+            if filename.lower().endswith(SKIP_COMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            mtime = os.stat(path).st_mtime
+            content = None
+            for extension, compress in compressors:
+                compressed_path = path + extension
+                if os.path.exists(compressed_path) and os.stat(compressed_path).st_mtime >= mtime:
+                    continue
+                if content is None:
+                    with open(path, 'rb') as file:
+                        content = file.read()
+                compressed = compress(content)
+                if len(compressed) >= len(content):
+                    if os.path.exists(compressed_path):
+                        os.remove(compressed_path)
+                    continue
+                with open(compressed_path, 'wb') as file:
+                    file.write(compressed)
+                written.append(compressed_path)
+    return written
@@ -3,16 +3,98 @@ import typing
 from apistar.compat import jinja2
 
 
+class MemoryBytecodeStore(dict):
+    """
+    An in-process store for `jinja2.MemcachedBytecodeCache`, so that compiled
+    templates can be shared by every template environment in the process.
+    """
+    def set(self, key, value, timeout=None):
+        self[key] = value
+
+
+# Used by `bytecode_cache=':memory:'`.
+MEMORY_BYTECODE_STORE = MemoryBytecodeStore()
+
+
+def get_bytecode_cache(bytecode_cache=None):
+    """
+    Return a jinja2 bytecode cache, given either an existing `BytecodeCache`
+    instance, a directory to store compiled templates in, or `':memory:'`.
+    """
+    if bytecode_cache is None or isinstance(bytecode_cache, jinja2.BytecodeCache):
+        return bytecode_cache
+    elif bytecode_cache == ':memory:':
+        return jinja2.MemcachedBytecodeCache(MEMORY_BYTECODE_STORE, prefix='apistar/')
+    return jinja2.FileSystemBytecodeCache(bytecode_cache)
+
+
+# Streamed templates are sent in chunks of at least this many characters,
+# rather than in the many small pieces that jinja2 generates.
+STREAM_BUFFER_SIZE = 8192
+
+
+def buffer_chunks(chunks: typing.Iterable[str], size: int=STREAM_BUFFER_SIZE) -> typing.Iterator[str]:
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+class AsyncChunkBuffer():
+    """
+    The async equivalent of `buffer_chunks()`.
+    """
+    def __init__(self, chunks: typing.AsyncIterator[str], size: int=STREAM_BUFFER_SIZE) -> None:
+        self.chunks = chunks
+        self.size = size
+        self.done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        buffer = []
+        length = 0
+        while not self.done and length < self.size:
+            try:
+                chunk = await self.chunks.__anext__()
+            except StopAsyncIteration:
+                self.done = True
+            else:
+                buffer.append(chunk)
+                length += len(chunk)
+        if not buffer:
+            raise StopAsyncIteration()
+        return ''.join(buffer)
+
+
 class BaseTemplates():
     def render_template(self, path: str, **context):
         raise NotImplementedError()
 
+    def render_template_stream(self, path: str, **context):
+        raise NotImplementedError()
+
+    def render_template_stream_async(self, path: str, **context):
+        raise NotImplementedError()
+
+    def precompile(self):
+        raise NotImplementedError()
+
 
 class Templates(BaseTemplates):
     def __init__(self,
                  template_dir: str=None,
                  packages: typing.Sequence[str]=None,
-                 global_context: dict=None):
+                 global_context: dict=None,
+                 bytecode_cache=None):
         if jinja2 is None:
             raise RuntimeError('`jinja2` must be installed to use `Templates`.')
 
@@ -28,10 +110,55 @@ class Templates(BaseTemplates):
                 loader
             ])
 
-        self.env = jinja2.Environment(autoescape=True, loader=loader)
+        self.env = jinja2.Environment(
+            autoescape=True,
+            loader=loader,
+            bytecode_cache=get_bytecode_cache(bytecode_cache)
+        )
         for key, value in global_context.items():
             self.env.globals[key] = value
+        self.async_env = None
 
     def render_template(self, path: str, **context):
         template = self.env.get_template(path)
         return template.render(**context)
+
+    def render_template_stream(self, path: str, **context) -> typing.Iterator[str]:
+        """
+        Render a template incrementally, returning an iterator of strings.
+        """
+        template = self.env.get_template(path)
+        return buffer_chunks(template.generate(**context))
+
+    def render_template_stream_async(self, path: str, **context) -> typing.AsyncIterator[str]:
+        """
+        Render a template incrementally, returning an async iterator of strings.
+        """
+        if self.async_env is None:
+            # Templates are compiled differently for async rendering, so
+            # this environment doesn't share the bytecode cache.
+            self.async_env = jinja2.Environment(autoescape=True, loader=self.env.loader, enable_async=True)
+            self.async_env.globals = self.env.globals
+        template = self.async_env.get_template(path)
+        return AsyncChunkBuffer(template.generate_async(**context))
+
+    def precompile(self) -> typing.List[str]:
+        """
+        Compile every template, so that the first request to use each one
+        doesn't have to. Returns the names of the compiled templates.
+
+        Template directories may also hold other files, such as images, so
+        any file that can't be compiled as a template is skipped.
+        """
+        names = self.env.list_templates()
+        # Ensure the environment is large enough to keep them all.
+        if self.env.cache is not None and len(names) > self.env.cache.capacity:
+            self.env.cache = jinja2.utils.LRUCache(len(names))
+        compiled = []
+        for name in names:
+            try:
+                self.env.get_template(name)
+            except (UnicodeDecodeError, jinja2.TemplateSyntaxError):
+                continue
+            compiled.append(name)
+        return compiled
@@ -1,7 +1,6 @@
 import typing
 from http import HTTPStatus
 from inspect import Parameter
-from urllib.parse import parse_qsl
 from wsgiref.util import request_uri
 
 from werkzeug.wsgi import get_input_stream
@@ -69,8 +68,7 @@ class QueryStringComponent(Component):
 class QueryParamsComponent(Component):
     def resolve(self,
                 environ: WSGIEnviron) -> http.QueryParams:
-        query_string = environ.get('QUERY_STRING', '')
-        return http.QueryParams(parse_qsl(query_string))
+        return http.LazyQueryParams(environ.get('QUERY_STRING', ''))
 
 
 class QueryParamComponent(Component):
@@ -83,18 +81,41 @@ class QueryParamComponent(Component):
         return http.QueryParam(query_params[name])
 
 
-class HeadersComponent(Component):
-    def resolve(self,
-                environ: WSGIEnviron) -> http.Headers:
+class EnvironHeaders(http.LazyHeaders):
+    """
+    The request headers, read directly from the WSGI environ.
+    """
+
+    def __init__(self, environ: WSGIEnviron) -> None:
+        super().__init__()
+        self.environ = environ
+
+    def get_items(self):
         header_items = []
-        for key, value in environ.items():
+        for key, value in self.environ.items():
             if key.startswith('HTTP_'):
                 header = (key[5:].lower().replace('_', '-'), value)
                 header_items.append(header)
             elif key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
                 header = (key.lower().replace('_', '-'), value)
                 header_items.append(header)
-        return http.Headers(header_items)
+        return header_items
+
+    def lookup(self, key: str):
+        if '_' in key:
+            # Underscores and hyphens are indistinguishable in environ keys.
+            return self._dict.get(key)
+        if key in ('content-type', 'content-length'):
+            environ_key = key.upper().replace('-', '_')
+        else:
+            environ_key = 'HTTP_' + key.upper().replace('-', '_')
+        return self.environ.get(environ_key)
+
+
+class HeadersComponent(Component):
+    def resolve(self,
+                environ: WSGIEnviron) -> http.Headers:
+        return EnvironHeaders(environ)
 
 
 class HeaderComponent(Component):
@@ -165,7 +165,7 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
                 raw_kwargs['preload_content'] = False
                 raw_kwargs['original_response'] = _MockOriginalResponse(raw_kwargs['headers'])
             elif message['type'] == 'http.response.body':
-                raw_kwargs['body'] = io.BytesIO(message['body'])
+                body_chunks.append(message.get('body', b''))
             elif message['type'] == 'http.disconnect':
                 pass
             elif message['type'] == 'http.exc_info':
@@ -175,11 +175,13 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
                 raise Exception("Unknown ASGI message type: %s" % message['type'])
 
         raw_kwargs = {}
+        body_chunks = []
         connection = self.app(scope)
 
         loop = asyncio.get_event_loop()
         loop.run_until_complete(connection(receive, send))
 
+        raw_kwargs['body'] = io.BytesIO(b''.join(body_chunks))
         raw = requests.packages.urllib3.HTTPResponse(**raw_kwargs)
         return self.build_response(request, raw)
 
@@ -1,5 +1,10 @@
-from apistar.tokenize.tokenize_json import tokenize_json
+from apistar.tokenize.tokenize_json import index_json, tokenize_json
 from apistar.tokenize.tokenize_yaml import tokenize_yaml
-from apistar.tokenize.tokens import DictToken, ListToken, ScalarToken
+from apistar.tokenize.tokens import (
+    DictToken, ListToken, ScalarToken, Token, TokenIndex
+)
 
-__all__ = ['DictToken', 'ListToken', 'ScalarToken', 'tokenize_json', 'tokenize_yaml', ]
+__all__ = [
+    'DictToken', 'ListToken', 'ScalarToken', 'Token', 'TokenIndex',
+    'index_json', 'tokenize_json', 'tokenize_yaml',
+]
@@ -1,7 +1,11 @@
+import json
 import re
+from array import array
 from json.decoder import JSONDecodeError, JSONDecoder, scanstring
 
-from apistar.tokenize.tokens import DictToken, ListToken, ScalarToken
+from apistar.tokenize.tokens import (
+    DictToken, ListToken, ScalarToken, TokenIndex
+)
 
 FLAGS = re.VERBOSE | re.MULTILINE | re.DOTALL
 WHITESPACE = re.compile(r'[ \t\n\r]*', FLAGS)
@@ -9,6 +13,11 @@ WHITESPACE_STR = ' \t\n\r'
 NUMBER_RE = re.compile(
     r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?',
     (re.VERBOSE | re.MULTILINE | re.DOTALL))
+# Strings, brackets, and any other run of non-separator characters.
+# Whitespace, ',' and ':' are skipped over.
+OFFSET_RE = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|[^ \t\n\r{}\[\],:"]+',
+    re.DOTALL)
 
 
 def _TokenizingJSONObject(s_and_end, strict, scan_once,
@@ -27,7 +36,7 @@ def _TokenizingJSONObject(s_and_end, strict, scan_once,
             nextchar = s[end:end + 1]
         # Trivial empty object
         if nextchar == '}':
-            return {}, end + 1
+            return [], end + 1
         elif nextchar != '"':
             raise JSONDecodeError(
                 "Expecting property name enclosed in double quotes", s, end)
@@ -77,7 +86,7 @@ def _TokenizingJSONObject(s_and_end, strict, scan_once,
         if nextchar != '"':
             raise JSONDecodeError(
                 "Expecting property name enclosed in double quotes", s, end - 1)
-    return dict(pairs), end
+    return pairs, end
 
 
 def _make_scanner(context):
@@ -148,3 +157,71 @@ class _TokenizingDecoder(JSONDecoder):
 def tokenize_json(content):
     decoder = _TokenizingDecoder()
     return decoder.decode(content)
+
+
+def index_json(content):
+    """
+    Return a `TokenIndex` for the given JSON content.
+
+    Values are decoded by the standard `json` module, and positions are
+    determined by a single lightweight scan over the content.
+    """
+    value = json.loads(content)
+
+    rows = {}
+    starts = array('l')
+    ends = array('l')
+    key_starts = array('l')
+    key_ends = array('l')
+
+    stack = []
+    parent = -1
+    in_dict = False
+    expect_key = False
+    key = None
+    key_start = key_end = -1
+    counter = 0
+    row = -1
+
+    for match in OFFSET_RE.finditer(content):
+        start, end = match.span()
+        char = content[start]
+
+        if char == '}' or char == ']':
+            ends[parent] = start
+            parent, in_dict, counter = stack.pop()
+            expect_key = in_dict
+            continue
+
+        if expect_key:
+            key = content[start + 1:end - 1]
+            if '\\' in key:
+                key = json.loads(content[start:end])
+            key_start, key_end = start, end - 1
+            expect_key = False
+            continue
+
+        row += 1
+        if in_dict:
+            rows[parent, key] = row
+            key_starts.append(key_start)
+            key_ends.append(key_end)
+            expect_key = True
+        else:
+            # List items, and the top level value, are keyed by index.
+            rows[parent, counter] = row
+            key_starts.append(-1)
+            key_ends.append(-1)
+            counter += 1
+        starts.append(start)
+
+        if char == '{' or char == '[':
+            ends.append(-1)
+            stack.append((parent, in_dict, counter))
+            parent = row
+            in_dict = expect_key = char == '{'
+            counter = 0
+        else:
+            ends.append(end - 1)
+
+    return TokenIndex(value, rows, starts, ends, key_starts, key_ends)
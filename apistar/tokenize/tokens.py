@@ -2,6 +2,8 @@ from typing import List, Union
 
 
 class Token():
+    __slots__ = ('value', 'start', 'end')
+
     def __init__(self, value, start: int, end: int):
         self.value = value
         self.start = start
@@ -27,6 +29,8 @@ class Token():
 
 
 class ScalarToken(Token):
+    __slots__ = ()
+
     def lookup(self, keys: List[Union[str, int]], lookup_property: bool=False) -> Token:
         if not keys:
             return self
@@ -37,26 +41,78 @@ class ScalarToken(Token):
 
 
 class DictToken(Token):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.keys = {k.value: k for k in self.value.keys()}
-        self.values = {k.value: v for k, v in self.value.items()}
+    """
+    A mapping token. Accepts either a dict or a sequence of two-tuples of
+    key tokens to value tokens, which are held as a single mapping of
+    `key -> (key_token, value_token)`.
+    """
+    __slots__ = ('_mapping',)
+
+    def __init__(self, value, start: int, end: int):
+        if hasattr(value, 'items'):
+            value = value.items()
+        self._mapping = {key.value: (key, val) for key, val in value}
+        self.start = start
+        self.end = end
+
+    @property
+    def value(self):
+        return dict(self._mapping.values())
 
     def lookup(self, keys: List[Union[str, int]], lookup_property: bool=False) -> Token:
         if not keys:
             return self
-        elif len(keys) == 1:
-            if lookup_property:
-                return self.keys[keys[0]]
-            else:
-                return self.values[keys[0]]
-        return self.values[keys[0]].lookup(keys[1:], lookup_property)
+        key_token, value_token = self._mapping[keys[0]]
+        if len(keys) == 1:
+            return key_token if lookup_property else value_token
+        return value_token.lookup(keys[1:], lookup_property)
 
 
 class ListToken(Token):
+    __slots__ = ()
+
     def lookup(self, keys: List[Union[str, int]], lookup_property: bool=False) -> Token:
         if not keys:
             return self
         elif len(keys) == 1:
             return self.value[keys[0]]
         return self.value[keys[0]].lookup(keys[1:], lookup_property)
+
+
+class TokenIndex():
+    """
+    A compact alternative to a tree of tokens.
+
+    Positions are held in parallel arrays, indexed by row. Each row is
+    reachable from the mapping of `(parent_row, key)` pairs, with the top
+    level value keyed as `(-1, 0)`. `lookup` provides the same interface as
+    `Token.lookup`, building a token only for the path that is requested.
+    """
+    def __init__(self, value, rows, starts, ends, key_starts, key_ends):
+        self.value = value
+        self.rows = rows
+        self.starts = starts
+        self.ends = ends
+        self.key_starts = key_starts
+        self.key_ends = key_ends
+
+    @property
+    def start(self):
+        return self.starts[0]
+
+    @property
+    def end(self):
+        return self.ends[0]
+
+    def lookup(self, keys: List[Union[str, int]], lookup_property: bool=False) -> Token:
+        row = self.rows[-1, 0]
+        value = self.value
+        for key in keys:
+            row = self.rows[row, key]
+            value = value[key]
+        if keys and lookup_property and self.key_starts[row] >= 0:
+            return ScalarToken(keys[-1], self.key_starts[row], self.key_ends[row])
+        return Token(value, self.starts[row], self.ends[row])
+
+    def __len__(self):
+        return len(self.starts)
@@ -0,0 +1,66 @@
+"""
+Compare the CPU cost of compressing a large JSON response against the
+number of bytes saved, for each content encoding and compression level.
+
+Usage: python benchmarks/compression.py [size_in_mb] [iterations]
+"""
+import sys
+import time
+
+from apistar.compat import brotli
+from apistar.http import JSONResponse
+from apistar.server.compression import Compressor
+
+
+def build_content(size):
+    rows = []
+    index = 0
+    approximate_size = 2
+    while approximate_size < size:
+        row = {
+            'id': index,
+            'name': 'Item %d' % index,
+            'description': 'A description of item number %d.' % index,
+            'price': round(index * 1.37, 2),
+            'tags': ['tag-%d' % (index % 17), 'tag-%d' % (index % 5)],
+            'active': index % 3 != 0,
+        }
+        rows.append(row)
+        approximate_size += len(JSONResponse(row).content) + 1
+        index += 1
+    return JSONResponse(rows).content
+
+
+def measure(encoding, level, content, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if encoding == 'br':
+            compressor = Compressor(encoding, brotli_quality=level)
+        else:
+            compressor = Compressor(encoding, level=level)
+        compressed = compressor.compress(content) + compressor.finish()
+    elapsed = (time.perf_counter() - started) / iterations
+    saved = 1.0 - len(compressed) / len(content)
+    print('%-8s %5d %10d %9.1f%% %9.1fms %9.1f MB/s' % (
+        encoding, level, len(compressed), saved * 100, elapsed * 1000,
+        len(content) / elapsed / 1e6
+    ))
+
+
+def main(size_in_mb=2.0, iterations=5):
+    content = build_content(int(size_in_mb * 1e6))
+    print('JSON: %.1f MB, %d iterations' % (len(content) / 1e6, iterations))
+    print('%-8s %5s %10s %10s %11s %14s' % ('encoding', 'level', 'bytes', 'saved', 'cpu', 'throughput'))
+    for level in (1, 6, 9):
+        measure('gzip', level, content, int(iterations))
+    for level in (1, 6, 9):
+        measure('deflate', level, content, int(iterations))
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            measure('br', quality, content, int(iterations))
+    else:
+        print('brotli is not installed.')
+
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:]])
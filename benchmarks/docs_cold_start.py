@@ -0,0 +1,87 @@
+"""
+Measure the cold start cost of the API documentation page, with and without
+a template bytecode cache and startup precompilation. Each scenario runs in
+a fresh process.
+
+Usage: python benchmarks/docs_cold_start.py [endpoints]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = [
+    ('no cache', {}),
+    ('bytecode cache (empty)', {'cache': True}),
+    ('bytecode cache (warm)', {'cache': True}),
+    ('precompile', {'precompile': True}),
+    ('precompile + bytecode cache (warm)', {'cache': True, 'precompile': True}),
+]
+
+
+def build_routes(endpoints):
+    from apistar import Route
+
+    routes = []
+    for index in range(endpoints):
+        def handler(item_id: int, search: str=None) -> dict:
+            """
+            Return a single item.
+            """
+            return {}
+        routes.append(Route('/items-%d/{item_id}/' % index, 'GET', handler, name='item_%d' % index))
+    return routes
+
+
+def wsgi_request(app, path):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'wsgi.url_scheme': 'http',
+    }
+
+    def start_response(status, headers, exc_info=None):
+        assert status.startswith('200'), status
+
+    return b''.join(app(environ, start_response))
+
+
+def child(endpoints, cache_dir, precompile):
+    from apistar import App
+
+    routes = build_routes(endpoints)
+    started = time.perf_counter()
+    app = App(routes=routes, template_bytecode_cache=cache_dir, precompile_templates=precompile)
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    wsgi_request(app, '/docs/')
+    first_request = time.perf_counter() - started
+    print('%f %f' % (startup, first_request))
+
+
+def main(endpoints=600):
+    cache_dir = tempfile.mkdtemp()
+    print('Documentation for %d endpoints' % endpoints)
+    print('%-36s %10s %14s' % ('scenario', 'startup', 'first request'))
+    for name, options in SCENARIOS:
+        args = [
+            sys.executable, __file__, '--child', str(endpoints),
+            cache_dir if options.get('cache') else '',
+            '1' if options.get('precompile') else ''
+        ]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output(args, env=env).decode()
+        startup, first_request = [float(value) for value in output.split()]
+        print('%-36s %9.0fms %13.0fms' % (name, startup * 1000, first_request * 1000))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(int(sys.argv[2]), sys.argv[3] or None, bool(sys.argv[4]))
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,32 @@
+"""
+Sample documents shared by the benchmark scripts.
+"""
+import json
+
+
+def build_document(size):
+    """
+    Return an OpenAPI-like document of roughly `size` bytes when serialized.
+    """
+    paths = {}
+    document = {
+        'openapi': '3.0.0',
+        'info': {'title': 'Benchmark', 'version': '1.0'},
+        'paths': paths
+    }
+    index = 0
+    while len(json.dumps(document, indent=2)) < size:
+        for _ in range(500):
+            paths['/items/%d/{pk}/' % index] = {
+                'get': {
+                    'operationId': 'get_item_%d' % index,
+                    'tags': ['items', 'benchmark'],
+                    'parameters': [
+                        {'name': 'pk', 'in': 'path', 'required': True, 'schema': {'type': 'integer'}},
+                        {'name': 'page', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1}},
+                    ],
+                    'responses': {'200': {'description': 'OK'}}
+                }
+            }
+            index += 1
+    return document
@@ -0,0 +1,83 @@
+"""
+Measure request throughput for a "hello world" JSON route, calling the WSGI
+and ASGI applications directly, without a server.
+
+Usage: python benchmarks/hello_world.py [iterations]
+"""
+import asyncio
+import sys
+import time
+
+from apistar import App, ASyncApp, Route
+
+
+def hello_world() -> dict:
+    return {'hello': 'world'}
+
+
+async def async_hello_world() -> dict:
+    return {'hello': 'world'}
+
+
+def run_wsgi(iterations):
+    app = App(routes=[Route('/', 'GET', hello_world)], docs_url=None)
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': '/',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'testserver',
+        'HTTP_ACCEPT': '*/*',
+        'wsgi.url_scheme': 'http',
+    }
+
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        b''.join(app(environ, start_response))
+    return time.perf_counter() - started
+
+
+def run_asgi(iterations):
+    app = ASyncApp(routes=[Route('/', 'GET', async_hello_world)], docs_url=None)
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'root_path': '',
+        'scheme': 'http',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'accept', b'*/*')],
+        'server': ['testserver', 80],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        pass
+
+    async def run():
+        for _ in range(iterations):
+            await app(scope)(receive, send)
+
+    loop = asyncio.get_event_loop()
+    started = time.perf_counter()
+    loop.run_until_complete(run())
+    return time.perf_counter() - started
+
+
+def main(iterations=20000):
+    for name, func in [('WSGI', run_wsgi), ('ASGI', run_asgi)]:
+        # Warm up, then take the best of three runs.
+        func(iterations // 10)
+        seconds = min(func(iterations) for _ in range(3))
+        print('%s %8.0f requests/s %8.2fus/request' % (name, iterations / seconds, seconds / iterations * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,66 @@
+"""
+Measure the cost of the query parameters for a search URL with many filter
+parameters, comparing the lazy, indexed `QueryParams` with parsing the query
+string eagerly and scanning all of the parameters for each `get_list()`.
+
+Usage: python benchmarks/query_params.py [parameters]
+"""
+import sys
+import timeit
+from urllib.parse import parse_qsl, urlencode
+
+from apistar import http
+
+
+class EagerQueryParams(http.QueryParams):
+    def get_list(self, key):
+        return [
+            item_value for item_key, item_value in self._list
+            if item_key == key
+        ]
+
+
+def get_query_string(parameters):
+    items = []
+    for index in range(parameters):
+        items.append(('filter_%d' % (index % (parameters // 4 or 1)), 'value %d' % index))
+    return urlencode(items)
+
+
+def unused(query_params):
+    return None
+
+
+def single_param(query_params):
+    return query_params.get('filter_0')
+
+
+def all_filters(query_params):
+    return [query_params.get_list(key) for key in set(query_params.keys())]
+
+
+def main(parameters=200):
+    query_string = get_query_string(parameters)
+    scenarios = [
+        ('not accessed', unused),
+        ('one parameter', single_param),
+        ('get_list() per key', all_filters),
+    ]
+    print('Query string with %d parameters (%d bytes)' % (parameters, len(query_string)))
+    print('%-20s %12s %12s' % ('scenario', 'eager', 'lazy'))
+    for name, func in scenarios:
+        def eager():
+            return func(EagerQueryParams(parse_qsl(query_string)))
+
+        def lazy():
+            return func(http.LazyQueryParams(query_string))
+
+        results = []
+        for implementation in (eager, lazy):
+            seconds = min(timeit.repeat(implementation, number=1000, repeat=5))
+            results.append(seconds / 1000 * 1e6)
+        print('%-20s %10.1fus %10.1fus' % (name, results[0], results[1]))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
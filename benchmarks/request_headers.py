@@ -0,0 +1,141 @@
+"""
+Measure the per-request overhead of the request headers, for a handler that
+reads a single header, comparing the lazy header views with eagerly decoding
+and indexing every header.
+
+Usage: python benchmarks/request_headers.py [iterations]
+"""
+import asyncio
+import sys
+import timeit
+
+from apistar import App, ASyncApp, Route, http
+from apistar.server import asgi, wsgi
+
+BROWSER_HEADERS = [
+    ('host', 'example.com'),
+    ('connection', 'keep-alive'),
+    ('cache-control', 'max-age=0'),
+    ('upgrade-insecure-requests', '1'),
+    ('user-agent', 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/70.0 Safari/537.36'),
+    ('accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'),
+    ('accept-encoding', 'gzip, deflate, br'),
+    ('accept-language', 'en-GB,en-US;q=0.9,en;q=0.8'),
+    ('cookie', 'sessionid=0123456789abcdef; csrftoken=fedcba9876543210'),
+    ('if-none-match', 'W/"5c0a1b2c"'),
+    ('x-forwarded-for', '203.0.113.7'),
+    ('x-request-id', 'e3b0c44298fc1c149afbf4c8996fb924'),
+]
+
+
+def get_environ():
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': '/',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for key, value in BROWSER_HEADERS:
+        environ['HTTP_' + key.upper().replace('-', '_')] = value
+    return environ
+
+
+def get_scope():
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'root_path': '',
+        'scheme': 'http',
+        'query_string': b'',
+        'headers': [(key.encode(), value.encode()) for key, value in BROWSER_HEADERS],
+        'server': ['testserver', 80],
+    }
+
+
+def eager_wsgi_headers(environ):
+    header_items = []
+    for key, value in environ.items():
+        if key.startswith('HTTP_'):
+            header_items.append((key[5:].lower().replace('_', '-'), value))
+        elif key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            header_items.append((key.lower().replace('_', '-'), value))
+    return http.Headers(header_items)
+
+
+def eager_asgi_headers(scope):
+    return http.Headers([
+        (key.decode(), value.decode())
+        for key, value in scope['headers']
+    ])
+
+
+def read_header(headers):
+    if 'user-agent' in headers:
+        return headers['user-agent']
+
+
+def run_components(iterations):
+    environ = get_environ()
+    scope = get_scope()
+    scenarios = [
+        ('WSGI eager', lambda: read_header(eager_wsgi_headers(environ))),
+        ('WSGI lazy', lambda: read_header(wsgi.EnvironHeaders(environ))),
+        ('ASGI eager', lambda: read_header(eager_asgi_headers(scope))),
+        ('ASGI lazy', lambda: read_header(asgi.ScopeHeaders(scope['headers']))),
+    ]
+    print('Headers for one request, reading a single header')
+    for name, func in scenarios:
+        seconds = min(timeit.repeat(func, number=iterations, repeat=5))
+        print('%-12s %8.2fus' % (name, seconds / iterations * 1e6))
+
+
+def user_agent(user_agent: http.Header) -> dict:
+    return {'user_agent': user_agent}
+
+
+def run_apps(iterations):
+    routes = [Route('/', 'GET', user_agent)]
+    app = App(routes=routes, docs_url=None)
+    async_app = ASyncApp(routes=routes, docs_url=None)
+    environ = get_environ()
+    scope = get_scope()
+
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    def wsgi_request():
+        return b''.join(app(environ, start_response))
+
+    loop = asyncio.get_event_loop()
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        pass
+
+    def asgi_request():
+        loop.run_until_complete(async_app(scope)(receive, send))
+
+    print('Complete request to a handler reading a single header')
+    for name, func in [('WSGI', wsgi_request), ('ASGI', asgi_request)]:
+        seconds = min(timeit.repeat(func, number=iterations // 10, repeat=5))
+        print('%-12s %8.2fus' % (name, seconds / (iterations // 10) * 1e6))
+
+
+def main(iterations=100000):
+    run_components(iterations)
+    run_apps(iterations)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
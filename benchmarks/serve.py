@@ -0,0 +1,118 @@
+"""
+Measure the request throughput of `app.serve()` over HTTP, for a "hello
+world" JSON route, using a simple load generator with keep-alive connections.
+
+Each scenario runs the server in a separate process. Note that the load
+generator shares the machine with the server, so use a machine with spare
+cores when comparing numbers of workers.
+
+Usage: python benchmarks/serve.py [seconds] [connections]
+"""
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+SCENARIOS = [
+    ('App, development server', 'wsgi', None),
+    ('App, 1 worker, 8 threads', 'wsgi', 1),
+    ('ASyncApp, development server', 'asgi', None),
+    ('ASyncApp, 1 worker', 'asgi', 1),
+]
+if os.cpu_count() > 1:
+    SCENARIOS.insert(2, ('App, %d workers, 8 threads' % os.cpu_count(), 'wsgi', os.cpu_count()))
+    SCENARIOS.append(('ASyncApp, %d workers' % os.cpu_count(), 'asgi', os.cpu_count()))
+
+REQUEST = b'GET / HTTP/1.1\r\nHost: localhost\r\n\r\n'
+
+
+def run_server(interface, port, workers):
+    from apistar import App, ASyncApp, Route
+
+    def hello_world() -> dict:
+        return {'hello': 'world'}
+
+    async def async_hello_world() -> dict:
+        return {'hello': 'world'}
+
+    if interface == 'asgi':
+        app = ASyncApp(routes=[Route('/', 'GET', async_hello_world)], docs_url=None)
+    else:
+        app = App(routes=[Route('/', 'GET', hello_world)], docs_url=None)
+    if workers is None:
+        app.serve('127.0.0.1', port, threaded=True)
+    elif interface == 'asgi':
+        app.serve('127.0.0.1', port, workers=workers)
+    else:
+        app.serve('127.0.0.1', port, workers=workers, threads=8)
+
+
+async def client(port, deadline, counts):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while time.monotonic() < deadline:
+        writer.write(REQUEST)
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = 0
+        for line in head.lower().split(b'\r\n'):
+            if line.startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        await reader.readexactly(length)
+        counts.append(1)
+        if head.startswith(b'HTTP/1.0') or b'connection: close' in head.lower():
+            writer.close()
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.close()
+
+
+def run_load(port, seconds, connections):
+    loop = asyncio.get_event_loop()
+    counts = []
+    deadline = time.monotonic() + seconds
+    loop.run_until_complete(asyncio.gather(*[
+        client(port, deadline, counts) for _ in range(connections)
+    ]))
+    return len(counts) / seconds
+
+
+def wait_for_server(port):
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('Server did not start.')
+
+
+def get_free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def main(seconds=5, connections=32):
+    print('%-36s %12s' % ('scenario', 'requests/s'))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    for name, interface, workers in SCENARIOS:
+        port = get_free_port()
+        args = [sys.executable, __file__, '--server', interface, str(port), str(workers or '')]
+        process = subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_server(port)
+            requests_per_second = run_load(port, seconds, connections)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait()
+        print('%-36s %12.0f' % (name, requests_per_second))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--server']:
+        run_server(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]) if sys.argv[4] else None)
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,102 @@
+"""
+Measure static file throughput for the WSGI and ASGI static file handlers,
+calling the applications directly, without a server.
+
+Usage: python benchmarks/static_files.py [iterations]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from apistar import App, ASyncApp
+
+FILE_SIZES = [
+    ('1KB', 1024),
+    ('1MB', 1024 * 1024),
+    ('100MB', 100 * 1024 * 1024),
+]
+
+
+def wsgi_request(app, path):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'wsgi.url_scheme': 'http',
+    }
+
+    def start_response(status, headers, exc_info=None):
+        assert status.startswith('200'), status
+
+    size = 0
+    body = app(environ, start_response)
+    for chunk in body:
+        size += len(chunk)
+    if hasattr(body, 'close'):
+        body.close()
+    return size
+
+
+def asgi_request(app, path, extensions=None):
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'root_path': '',
+        'scheme': 'http',
+        'query_string': b'',
+        'headers': [],
+        'server': ['testserver', 80],
+        'extensions': extensions or {},
+    }
+    sizes = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            sizes.append(len(message.get('body', b'')))
+        elif message['type'] == 'http.response.pathsend':
+            sizes.append(os.stat(message['path']).st_size)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(app(scope)(receive, send))
+    return sum(sizes)
+
+
+def measure(name, func, iterations):
+    started = time.perf_counter()
+    size = 0
+    for _ in range(iterations):
+        size += func()
+    elapsed = time.perf_counter() - started
+    print('%-32s %8.1f req/s %10.1f MB/s' % (
+        name, iterations / elapsed, size / elapsed / 1e6
+    ))
+
+
+def main(iterations=20):
+    with tempfile.TemporaryDirectory() as static_dir:
+        for label, size in FILE_SIZES:
+            with open(os.path.join(static_dir, label), 'wb') as file:
+                file.write(os.urandom(size))
+
+        app = App(routes=[], static_dir=static_dir, docs_url=None)
+        async_app = ASyncApp(routes=[], static_dir=static_dir, docs_url=None)
+        pathsend = {'http.response.pathsend': {}}
+
+        for label, size in FILE_SIZES:
+            path = '/static/' + label
+            count = max(1, iterations if size < 1e8 else iterations // 10)
+            measure('WSGI %s' % label, lambda: wsgi_request(app, path), count)
+            measure('ASGI %s' % label, lambda: asgi_request(async_app, path), count)
+            measure('ASGI pathsend %s' % label, lambda: asgi_request(async_app, path, pathsend), count)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,40 @@
+"""
+Measure the memory allocated when tokenizing a large document.
+
+Usage: python benchmarks/tokenize_memory.py [size_in_mb]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+import yaml
+
+from apistar.tokenize import tokenize_json, tokenize_yaml
+from documents import build_document
+
+
+def measure(name, func, content):
+    tracemalloc.start()
+    started = time.perf_counter()
+    token = func(content)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del token
+    print('%-15s %8.2fs  retained %8.1f MB  peak %8.1f MB' % (
+        name, elapsed, current / 1e6, peak / 1e6
+    ))
+
+
+def main(size_in_mb=5.0):
+    document = build_document(int(size_in_mb * 1e6))
+    json_content = json.dumps(document, indent=2)
+    yaml_content = yaml.safe_dump(document, default_flow_style=False)
+    print('JSON: %.1f MB, YAML: %.1f MB' % (len(json_content) / 1e6, len(yaml_content) / 1e6))
+    measure('tokenize_json', tokenize_json, json_content)
+    measure('tokenize_yaml', tokenize_yaml, yaml_content)
+
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,40 @@
+"""
+Compare parsing and tokenizing YAML documents with the pure Python loader
+against the libyaml based loader.
+
+Usage: python benchmarks/yaml_parsing.py [size_in_mb]
+"""
+import sys
+import time
+
+import yaml
+
+from apistar.parse import parse_yaml
+from apistar.tokenize import tokenize_yaml
+from apistar.tokenize.tokenize_yaml import TokenizingLoader
+from documents import build_document
+
+PureTokenizingLoader = type('PureTokenizingLoader', (yaml.SafeLoader,), {
+    'yaml_constructors': TokenizingLoader.yaml_constructors
+})
+
+
+def measure(name, func, content):
+    started = time.perf_counter()
+    func(content)
+    elapsed = time.perf_counter() - started
+    print('%-30s %8.2fs' % (name, elapsed))
+
+
+def main(size_in_mb=5.0):
+    document = build_document(int(size_in_mb * 1e6))
+    content = yaml.safe_dump(document, default_flow_style=False)
+    print('YAML: %.1f MB, libyaml available: %s' % (len(content) / 1e6, yaml.__with_libyaml__))
+    measure('yaml.safe_load', yaml.safe_load, content)
+    measure('parse_yaml', parse_yaml, content)
+    measure('tokenize_yaml (pure python)', lambda c: yaml.load(c, PureTokenizingLoader), content)
+    measure('tokenize_yaml', tokenize_yaml, content)
+
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:]])
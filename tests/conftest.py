@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from apistar import http
+
+
+class MarkResponseHook:
+    """
+    Marks each response with an `X-Hook` header, so that tests can check
+    that the `on_response` hooks ran.
+    """
+    def on_response(self, response: http.Response):
+        response.headers['X-Hook'] = 'ran'
+
+
+def run_requests(app, requests):
+    """
+    Make concurrent `GET` requests to an ASGI application. Each request is
+    either a URL, or a `(url, headers)` tuple. Returns a `status`, `headers`
+    and `body` for each response, in the order that they completed.
+    """
+    results = []
+
+    async def request(url, headers):
+        path, _, query_string = url.partition('?')
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query_string.encode(),
+            'headers': [
+                (key.lower().encode(), value.encode())
+                for key, value in headers.items()
+            ],
+        }
+        result = {'body': b''}
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                result['status'] = message['status']
+                result['headers'] = dict(message['headers'])
+            else:
+                result['body'] += message.get('body', b'')
+
+        await app(scope)(receive, send)
+        results.append(result)
+
+    requests = [
+        (request_info, {}) if isinstance(request_info, str) else request_info
+        for request_info in requests
+    ]
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(asyncio.gather(*[request(url, headers) for url, headers in requests]))
+    return results
+
+
+@pytest.fixture(name='run_requests')
+def run_requests_fixture():
+    return run_requests
+
+
+@pytest.fixture(name='hook_marker')
+def hook_marker_fixture():
+    return MarkResponseHook
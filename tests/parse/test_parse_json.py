@@ -1,6 +1,6 @@
 import pytest
 
-from apistar import validators
+from apistar import parse, validators
 from apistar.exceptions import (
     ErrorMessage, Marker, ParseError, ValidationError
 )
@@ -96,6 +96,14 @@ def test_valid_json():
     parse_json('{"abc": "def"}')
 
 
+def test_valid_json_is_not_tokenized(monkeypatch):
+    def index_json(content):
+        raise AssertionError('index_json() should not be called.')
+
+    monkeypatch.setattr(parse, 'index_json', index_json)
+    assert parse_json('{"a": 1}', VALIDATOR) == {'a': 1}
+
+
 def test_invalid_token():
     with pytest.raises(ParseError) as exc:
         parse_json('-', VALIDATOR)
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from apistar import App, ASyncApp, Route, TestClient, exceptions, http
+from apistar.server.cache import CacheBackend, CachePolicy, InMemoryCache
+
+calls = []
+
+
+def get_counter(value: http.QueryParam) -> dict:
+    calls.append(value)
+    return {'calls': len(calls), 'value': value}
+
+
+def get_greeting(accept_language: http.Header) -> dict:
+    calls.append(accept_language)
+    return {'calls': len(calls)}
+
+
+def get_error() -> http.JSONResponse:
+    calls.append(None)
+    return http.JSONResponse({'calls': len(calls)}, status_code=400)
+
+
+def get_cookie() -> http.JSONResponse:
+    calls.append(None)
+    return http.JSONResponse({'calls': len(calls)}, headers={'Set-Cookie': 'a=b'})
+
+
+def get_expired() -> dict:
+    calls.append(None)
+    return {'calls': len(calls)}
+
+
+routes = [
+    Route('/counter/', 'GET', get_counter, cache=CachePolicy(ttl=60)),
+    Route('/filtered/', 'GET', get_counter, name='filtered', cache=CachePolicy(ttl=60, query_params=['value'])),
+    Route('/greeting/', 'GET', get_greeting, cache=CachePolicy(ttl=60, headers=['Accept-Language'])),
+    Route('/error/', 'GET', get_error, cache=CachePolicy(ttl=60)),
+    Route('/cookie/', 'GET', get_cookie, cache=CachePolicy(ttl=60)),
+    Route('/expired/', 'GET', get_expired, cache=CachePolicy(ttl=0)),
+]
+
+
+@pytest.fixture(params=[App, ASyncApp])
+def client(request, hook_marker):
+    del calls[:]
+    app = request.param(routes=routes, event_hooks=[hook_marker])
+    return TestClient(app)
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_cached_response(app_class, hook_marker):
+    del calls[:]
+    app = app_class(routes=routes, event_hooks=[hook_marker])
+    client = TestClient(app)
+    response = client.get('/counter/?value=a')
+    assert response.json() == {'calls': 1, 'value': 'a'}
+    response = client.get('/counter/?value=a')
+    assert response.json() == {'calls': 1, 'value': 'a'}
+    assert response.headers['X-Hook'] == 'ran'
+    assert response.headers['Content-Type'] == 'application/json'
+    response = client.get('/counter/?value=b')
+    assert response.json() == {'calls': 2, 'value': 'b'}
+    assert app.response_cache.hits == 1
+    assert app.response_cache.misses == 2
+
+
+def test_normalized_query_string(client):
+    client.get('/counter/?value=a&other=b')
+    response = client.get('/counter/?other=b&value=a')
+    assert response.json()['calls'] == 1
+    response = client.get('/counter/?other=c&value=a')
+    assert response.json()['calls'] == 2
+
+
+def test_vary_by_query_params(client):
+    client.get('/filtered/?value=a&other=b')
+    response = client.get('/filtered/?value=a&other=c')
+    assert response.json()['calls'] == 1
+    response = client.get('/filtered/?value=b')
+    assert response.json()['calls'] == 2
+
+
+def test_vary_by_headers(client):
+    client.get('/greeting/', headers={'Accept-Language': 'en'})
+    response = client.get('/greeting/', headers={'Accept-Language': 'en'})
+    assert response.json()['calls'] == 1
+    response = client.get('/greeting/', headers={'Accept-Language': 'de'})
+    assert response.json()['calls'] == 2
+
+
+@pytest.mark.parametrize('url', ['/error/', '/cookie/', '/expired/'])
+def test_not_cached(client, url):
+    client.get(url)
+    response = client.get(url)
+    assert response.json()['calls'] == 2
+
+
+def test_custom_backend():
+    class DictCache(CacheBackend):
+        def __init__(self):
+            self.entries = {}
+
+        def get(self, key):
+            return self.entries.get(key)
+
+        def set(self, key, value, ttl):
+            self.entries[key] = value
+
+    del calls[:]
+    backend = DictCache()
+    client = TestClient(App(routes=routes, cache_backend=backend))
+    client.get('/counter/?value=a')
+    response = client.get('/counter/?value=a')
+    assert response.json()['calls'] == 1
+    assert list(backend.entries) == ['GET:/counter/?value=a']
+
+
+def test_in_memory_cache_eviction():
+    cache = InMemoryCache(max_entries=2)
+    cache.set('a', (200, [], b'a'), ttl=60)
+    cache.set('b', (200, [], b'b'), ttl=60)
+    assert cache.get('a') == (200, [], b'a')
+    cache.set('c', (200, [], b'c'), ttl=60)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    cache.delete('a')
+    assert cache.get('a') is None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_in_memory_cache_expiry():
+    cache = InMemoryCache()
+    cache.set('a', (200, [], b'a'), ttl=-1)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def slow_counter() -> dict:
+    time.sleep(0.05)
+    calls.append(None)
+    return {'calls': len(calls)}
+
+
+async def async_slow_counter() -> dict:
+    await asyncio.sleep(0.05)
+    calls.append(None)
+    return {'calls': len(calls)}
+
+
+def test_stampede_protection():
+    del calls[:]
+    app = App(routes=[Route('/slow/', 'GET', slow_counter, cache=CachePolicy(ttl=60))])
+    client = TestClient(app)
+    results = []
+
+    def request():
+        results.append(client.get('/slow/').json())
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{'calls': 1}] * 5
+    assert app.response_cache._locks == {}
+
+
+def test_async_stampede_protection(run_requests):
+    del calls[:]
+    app = ASyncApp(routes=[Route('/slow/', 'GET', async_slow_counter, cache=CachePolicy(ttl=60))])
+    results = run_requests(app, ['/slow/'] * 5)
+    assert [result['body'] for result in results] == [b'{"calls":1}'] * 5
+    assert app.response_cache._locks == {}
+
+
+in_progress = []
+
+
+def slow_not_found() -> http.JSONResponse:
+    in_progress.append(None)
+    time.sleep(0.05)
+    concurrent = len(in_progress)
+    in_progress.pop()
+    return http.JSONResponse({'concurrent': concurrent}, status_code=404)
+
+
+async def async_slow_not_found() -> http.JSONResponse:
+    in_progress.append(None)
+    await asyncio.sleep(0.05)
+    concurrent = len(in_progress)
+    in_progress.pop()
+    return http.JSONResponse({'concurrent': concurrent}, status_code=404)
+
+
+def test_uncacheable_responses_run_concurrently():
+    app = App(routes=[Route('/missing/', 'GET', slow_not_found, cache=CachePolicy(ttl=60))])
+    client = TestClient(app)
+    results = []
+
+    def request():
+        results.append(client.get('/missing/').json()['concurrent'])
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5
+    assert max(results) > 1
+    assert app.response_cache._locks == {}
+
+
+def test_async_uncacheable_responses_run_concurrently(run_requests):
+    app = ASyncApp(routes=[Route('/missing/', 'GET', async_slow_not_found, cache=CachePolicy(ttl=60))])
+    results = run_requests(app, ['/missing/'] * 5)
+    assert [result['status'] for result in results] == [404] * 5
+    # The first request runs alone, and the rest run together once its
+    # response turns out not to be cacheable.
+    assert max(json.loads(result['body'].decode())['concurrent'] for result in results) == 4
+    assert app.response_cache._locks == {}
+
+
+def get_secret() -> dict:
+    calls.append(None)
+    return {'secret': 42}
+
+
+class RequireAPIKey:
+    def on_request(self, api_key: http.Header):
+        if api_key != 'valid':
+            raise exceptions.Forbidden()
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_on_request_hooks_run_on_cache_hits(app_class):
+    del calls[:]
+    app = app_class(routes=[Route('/secret/', 'GET', get_secret, cache=CachePolicy(ttl=60))],
+                    event_hooks=[RequireAPIKey])
+    client = TestClient(app)
+    response = client.get('/secret/', headers={'Api-Key': 'valid'})
+    assert response.json() == {'secret': 42}
+    response = client.get('/secret/')
+    assert response.status_code == 403
+    response = client.get('/secret/', headers={'Api-Key': 'valid'})
+    assert response.json() == {'secret': 42}
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_private_requests_skip_cache(app_class):
+    del calls[:]
+    app = app_class(routes=[
+        Route('/secret/', 'GET', get_secret, cache=CachePolicy(ttl=60)),
+        Route('/vary/', 'GET', get_secret, name='vary', cache=CachePolicy(ttl=60, headers=['Authorization'])),
+    ])
+    client = TestClient(app)
+    for headers in [{'Authorization': 'Bearer a'}, {'Cookie': 'session=a'}] * 2:
+        client.get('/secret/', headers=headers)
+    assert len(calls) == 4
+
+    del calls[:]
+    client.get('/vary/', headers={'Authorization': 'Bearer a'})
+    client.get('/vary/', headers={'Authorization': 'Bearer a'})
+    client.get('/vary/', headers={'Authorization': 'Bearer b'})
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_conditional_cache_hit(app_class):
+    del calls[:]
+    app = app_class(routes=[Route('/secret/', 'GET', get_secret, conditional=True, cache=CachePolicy(ttl=60))])
+    client = TestClient(app)
+    etag = client.get('/secret/').headers['ETag']
+    response = client.get('/secret/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    response = client.get('/secret/')
+    assert response.json() == {'secret': 42}
+    assert len(calls) == 1
+
+
+def test_cache_only_on_get_routes():
+    with pytest.raises(AssertionError):
+        Route('/counter/', 'POST', get_counter, cache=CachePolicy(ttl=60))
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from apistar import ASyncApp, Route, TestClient, http
+from apistar.server.cancellation import Deadline
+
+events = []
+
+
+async def slow():
+    try:
+        await asyncio.sleep(5)
+    finally:
+        events.append('cleanup')
+    return {'slow': True}
+
+
+async def remaining(deadline: Deadline) -> dict:
+    return {
+        'timeout': deadline.timeout,
+        'within_deadline': 0 < deadline.remaining() <= deadline.timeout
+    }
+
+
+async def echo(body: http.Body) -> http.Response:
+    return http.Response(body, headers={'Content-Type': 'application/octet-stream'})
+
+
+class Hooks:
+    def on_error(self, exc: Exception):
+        events.append(type(exc).__name__)
+
+    def on_response(self, response: http.Response):
+        events.append('on_response')
+
+
+routes = [
+    Route('/slow/', 'GET', slow, timeout=0.05),
+    Route('/slow-disconnect/', 'GET', slow, name='slow_disconnect', cancel_on_disconnect=True),
+    Route('/remaining/', 'GET', remaining, timeout=10, cancel_on_disconnect=True),
+    Route('/echo/', 'POST', echo, cancel_on_disconnect=True),
+]
+
+app = ASyncApp(routes=routes, event_hooks=[Hooks], docs_url=None, schema_url=None)
+client = TestClient(app)
+
+
+def test_timeout():
+    del events[:]
+    response = client.get('/slow/')
+    assert response.status_code == 503
+    assert response.json() == 'Request timed out'
+    assert events == ['cleanup', 'TimeoutError', 'on_response']
+
+
+def test_deadline():
+    del events[:]
+    response = client.get('/remaining/')
+    assert response.json() == {'timeout': 10, 'within_deadline': True}
+    assert events == ['on_response']
+
+
+def test_request_body_is_passed_through():
+    response = client.post('/echo/', data=b'hello')
+    assert response.content == b'hello'
+
+
+def test_cancel_on_disconnect():
+    del events[:]
+    messages = []
+
+    async def receive():
+        if not messages:
+            messages.append('body')
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.sleep(0.05)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message['type'])
+
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/slow-disconnect/',
+        'query_string': b'',
+        'headers': [],
+    }
+    start = time.monotonic()
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(app(scope)(receive, send))
+    assert time.monotonic() - start < 1
+    assert messages == ['body']
+    assert events == ['cleanup', 'CancelledError']
+
+
+def test_deadline_without_timeout():
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert not deadline.expired
+    assert Deadline(0.000001).remaining() < 0.000001
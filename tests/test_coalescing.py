@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from apistar import App, ASyncApp, Route, TestClient, exceptions, http
+
+calls = []
+
+
+async def get_resource(id: int, page: http.QueryParam) -> dict:
+    calls.append(id)
+    await asyncio.sleep(0.02)
+    return {'id': id, 'page': page, 'calls': len(calls)}
+
+
+async def get_flaky() -> dict:
+    calls.append(None)
+    await asyncio.sleep(0.02)
+    if len(calls) == 1:
+        raise RuntimeError()
+    return {'calls': len(calls)}
+
+
+routes = [
+    Route('/resources/{id}/', 'GET', get_resource, coalesce=True),
+    Route('/uncoalesced/{id}/', 'GET', get_resource, name='uncoalesced'),
+    Route('/flaky/', 'GET', get_flaky, coalesce=True),
+]
+
+
+@pytest.fixture
+def app(hook_marker):
+    del calls[:]
+    return ASyncApp(routes=routes, event_hooks=[hook_marker])
+
+
+def test_coalesced_requests(app, run_requests):
+    results = run_requests(app, ['/resources/1/?page=2'] * 5)
+    assert calls == [1]
+    for result in results:
+        assert result['status'] == 200
+        assert result['body'] == b'{"id":1,"page":"2","calls":1}'
+        assert result['headers'][b'x-hook'] == b'ran'
+    assert app.request_coalescer.requests == 1
+    assert app.request_coalescer.coalesced == 4
+    assert len(app.request_coalescer) == 0
+
+
+def test_distinct_requests_are_not_coalesced(app, run_requests):
+    urls = ['/resources/1/?page=2', '/resources/1/?page=3', '/resources/2/?page=2']
+    run_requests(app, urls)
+    assert sorted(calls) == [1, 1, 2]
+    assert app.request_coalescer.coalesced == 0
+
+
+def test_query_string_is_normalized(app, run_requests):
+    run_requests(app, ['/resources/1/?page=2&sort=name', '/resources/1/?sort=name&page=2'])
+    assert calls == [1]
+
+
+def test_uncoalesced_route(app, run_requests):
+    run_requests(app, ['/uncoalesced/1/?page=2'] * 3)
+    assert calls == [1, 1, 1]
+
+
+def test_failed_request_is_not_shared(app, run_requests):
+    results = run_requests(app, ['/flaky/'] * 3)
+    assert sorted(result['status'] for result in results) == [200, 200, 500]
+    assert len(calls) == 3
+    assert app.request_coalescer.requests == 3
+    assert app.request_coalescer.coalesced == 0
+
+
+def test_sequential_requests_are_not_coalesced(app):
+    client = TestClient(app)
+    client.get('/resources/1/?page=2')
+    client.get('/resources/1/?page=2')
+    assert calls == [1, 1]
+
+
+def test_wsgi_app_ignores_coalescing():
+    del calls[:]
+
+    def get_sync_resource(id: int) -> dict:
+        calls.append(id)
+        return {'id': id}
+
+    app = App(routes=[Route('/resources/{id}/', 'GET', get_sync_resource, coalesce=True)])
+    response = TestClient(app).get('/resources/1/')
+    assert response.json() == {'id': 1}
+    assert app.request_coalescer is None
+
+
+async def get_secret() -> dict:
+    calls.append(None)
+    await asyncio.sleep(0.02)
+    return {'secret': 42}
+
+
+class RequireToken:
+    def on_request(self, x_token: http.Header):
+        if x_token != 'valid':
+            raise exceptions.Forbidden()
+
+
+def test_conditional_routes_are_not_coalesced(run_requests):
+    del calls[:]
+    app = ASyncApp(routes=[Route('/secret/', 'GET', get_secret, coalesce=True, conditional=True)])
+    etag = TestClient(app).get('/secret/').headers['ETag']
+    results = run_requests(app, [('/secret/', {'If-None-Match': etag}), '/secret/'])
+    results = sorted(results, key=lambda result: result['status'])
+    assert [result['status'] for result in results] == [200, 304]
+    assert results[0]['body'] == b'{"secret":42}'
+    assert len(calls) == 3
+
+
+def test_private_requests_are_not_coalesced(run_requests):
+    del calls[:]
+    app = ASyncApp(routes=[Route('/secret/', 'GET', get_secret, coalesce=True)])
+    requests = [('/secret/', {'Authorization': 'Bearer a'}), ('/secret/', {'Cookie': 'a=b'}), '/secret/']
+    results = run_requests(app, requests)
+    assert [result['status'] for result in results] == [200, 200, 200]
+    assert len(calls) == 3
+    assert app.request_coalescer.coalesced == 0
+
+
+def test_on_request_hooks_run_before_sharing(run_requests):
+    del calls[:]
+    app = ASyncApp(routes=[Route('/secret/', 'GET', get_secret, coalesce=True)], event_hooks=[RequireToken])
+    results = run_requests(app, [('/secret/', {'X-Token': 'valid'}), '/secret/', ('/secret/', {'X-Token': 'valid'})])
+    results = sorted(results, key=lambda result: result['status'])
+    assert [result['status'] for result in results] == [200, 200, 403]
+    assert results[0]['body'] == results[1]['body'] == b'{"secret":42}'
+    assert b'secret' not in results[2]['body']
+
+
+def test_only_ok_responses_are_shared():
+    app = ASyncApp(routes=routes)
+    loop = asyncio.get_event_loop()
+    for response in [http.Response(b'', status_code=304), http.JSONResponse({}, status_code=404)]:
+        app.request_coalescer.start('key')
+        app.request_coalescer.share('key', response)
+        future = app.request_coalescer.join('key')
+        assert not future.done()
+        app.request_coalescer.finish('key')
+        assert loop.run_until_complete(future) is None
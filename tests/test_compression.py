@@ -0,0 +1,138 @@
+import gzip
+import zlib
+
+import pytest
+
+from apistar import App, ASyncApp, Route, TestClient, http
+from apistar.server.compression import Compressor, ResponseCompression
+
+
+def large_json():
+    return [{'id': index, 'name': 'item %d' % index} for index in range(200)]
+
+
+def small_json():
+    return {'ok': True}
+
+
+def image():
+    return http.Response(b'\x89PNG' * 500, headers={'Content-Type': 'image/png'})
+
+
+def tagged():
+    return http.JSONResponse(large_json(), headers={'ETag': '"abc"', 'Vary': 'Cookie'})
+
+
+def no_transform():
+    return http.JSONResponse(large_json(), headers={'Cache-Control': 'no-transform'})
+
+
+def stream():
+    return http.StreamingResponse(
+        ('line %d\n' % index for index in range(1000)),
+        headers={'Content-Type': 'text/plain'}
+    )
+
+
+async def async_stream():
+    async def generate():
+        for index in range(1000):
+            yield 'line %d\n' % index
+    return http.StreamingResponse(generate(), headers={'Content-Type': 'text/plain'})
+
+
+routes = [
+    Route('/large/', 'GET', large_json),
+    Route('/small/', 'GET', small_json),
+    Route('/image/', 'GET', image),
+    Route('/tagged/', 'GET', tagged),
+    Route('/no-transform/', 'GET', no_transform),
+    Route('/stream/', 'GET', stream),
+]
+
+app = App(routes=routes, compression=ResponseCompression())
+async_app = ASyncApp(
+    routes=routes + [Route('/async-stream/', 'GET', async_stream)],
+    compression=ResponseCompression()
+)
+
+
+@pytest.fixture(scope='module', params=['wsgi', 'asgi'])
+def client(request):
+    if request.param == 'asgi':
+        return TestClient(async_app)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'deflate'])
+def test_compressed_response(client, encoding):
+    response = client.get('/large/', headers={'Accept-Encoding': encoding})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == encoding
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert int(response.headers['Content-Length']) < len(http.JSONResponse(large_json()).content)
+    assert response.json() == large_json()
+
+
+def test_uncompressed_response(client):
+    response = client.get('/large/', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.json() == large_json()
+
+
+@pytest.mark.parametrize('url', ['/small/', '/image/', '/no-transform/'])
+def test_not_compressible(client, url):
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+
+
+def test_compressed_etag_and_vary(client):
+    response = client.get('/tagged/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == 'W/"abc"'
+    assert response.headers['Vary'] == 'Cookie, Accept-Encoding'
+
+
+def test_streaming_response(client):
+    expected = ''.join('line %d\n' % index for index in range(1000))
+    response = client.get('/stream/', headers={'Accept-Encoding': 'identity'})
+    assert response.text == expected
+
+    response = client.get('/stream/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert response.text == expected
+
+
+def test_async_streaming_response():
+    client = TestClient(async_app)
+    expected = ''.join('line %d\n' % index for index in range(1000))
+    response = client.get('/async-stream/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.text == expected
+
+
+def test_compressor_flush():
+    compressor = Compressor('gzip')
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in (b'first chunk', b'second chunk'):
+        # Each flushed chunk can be decompressed as soon as it is received.
+        output = compressor.compress(chunk) + compressor.flush()
+        assert decompressor.decompress(output) == chunk
+    output = compressor.finish()
+    assert decompressor.decompress(output) == b''
+    assert decompressor.eof
+
+
+def test_compressor_gzip_format():
+    compressor = Compressor('gzip', level=9)
+    content = compressor.compress(b'abc' * 100) + compressor.finish()
+    assert gzip.decompress(content) == b'abc' * 100
+
+
+def test_compressor_unsupported_encoding():
+    with pytest.raises(ValueError):
+        Compressor('compress')
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from apistar import App, ASyncApp, Route, http
+from apistar.server.concurrency import ConcurrencyLimit
+
+in_progress = []
+
+
+async def slow() -> dict:
+    in_progress.append(1)
+    await asyncio.sleep(0.05)
+    concurrent = len(in_progress)
+    in_progress.pop()
+    return {'concurrent': concurrent}
+
+
+class LimitHook:
+    def on_response(self, response: http.Response, app: App, route: Route):
+        if route is not None and route.concurrency_limit is not None:
+            response.headers['X-Rejected'] = str(route.concurrency_limit.rejected)
+        if app.concurrency_limit is not None:
+            response.headers['X-App-Admitted'] = str(app.concurrency_limit.admitted)
+
+
+def test_route_concurrency_limit(run_requests):
+    limit = ConcurrencyLimit(max_in_flight=2, max_queued=2)
+    app = ASyncApp(routes=[Route('/', 'GET', slow, concurrency_limit=limit)], event_hooks=[LimitHook])
+    results = run_requests(app, ['/'] * 6)
+
+    ok = [result for result in results if result['status'] == 200]
+    rejected = [result for result in results if result['status'] == 503]
+    assert len(ok) == 4
+    assert len(rejected) == 2
+    assert all(result['body'] != b'{"concurrent":3}' for result in ok)
+    assert [result['headers'][b'retry-after'] for result in rejected] == [b'1', b'1']
+    assert [result['headers'][b'x-rejected'] for result in rejected] == [b'1', b'2']
+    assert (limit.admitted, limit.queued, limit.rejected) == (4, 2, 2)
+    assert (limit.in_flight, limit.waiting) == (0, 0)
+
+
+def test_queue_timeout(run_requests):
+    limit = ConcurrencyLimit(max_in_flight=1, max_queued=10, queue_timeout=0.01, retry_after=5)
+    app = ASyncApp(routes=[Route('/', 'GET', slow, concurrency_limit=limit)])
+    results = run_requests(app, ['/'] * 3)
+
+    assert sorted(result['status'] for result in results) == [200, 503, 503]
+    assert (limit.admitted, limit.queued, limit.rejected) == (1, 2, 2)
+    assert (limit.in_flight, limit.waiting) == (0, 0)
+    for result in results:
+        if result['status'] == 503:
+            assert result['headers'][b'retry-after'] == b'5'
+
+
+def test_app_concurrency_limit(run_requests):
+    limit = ConcurrencyLimit(max_in_flight=1, max_queued=10)
+    app = ASyncApp(
+        routes=[Route('/a/', 'GET', slow), Route('/b/', 'GET', slow, name='b')],
+        concurrency_limit=limit,
+        event_hooks=[LimitHook]
+    )
+    results = run_requests(app, ['/a/', '/a/', '/b/'])
+
+    assert [result['status'] for result in results] == [200, 200, 200]
+    assert all(result['body'] == b'{"concurrent":1}' for result in results)
+    assert [result['headers'][b'x-app-admitted'] for result in results] == [b'1', b'2', b'3']
+    assert (limit.admitted, limit.queued, limit.rejected) == (3, 2, 0)
+    assert limit.in_flight == 0
+
+
+def test_cancelled_while_queued():
+    limit = ConcurrencyLimit(max_in_flight=1, max_queued=1)
+    loop = asyncio.get_event_loop()
+
+    async def run():
+        await limit.acquire()
+        waiter = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0)
+        assert limit.waiting == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limit.waiting == 0
+        limit.release()
+
+    loop.run_until_complete(run())
+    assert limit.in_flight == 0
+
+
+def test_wsgi_app_does_not_support_concurrency_limit():
+    with pytest.raises(AssertionError):
+        App(routes=[], concurrency_limit=ConcurrencyLimit(max_in_flight=1))
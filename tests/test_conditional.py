@@ -0,0 +1,139 @@
+import pytest
+
+from apistar import App, ASyncApp, Route, TestClient, http, types, validators
+from apistar.server.handlers import serve_schema
+
+serialized = []
+
+
+class Item(types.Type):
+    id = validators.Integer()
+    name = validators.String()
+
+
+class Data(dict):
+    """
+    Records when the value is serialized into a response.
+    """
+    def items(self):
+        serialized.append(True)
+        return super().items()
+
+
+def get_item(id: int) -> Item:
+    return Item(id=id, name='item %d' % id)
+
+
+def get_versioned_item(id: int, etag: http.ETag):
+    etag.set('v%d' % id)
+    return Data(id=id)
+
+
+def get_custom_etag():
+    return http.JSONResponse({'custom': True}, headers={'ETag': '"custom"'})
+
+
+def get_html():
+    return '<html></html>'
+
+
+def get_unconditional_item():
+    return {'id': 1}
+
+
+routes = [
+    Route('/items/{id}/', 'GET', get_item, conditional=True),
+    Route('/versioned-items/{id}/', 'GET', get_versioned_item, conditional=True),
+    Route('/custom-etag/', 'GET', get_custom_etag, conditional=True),
+    Route('/html/', 'GET', get_html, conditional=True),
+    Route('/unconditional/', 'GET', get_unconditional_item),
+    Route('/schema/', 'GET', serve_schema, documented=False),
+]
+
+
+@pytest.fixture(scope='module', params=[App, ASyncApp])
+def client(request):
+    return TestClient(request.param(routes=routes))
+
+
+def test_content_etag(client):
+    response = client.get('/items/1/')
+    assert response.status_code == 200
+    assert response.json() == {'id': 1, 'name': 'item 1'}
+    etag = response.headers['ETag']
+
+    response = client.get('/items/1/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+    assert 'Content-Length' not in response.headers
+
+    response = client.get('/items/2/', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_version_etag_skips_serialization(client):
+    del serialized[:]
+    response = client.get('/versioned-items/1/')
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"v1"'
+    assert len(serialized) == 1
+
+    response = client.get('/versioned-items/1/', headers={'If-None-Match': 'W/"v1"'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == '"v1"'
+    assert len(serialized) == 1
+
+
+def test_response_etag(client):
+    response = client.get('/custom-etag/', headers={'If-None-Match': '"custom"'})
+    assert response.status_code == 304
+
+
+def test_non_json_response_has_no_etag(client):
+    response = client.get('/html/')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_unconditional_route(client):
+    response = client.get('/unconditional/')
+    assert 'ETag' not in response.headers
+
+
+def test_etag_set():
+    etag = http.ETag('"abc", "def"')
+    assert not etag.is_not_modified()
+    etag.set('def')
+    assert etag.value == '"def"'
+    assert etag.is_not_modified()
+    etag.set(123, weak=True)
+    assert etag.value == 'W/"123"'
+    assert not etag.is_not_modified()
+
+
+def test_conditional_route_must_be_get():
+    with pytest.raises(AssertionError):
+        Route('/items/', 'POST', get_unconditional_item, conditional=True)
+
+
+def test_conditional_route_schema():
+    document = TestClient(App(routes=routes)).get('/schema/').json()
+
+    operation = document['paths']['/items/{id}/']['get']
+    assert operation['parameters'][-1] == {
+        'name': 'If-None-Match',
+        'in': 'header',
+        'description': 'Entity tags of cached copies of the response.',
+        'schema': {'type': 'string'}
+    }
+    assert operation['responses']['200']['headers'] == {'ETag': {'schema': {'type': 'string'}}}
+    assert operation['responses']['304'] == {'description': 'Not modified'}
+
+    operation = document['paths']['/versioned-items/{id}/']['get']
+    assert operation['responses'] == {'304': {'description': 'Not modified'}}
+
+    operation = document['paths']['/unconditional/']['get']
+    assert 'parameters' not in operation
+    assert 'responses' not in operation
@@ -0,0 +1,19 @@
+from apistar.conneg import etag_matches, negotiate_content_encoding
+
+
+def test_negotiate_content_encoding():
+    assert negotiate_content_encoding(['gzip'], None) is None
+    assert negotiate_content_encoding(['gzip'], 'gzip, deflate') == 'gzip'
+    assert negotiate_content_encoding(['gzip'], 'deflate') is None
+    assert negotiate_content_encoding(['gzip'], 'gzip;q=0') is None
+    assert negotiate_content_encoding(['gzip'], '*') == 'gzip'
+    assert negotiate_content_encoding(['br', 'gzip'], 'gzip;q=1.0, br;q=0.5') == 'gzip'
+    assert negotiate_content_encoding(['br', 'gzip'], 'gzip, br') == 'br'
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"abc"', '"xyz", W/"abc"')
+    assert etag_matches('"abc"', '*')
+    assert not etag_matches('"abc"', '"xyz"')
+    assert not etag_matches('"abc"', None)
@@ -15,3 +15,17 @@ def test_docs():
 def test_docs_async():
     response = async_test_client.get('/docs/')
     assert response.status_code == 200
+
+
+def test_docs_not_modified():
+    response = test_client.get('/docs/')
+    etag = response.headers['ETag']
+    response = test_client.get('/docs/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_docs_not_modified_async():
+    response = async_test_client.get('/docs/')
+    etag = response.headers['ETag']
+    response = async_test_client.get('/docs/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
@@ -0,0 +1,29 @@
+from apistar.exceptions import LineIndex, Marker
+
+
+def test_marker_line_and_column():
+    content = 'abc\ndef\r\nghi'
+    assert (Marker(0, content).line_number, Marker(0, content).column_number) == (1, 1)
+    assert (Marker(3, content).line_number, Marker(3, content).column_number) == (1, 3)
+    assert (Marker(5, content).line_number, Marker(5, content).column_number) == (2, 2)
+    assert (Marker(8, content).line_number, Marker(8, content).column_number) == (2, 3)
+    assert (Marker(9, content).line_number, Marker(9, content).column_number) == (3, 1)
+
+
+def test_marker_without_content():
+    marker = Marker(5)
+    assert marker.line_number is None
+    assert marker.column_number is None
+
+
+def test_line_index_matches_splitlines():
+    content = 'a\n\nbc\r\rd\r\n\x0be f'
+    line_index = LineIndex(content)
+    for position in range(len(content) + 2):
+        lines = content[:position + 1].splitlines()
+        expected = (len(lines), len(lines[-1]) if lines else 1)
+        assert line_index.get_line_and_column(position) == expected
+
+
+def test_line_index_empty_content():
+    assert LineIndex('').get_line_and_column(0) == (0, 1)
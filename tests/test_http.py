@@ -2,6 +2,7 @@ import pytest
 from pytest import param
 
 from apistar import Route, http, test
+from apistar.server import asgi, wsgi
 from apistar.server.app import App, ASyncApp
 
 # HTTP Components as parameters
@@ -400,6 +401,73 @@ def test_headers_type(client):
     assert [('B', '456'), ('a', '123')] == http.Headers({'a': '123', 'b': '456'})
 
 
+def test_lazy_headers():
+    environ = {
+        'HTTP_ACCEPT': 'application/json',
+        'HTTP_X_REQUEST_ID': 'abc',
+        'CONTENT_TYPE': 'text/plain',
+        'PATH_INFO': '/',
+    }
+    h = wsgi.EnvironHeaders(environ)
+    assert h['Accept'] == 'application/json'
+    assert h.get('X-Request-ID') == 'abc'
+    assert 'content-type' in h
+    assert 'path-info' not in h
+    assert h.get('missing', 'default') == 'default'
+    assert h._items is None
+    with pytest.raises(KeyError):
+        h['missing']
+    assert h == {'accept': 'application/json', 'x-request-id': 'abc', 'content-type': 'text/plain'}
+    assert h.get('x_request_id') is None
+
+    h = asgi.ScopeHeaders([(b'accept', b'text/html'), (b'accept', b'*/*'), (b'host', b'example.com')])
+    assert h._items is None
+    assert h['ACCEPT'] == 'text/html'
+    assert h.get_list('accept') == ['text/html', '*/*']
+    assert h.keys() == ['accept', 'accept', 'host']
+    assert dict(h) == {'accept': 'text/html', 'host': 'example.com'}
+    assert 'missing' not in h
+
+    h = asgi.ScopeHeaders([(b'User-Agent', b'testclient')])
+    assert h['user-agent'] == 'testclient'
+    assert h._items is None
+    assert h.items() == [('user-agent', 'testclient')]
+
+
+def test_mutable_headers():
+    h = http.MutableHeaders([('Content-Type', 'text/plain'), ('Set-Cookie', 'a=1')])
+    h.append('Set-Cookie', 'b=2')
+    h['Vary'] = 'Accept'
+    assert h.get_list('set-cookie') == ['a=1', 'b=2']
+    assert len(h) == 4
+
+    h['Content-Type'] = 'text/html'
+    h['Set-Cookie'] = 'c=3'
+    assert h.items() == [('content-type', 'text/html'), ('set-cookie', 'c=3'), ('vary', 'Accept')]
+    assert h.raw_items() == [(b'content-type', b'text/html'), (b'set-cookie', b'c=3'), (b'vary', b'Accept')]
+
+    del h['content-type']
+    assert 'Content-Type' not in h
+    assert h.get('content-type') is None
+    assert len(h) == 2
+    h['Content-Type'] = 'application/json'
+    assert h == [('set-cookie', 'c=3'), ('vary', 'Accept'), ('content-type', 'application/json')]
+    assert h.raw_items()[-1] == (b'content-type', b'application/json')
+    with pytest.raises(KeyError):
+        del h['missing']
+
+
+def test_default_response_headers_are_encoded():
+    response = http.HTMLResponse('<p>Hello</p>')
+    assert response.headers.raw_items() == [
+        (b'content-length', b'12'),
+        (b'content-type', b'text/html; charset=utf-8')
+    ]
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+    header = http.get_content_type_header('application/json')
+    assert http.get_content_type_header('application/json') is header
+
+
 def test_queryparams_type(client):
     q = http.QueryParams([('a', '123'), ('a', '456'), ('b', '789')])
     assert 'a' in q
@@ -418,3 +486,18 @@ def test_queryparams_type(client):
     assert http.QueryParams({'a': '123', 'b': '456'}) == [('b', '456'), ('a', '123')]
     assert {'b': '456', 'a': '123'} == http.QueryParams({'a': '123', 'b': '456'})
     assert [('b', '456'), ('a', '123')] == http.QueryParams({'a': '123', 'b': '456'})
+
+
+def test_lazy_queryparams():
+    q = http.LazyQueryParams('a=123&b=789&a=456&c=')
+    assert q._items is None
+    assert q.get_list('a') == ['123', '456']
+    assert q.get_list('missing') == []
+    assert q['a'] == '123'
+    assert 'c' not in q
+    assert q == [('a', '123'), ('b', '789'), ('a', '456')]
+    assert dict(q) == {'a': '123', 'b': '789'}
+
+    # The returned lists are copies of the index.
+    q.get_list('a').append('0')
+    assert q.get_list('a') == ['123', '456']
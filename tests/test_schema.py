@@ -146,3 +146,23 @@ def test_get_schema():
     response = test_client.get('/schema/')
     assert response.status_code == 200
     assert response.text == expected_schema
+
+
+def test_get_schema_not_modified():
+    response = test_client.get('/schema/', headers={'Accept-Encoding': 'identity'})
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+    response = test_client.get('/schema/', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_get_schema_gzip():
+    response = test_client.get('/schema/', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.text == expected_schema
@@ -0,0 +1,311 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.test import create_environ
+
+from apistar import ASyncApp, Route, http
+from apistar.server.adapters import ASGItoWSGIAdapter
+from apistar.server.protocol import (
+    ChunkedDecoder, HTTPProtocol, ServerState, parse_request_head
+)
+
+
+async def hello() -> dict:
+    return {'hello': 'world'}
+
+
+async def echo(body: http.Body) -> http.Response:
+    return http.Response(body, headers={'Content-Type': 'application/octet-stream'})
+
+
+def stream() -> http.StreamingResponse:
+    return http.StreamingResponse(['a', 'b', 'c'], headers={'Content-Type': 'text/plain'})
+
+
+app = ASyncApp(routes=[
+    Route('/', 'GET', hello),
+    Route('/echo/', 'POST', echo),
+    Route('/stream/', 'GET', stream),
+], docs_url=None)
+
+
+def run_raw_requests(data: bytes, keep_alive_timeout: float=5.0) -> bytes:
+    """
+    Send raw request bytes to the HTTP protocol, returning everything that
+    is received until the server closes the connection.
+    """
+    loop = asyncio.get_event_loop()
+    state = ServerState()
+
+    async def run():
+        server = await loop.create_server(
+            lambda: HTTPProtocol(app, state, keep_alive_timeout=keep_alive_timeout),
+            host='127.0.0.1',
+            port=0
+        )
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(data)
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    return loop.run_until_complete(run())
+
+
+def test_keep_alive_and_pipelining():
+    response = run_raw_requests(
+        b'GET / HTTP/1.1\r\nHost: testserver\r\n\r\n'
+        b'GET / HTTP/1.1\r\nHost: testserver\r\nConnection: close\r\n\r\n'
+    )
+    first, second = response.split(b'HTTP/1.1 200 OK\r\n')[1:]
+    assert b'connection: close' not in first
+    assert first.endswith(b'\r\n\r\n{"hello":"world"}')
+    assert b'connection: close\r\n' in second
+    assert second.endswith(b'\r\n\r\n{"hello":"world"}')
+
+
+def test_keep_alive_timeout():
+    response = run_raw_requests(b'GET / HTTP/1.1\r\nHost: testserver\r\n\r\n', keep_alive_timeout=0.1)
+    assert response.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert response.endswith(b'{"hello":"world"}')
+
+
+def test_http_10():
+    response = run_raw_requests(b'GET / HTTP/1.0\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert b'connection: close\r\n' in response
+
+
+def test_request_bodies():
+    response = run_raw_requests(
+        b'POST /echo/ HTTP/1.1\r\nHost: testserver\r\nContent-Length: 5\r\n\r\nhello'
+        b'POST /echo/ HTTP/1.1\r\nHost: testserver\r\nTransfer-Encoding: chunked\r\n'
+        b'Connection: close\r\n\r\n3\r\nabc\r\n2;ext=1\r\nde\r\n0\r\n\r\n'
+    )
+    first, second = response.split(b'HTTP/1.1 200 OK\r\n')[1:]
+    assert first.endswith(b'\r\n\r\nhello')
+    assert second.endswith(b'\r\n\r\nabcde')
+
+
+def test_streaming_response_is_chunked():
+    response = run_raw_requests(b'GET /stream/ HTTP/1.1\r\nHost: testserver\r\nConnection: close\r\n\r\n')
+    head, body = response.split(b'\r\n\r\n', 1)
+    assert b'transfer-encoding: chunked' in head
+    assert body == b'1\r\na\r\n1\r\nb\r\n1\r\nc\r\n0\r\n\r\n'
+
+
+def test_head_request():
+    response = run_raw_requests(b'HEAD / HTTP/1.1\r\nHost: testserver\r\nConnection: close\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert b'content-length: 17\r\n' in response
+    assert response.endswith(b'\r\n\r\n')
+
+
+@pytest.mark.parametrize('request_data, status_line', [
+    (b'NOT A REQUEST\r\n\r\n', b'HTTP/1.1 400 Bad Request'),
+    (b'GET / HTTP/2.0\r\n\r\n', b'HTTP/1.1 505 HTTP Version Not Supported'),
+    (b'POST /echo/ HTTP/1.1\r\nContent-Length: 1\r\nTransfer-Encoding: chunked\r\n\r\n', b'HTTP/1.1 400 Bad Request'),
+    (b'GET / HTTP/1.1\r\nX-Long: ' + b'x' * 70000 + b'\r\n\r\n', b'HTTP/1.1 431 Request Header Fields Too Large'),
+])
+def test_invalid_requests(request_data, status_line):
+    response = run_raw_requests(request_data)
+    assert response.startswith(status_line + b'\r\n')
+    assert b'connection: close\r\n' in response
+
+
+def test_parse_request_head():
+    method, target, version, headers = parse_request_head(
+        b'GET /search?q=1 HTTP/1.1\r\nHost: example.com\r\nX-Empty:\r\nAccept:  */*  '
+    )
+    assert (method, target, version) == ('GET', b'/search?q=1', '1.1')
+    assert headers == [(b'host', b'example.com'), (b'x-empty', b''), (b'accept', b'*/*')]
+    with pytest.raises(ValueError):
+        parse_request_head(b'GET / HTTP/1.1\r\nHost : example.com')
+    with pytest.raises(ValueError):
+        parse_request_head(b'GET / HTTP/1.1\r\nHost: example.com\r\n folded')
+
+
+def test_chunked_decoder():
+    decoder = ChunkedDecoder()
+    buffer = bytearray(b'5\r\nhel')
+    assert decoder.feed(buffer) == b'hel'
+    buffer += b'lo\r\n0\r\nTrailer: 1\r\n\r\nNEXT'
+    assert decoder.feed(buffer) == b'lo'
+    assert decoder.complete
+    assert buffer == b'NEXT'
+    with pytest.raises(ValueError):
+        ChunkedDecoder().feed(bytearray(b'zz\r\n'))
+
+
+def test_max_requests():
+    state = ServerState(max_requests=2)
+    state.request_started()
+    assert not state.should_stop.is_set()
+    state.request_started()
+    assert state.should_stop.is_set()
+
+
+def call_wsgi(wsgi, environ):
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = status
+
+    response['body'] = b''.join(wsgi(environ, start_response))
+    return response
+
+
+def test_wsgi_adapter():
+    wsgi = ASGItoWSGIAdapter(app)
+    try:
+        response = call_wsgi(wsgi, create_environ('/echo/', method='POST', data=b'hello'))
+        assert response == {'status': '200 OK', 'body': b'hello'}
+    finally:
+        wsgi.close()
+
+
+def test_wsgi_adapter_handles_requests_concurrently():
+    arrived = []
+    lock = threading.Lock()
+
+    async def wait_for_others() -> dict:
+        # Every request waits until all of them are in progress together.
+        with lock:
+            arrived.append(1)
+        deadline = time.monotonic() + 5
+        while len(arrived) < 4 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return {'concurrent': len(arrived) == 4}
+
+    wsgi = ASGItoWSGIAdapter(ASyncApp(routes=[Route('/', 'GET', wait_for_others)], docs_url=None))
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            responses = list(executor.map(lambda _: call_wsgi(wsgi, create_environ('/')), range(4)))
+    finally:
+        wsgi.close()
+    assert responses == [{'status': '200 OK', 'body': b'{"concurrent":true}'}] * 4
+
+
+def test_wsgi_adapter_close_waits_for_requests_in_progress():
+    started = threading.Event()
+
+    async def slow() -> dict:
+        started.set()
+        await asyncio.sleep(0.1)
+        return {'slow': True}
+
+    responses = []
+    wsgi = ASGItoWSGIAdapter(ASyncApp(routes=[Route('/', 'GET', slow)], docs_url=None))
+    thread = threading.Thread(
+        target=lambda: responses.append(call_wsgi(wsgi, create_environ('/'))), daemon=True
+    )
+    thread.start()
+    assert started.wait(5)
+    wsgi.close()
+    thread.join(5)
+    assert responses == [{'status': '200 OK', 'body': b'{"slow":true}'}]
+
+
+def test_wsgi_adapter_passes_exc_info_for_errors():
+    def error():
+        raise RuntimeError()
+
+    calls = []
+
+    def start_response(status, headers, exc_info=None):
+        calls.append((status, exc_info))
+
+    wsgi = ASGItoWSGIAdapter(ASyncApp(routes=[Route('/', 'GET', error)], docs_url=None))
+    try:
+        wsgi(create_environ('/'), start_response)
+    finally:
+        wsgi.close()
+    [(status, exc_info)] = calls
+    assert status == '500 Internal Server Error'
+    assert exc_info[0] is RuntimeError
+
+
+def get_free_port() -> int:
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+SERVER_SCRIPT = '''
+import os, sys
+from apistar import ASyncApp, Route
+
+async def pid() -> dict:
+    return {'pid': os.getpid()}
+
+app = ASyncApp(routes=[Route('/', 'GET', pid)], docs_url=None)
+app.serve('127.0.0.1', int(sys.argv[1]), workers=2, graceful_timeout=5)
+'''
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork()')
+def test_serve_with_workers():
+    port = get_free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT, str(port)], env=env)
+    try:
+        pids = set()
+        deadline = time.monotonic() + 10
+        while len(pids) < 2 and time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen('http://127.0.0.1:%d/' % port, timeout=5) as response:
+                    pids.add(response.read())
+            except OSError:
+                time.sleep(0.1)
+        assert len(pids) == 2
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+
+
+WSGI_SERVER_SCRIPT = '''
+import os, sys
+from apistar import App, Route
+
+def pid() -> dict:
+    return {'pid': os.getpid()}
+
+app = App(routes=[Route('/', 'GET', pid)], docs_url=None)
+app.serve('127.0.0.1', int(sys.argv[1]), workers=2, threads=2, max_requests=5)
+'''
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork()')
+def test_serve_wsgi_with_workers():
+    port = get_free_port()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.Popen([sys.executable, '-c', WSGI_SERVER_SCRIPT, str(port)], env=env)
+    try:
+        pids = set()
+        deadline = time.monotonic() + 10
+        # Each worker is replaced after at most 5 requests, so more than two
+        # distinct workers should handle the requests.
+        while len(pids) < 3 and time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen('http://127.0.0.1:%d/' % port, timeout=5) as response:
+                    pids.add(response.read())
+            except OSError:
+                time.sleep(0.1)
+        assert len(pids) >= 3
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
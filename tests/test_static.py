@@ -0,0 +1,304 @@
+import asyncio
+import gzip
+import os
+
+import pytest
+
+from apistar import App, ASyncApp, TestClient
+from apistar.server import staticfiles
+
+app = App(routes=[])
+async_app = ASyncApp(routes=[])
+
+
+@pytest.fixture(scope='module', params=['wsgi', 'asgi'])
+def client(request):
+    if request.param == 'asgi':
+        return TestClient(async_app)
+    return TestClient(app)
+
+
+def get_static_path(filename):
+    static_dir = os.path.join(os.path.dirname(staticfiles.__file__), '..', 'static')
+    return os.path.join(static_dir, filename)
+
+
+def test_static_file(client):
+    response = client.get('/static/apistar/css/base.css')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/css')
+    with open(get_static_path('css/base.css'), 'rb') as file:
+        assert response.content == file.read()
+
+
+def test_static_file_head(client):
+    response = client.head('/static/apistar/css/base.css')
+    assert response.status_code == 200
+    assert response.content == b''
+    assert int(response.headers['Content-Length']) > 0
+
+
+def test_static_file_not_modified(client):
+    response = client.get('/static/apistar/css/base.css')
+    etag = response.headers['ETag']
+    response = client.get('/static/apistar/css/base.css', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.content == b''
+
+
+def test_static_file_not_found(client):
+    response = client.get('/static/apistar/css/missing.css')
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_large_static_file(tmpdir, app_class):
+    content = os.urandom(3 * staticfiles.MAX_CHUNK_SIZE + 10)
+    tmpdir.join('large.bin').write_binary(content)
+    client = TestClient(app_class(routes=[], static_dir=str(tmpdir), docs_url=None))
+    response = client.get('/static/large.bin')
+    assert response.status_code == 200
+    assert response.content == content
+
+
+def test_static_file_pathsend():
+    messages = []
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/static/apistar/css/base.css',
+        'headers': [],
+        'extensions': {'http.response.pathsend': {}}
+    }
+
+    async def send(message):
+        messages.append(message)
+
+    session = async_app.statics(scope)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(session(None, send))
+    assert messages[0]['status'] == 200
+    assert messages[1]['type'] == 'http.response.pathsend'
+    assert os.path.samefile(messages[1]['path'], get_static_path('css/base.css'))
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_static_file_cache(app_class):
+    cached_app = app_class(routes=[], static_cache_size=1024 * 1024)
+    client = TestClient(cached_app)
+    cache = cached_app.statics.cache
+    assert not cache.check_mtime
+    with open(get_static_path('css/base.css'), 'rb') as file:
+        content = file.read()
+
+    response = client.get('/static/apistar/css/base.css', headers={'Accept-Encoding': 'identity'})
+    assert response.content == content
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    response = client.get('/static/apistar/css/base.css', headers={'Accept-Encoding': 'identity'})
+    assert response.content == content
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size == len(content)
+
+
+def test_static_file_cache_autorefresh(tmpdir):
+    class AutorefreshApp(App):
+        def init_staticfiles(self, static_url, static_dir=None, packages=None, cache_size=None):
+            self.statics = staticfiles.StaticFiles(
+                static_url, static_dir, packages, cache_size=cache_size, autorefresh=True
+            )
+
+    path = tmpdir.join('a.txt')
+    path.write_binary(b'hello')
+    cached_app = AutorefreshApp(routes=[], static_dir=str(tmpdir), static_cache_size=1024, docs_url=None)
+    client = TestClient(cached_app)
+    assert cached_app.statics.cache.check_mtime
+
+    response = client.get('/static/a.txt')
+    assert response.content == b'hello'
+    etag = response.headers['ETag']
+
+    path.write_binary(b'hello, again, world')
+    path.setmtime(path.mtime() + 10)
+    response = client.get('/static/a.txt')
+    assert response.content == b'hello, again, world'
+    assert response.headers['Content-Length'] == '19'
+    assert response.headers['ETag'] != etag
+
+
+def test_static_files_cache_eviction(tmpdir):
+    cache = staticfiles.StaticFilesCache(max_size=10, max_file_size=6)
+    for name, content in (('a', b'aaaa'), ('b', b'bbbb'), ('c', b'cccc'), ('d', b'dddddddd')):
+        tmpdir.join(name).write_binary(content)
+
+    assert cache.read(str(tmpdir.join('a'))) == b'aaaa'
+    assert cache.read(str(tmpdir.join('b'))) == b'bbbb'
+    assert cache.get(str(tmpdir.join('a'))) == b'aaaa'
+    cache.read(str(tmpdir.join('c')))
+
+    # 'b' is least recently used, and is evicted to stay within `max_size`.
+    assert cache.get(str(tmpdir.join('b'))) is None
+    assert cache.get(str(tmpdir.join('a'))) == b'aaaa'
+    assert cache.get(str(tmpdir.join('c'))) == b'cccc'
+    assert cache.size == 8
+
+    # Files larger than `max_file_size` are not cached.
+    cache.read(str(tmpdir.join('d')))
+    assert cache.get(str(tmpdir.join('d'))) is None
+
+
+def test_static_files_cache_mtime(tmpdir):
+    cache = staticfiles.StaticFilesCache(max_size=100, check_mtime=True)
+    path = tmpdir.join('a')
+    path.write_binary(b'old')
+    cache.read(str(path))
+    assert cache.get(str(path)) == b'old'
+
+    path.write_binary(b'new')
+    path.setmtime(path.mtime() + 10)
+    assert cache.get(str(path)) is None
+    assert cache.size == 0
+
+
+def test_compress_static_files(tmpdir):
+    content = b'body { color: red; }\n' * 100
+    tmpdir.join('style.css').write_binary(content)
+    tmpdir.join('image.png').write_binary(content)
+
+    written = staticfiles.compress_static_files(str(tmpdir))
+    assert str(tmpdir.join('style.css.gz')) in written
+    assert not tmpdir.join('image.png.gz').exists()
+    assert gzip.decompress(tmpdir.join('style.css.gz').read_binary()) == content
+
+    # Up to date variants are not rewritten.
+    assert staticfiles.compress_static_files(str(tmpdir)) == []
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_precompressed_static_file(tmpdir, app_class):
+    content = b'body { color: red; }\n' * 100
+    tmpdir.join('style.css').write_binary(content)
+    staticfiles.compress_static_files(str(tmpdir))
+    client = TestClient(app_class(routes=[], static_dir=str(tmpdir), docs_url=None))
+
+    response = client.get('/static/style.css', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.content == content
+
+    response = client.get('/static/style.css', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.content == content
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_precompressed_static_file_etag(tmpdir, app_class):
+    content = b'body { color: red; }\n' * 100
+    tmpdir.join('style.css').write_binary(content)
+    staticfiles.compress_static_files(str(tmpdir))
+    client = TestClient(app_class(routes=[], static_dir=str(tmpdir), docs_url=None))
+
+    etag = client.get('/static/style.css', headers={'Accept-Encoding': 'identity'}).headers['ETag']
+    gzip_etag = client.get('/static/style.css', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert gzip_etag == etag[:-1] + '-gzip"'
+
+    headers = {'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag}
+    response = client.get('/static/style.css', headers=headers)
+    assert response.status_code == 304
+    assert response.headers['ETag'] == gzip_etag
+
+    headers = {'Accept-Encoding': 'identity', 'If-None-Match': gzip_etag}
+    response = client.get('/static/style.css', headers=headers)
+    assert response.status_code == 200
+
+    # Byte ranges refer to the uncompressed file, so can't resume a
+    # compressed response.
+    headers = {'Accept-Encoding': 'gzip', 'Range': 'bytes=0-9', 'If-Range': gzip_etag}
+    response = client.get('/static/style.css', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+@pytest.mark.parametrize('range_header,expected', [
+    ('bytes=0-99', [(0, 99)]),
+    ('bytes=900-', [(900, 999)]),
+    ('bytes=-100', [(900, 999)]),
+    ('bytes=-2000', [(0, 999)]),
+    ('bytes=990-2000', [(990, 999)]),
+    ('bytes=500-599, 0-99', [(0, 99), (500, 599)]),
+    ('bytes=0-99, 50-149, 150-199', [(0, 199)]),
+    ('bytes=1000-', []),
+    ('bytes=-0', []),
+    ('bytes=10-5', None),
+    ('bytes=abc', None),
+    ('bytes=', None),
+    ('items=0-99', None),
+])
+def test_parse_byte_ranges(range_header, expected):
+    assert staticfiles.parse_byte_ranges(range_header, 1000) == expected
+
+
+@pytest.fixture(scope='module', params=[App, ASyncApp])
+def range_client(request, tmpdir_factory):
+    tmpdir = tmpdir_factory.mktemp('range')
+    tmpdir.join('data.txt').write_binary(bytes(range(256)) * 4)
+    return TestClient(request.param(routes=[], static_dir=str(tmpdir), docs_url=None))
+
+
+def test_static_file_range(range_client):
+    content = bytes(range(256)) * 4
+    response = range_client.get('/static/data.txt')
+    assert response.headers['Accept-Ranges'] == 'bytes'
+
+    response = range_client.get('/static/data.txt', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == 'bytes 100-199/1024'
+    assert response.headers['Content-Length'] == '100'
+    assert response.headers['Content-Type'].startswith('text/plain')
+    assert response.content == content[100:200]
+
+    response = range_client.get('/static/data.txt', headers={'Range': 'bytes=-24'})
+    assert response.status_code == 206
+    assert response.content == content[-24:]
+
+
+def test_static_file_multiple_ranges(range_client):
+    content = bytes(range(256)) * 4
+    response = range_client.get('/static/data.txt', headers={'Range': 'bytes=0-9,500-509'})
+    assert response.status_code == 206
+    content_type, boundary = response.headers['Content-Type'].split('; boundary=')
+    assert content_type == 'multipart/byteranges'
+    assert int(response.headers['Content-Length']) == len(response.content)
+
+    parts = response.content.split(b'--' + boundary.encode())
+    assert parts[0] == b''
+    assert parts[-1] == b'--\r\n'
+    assert parts[1].endswith(b'\r\n\r\n' + content[0:10] + b'\r\n')
+    assert b'Content-Range: bytes 0-9/1024' in parts[1]
+    assert parts[2].endswith(b'\r\n\r\n' + content[500:510] + b'\r\n')
+    assert b'Content-Range: bytes 500-509/1024' in parts[2]
+
+
+def test_static_file_range_not_satisfiable(range_client):
+    response = range_client.get('/static/data.txt', headers={'Range': 'bytes=2000-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == 'bytes */1024'
+    assert response.content == b''
+
+
+def test_static_file_if_range(range_client):
+    response = range_client.get('/static/data.txt')
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+
+    for if_range in (etag, last_modified):
+        headers = {'Range': 'bytes=0-9', 'If-Range': if_range}
+        response = range_client.get('/static/data.txt', headers=headers)
+        assert response.status_code == 206
+        assert len(response.content) == 10
+
+    for if_range in ('"other"', 'W/' + etag, 'Thu, 01 Jan 1970 00:00:00 GMT'):
+        headers = {'Range': 'bytes=0-9', 'If-Range': if_range}
+        response = range_client.get('/static/data.txt', headers=headers)
+        assert response.status_code == 200
+        assert len(response.content) == 1024
@@ -0,0 +1,97 @@
+import asyncio
+
+import jinja2
+import pytest
+
+from apistar import App, ASyncApp, Route, TestClient, http
+from apistar.server import templates
+
+
+def test_filesystem_bytecode_cache(tmpdir, monkeypatch):
+    cache_dir = tmpdir.mkdir('cache')
+    instance = templates.Templates(packages=['apistar'], bytecode_cache=str(cache_dir))
+    instance.render_template('apistar/forms/input.html', field=None)
+    assert len(cache_dir.listdir()) == 1
+
+    # A new environment loads the compiled template, rather than compiling it.
+    instance = templates.Templates(packages=['apistar'], bytecode_cache=str(cache_dir))
+    monkeypatch.setattr(instance.env, 'compile', None)
+    assert instance.env.get_template('apistar/forms/input.html') is not None
+
+
+def test_memory_bytecode_cache():
+    templates.MEMORY_BYTECODE_STORE.clear()
+    instance = templates.Templates(packages=['apistar'], bytecode_cache=':memory:')
+    instance.env.get_template('apistar/forms/input.html')
+    assert len(templates.MEMORY_BYTECODE_STORE) == 1
+
+
+def test_bytecode_cache_instance():
+    cache = jinja2.FileSystemBytecodeCache()
+    assert templates.get_bytecode_cache(cache) is cache
+    assert templates.get_bytecode_cache(None) is None
+
+
+def test_precompile():
+    instance = templates.Templates(packages=['apistar'])
+    names = instance.precompile()
+    assert 'apistar/docs/index.html' in names
+    assert len(instance.env.cache) == len(names)
+
+
+def test_precompile_templates_app(tmpdir):
+    def index(app: App):
+        return app.render_template('index.html', name='world')
+
+    tmpdir.join('index.html').write('<p>Hello, {{ name }}!</p>')
+    tmpdir.join('logo.png').write_binary(b'\x89PNG\r\n\x1a\n\xff\xfe')
+    tmpdir.join('app.js').write('var template = "{{ name }";')
+    app = App(
+        routes=[Route('/', 'GET', index)],
+        template_dir=str(tmpdir),
+        precompile_templates=True
+    )
+    cached = [key[1] for key in app.templates.env.cache.keys()]
+    assert 'index.html' in cached
+    assert 'apistar/docs/index.html' in cached
+    assert 'logo.png' not in cached
+    assert 'app.js' not in cached
+
+    response = TestClient(app).get('/')
+    assert response.text == '<p>Hello, world!</p>'
+
+
+def test_buffer_chunks():
+    chunks = list(templates.buffer_chunks(['a'] * 10, size=4))
+    assert chunks == ['aaaa', 'aaaa', 'aa']
+    assert list(templates.buffer_chunks([], size=4)) == []
+
+
+@pytest.mark.parametrize('app_class', [App, ASyncApp])
+def test_render_template_stream(tmpdir, app_class):
+    def report(app: App) -> http.StreamingHTMLResponse:
+        rows = range(5000)
+        return http.StreamingHTMLResponse(app.render_template_stream('report.html', rows=rows))
+
+    tmpdir.join('report.html').write('<ul>{% for row in rows %}<li>{{ row }}</li>{% endfor %}</ul>')
+    app = app_class(routes=[Route('/', 'GET', report)], template_dir=str(tmpdir), docs_url=None)
+    response = TestClient(app).get('/')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert response.text == app.render_template('report.html', rows=range(5000))
+
+
+def test_render_template_stream_async_chunks(tmpdir):
+    tmpdir.join('report.html').write('{% for row in rows %}<li>{{ row }}</li>{% endfor %}')
+    instance = templates.Templates(str(tmpdir), packages=[])
+    stream = instance.render_template_stream_async('report.html', rows=range(5000))
+    chunks = []
+
+    async def consume():
+        async for chunk in stream:
+            chunks.append(chunk)
+
+    asyncio.get_event_loop().run_until_complete(consume())
+    assert len(chunks) > 1
+    assert all(len(chunk) >= templates.STREAM_BUFFER_SIZE for chunk in chunks[:-1])
+    assert ''.join(chunks) == instance.render_template('report.html', rows=range(5000))
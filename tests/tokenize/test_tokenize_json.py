@@ -1,4 +1,6 @@
-from apistar.tokenize import DictToken, ListToken, ScalarToken, tokenize_json
+from apistar.tokenize import (
+    DictToken, ListToken, ScalarToken, Token, index_json, tokenize_json
+)
 
 
 def test_tokenize_object():
@@ -44,3 +46,41 @@ def test_tokenize_whitespace():
         ScalarToken('a', 2, 4): ScalarToken(1, 9, 9)
     }, 0, 11)
     assert token == expected
+
+
+def test_index_json_lookup():
+    content = '{"a": [1, {"b": null}], "c\\"d": "test"}'
+    index = index_json(content)
+    assert index.lookup([]) == Token(index.value, 0, 38)
+    assert index.lookup(['a']) == Token([1, {'b': None}], 6, 21)
+    assert index.lookup(['a', 0]) == Token(1, 7, 7)
+    assert index.lookup(['a', 1, 'b']) == Token(None, 16, 19)
+    assert index.lookup(['a', 1, 'b'], lookup_property=True) == ScalarToken('b', 11, 13)
+    assert index.lookup(['c"d']) == Token('test', 32, 37)
+    assert index.lookup(['c"d'], lookup_property=True) == ScalarToken('c"d', 24, 29)
+
+
+def test_index_json_matches_tokenize_json():
+    content = '{"a": [1, 2, 3], "b": {"c": [true, {}], "d": []}, "e": "test"}'
+    token = tokenize_json(content)
+    index = index_json(content)
+    for keys in (['a'], ['a', 2], ['b', 'c', 1], ['b', 'd'], ['e']):
+        assert index.lookup(keys).start == token.lookup(keys).start
+        assert index.lookup(keys).end == token.lookup(keys).end
+        assert index.lookup(keys, lookup_property=True) == token.lookup(keys, lookup_property=True)
+
+
+def test_tokens_are_slotted():
+    token = tokenize_json('{"a": [1]}')
+    assert not hasattr(token, '__dict__')
+    assert not hasattr(token.lookup(['a']), '__dict__')
+    assert not hasattr(token.lookup(['a', 0]), '__dict__')
+
+
+def test_dict_token_from_pairs():
+    key = ScalarToken('a', 1, 3)
+    value = ScalarToken(1, 6, 6)
+    token = DictToken([(key, value)], 0, 7)
+    assert token == DictToken({key: value}, 0, 7)
+    assert token.lookup(['a']) is value
+    assert token.lookup(['a'], lookup_property=True) is key